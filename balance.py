@@ -0,0 +1,245 @@
+"""
+Monte Carlo balance simulator: plays many headless games with a player
+policy and reports how long everything takes to unlock.
+
+    py balance.py --games 1000 -o balance.csv
+    py balance.py --games 200 --policy greedy --content my-content.json
+
+A game is played one purchase at a time, like optimizer.py plays it: the
+game runs until the chosen Building can be afforded, with Collect clicked
+--clicks times a second, and what the purchase needs is converted. Every
+purchase, conversion and collect goes through model.Game.act(), so
+collects and conversions have their chance of giving twice as much, as
+they do in the game. The policies choose the next purchase among the
+Buildings that are visible or can be made visible with what's produced:
+    random      any of them
+    greedy      one of the --pool that can be bought soonest
+    script      the next id listed in --script, one per line
+Game i plays with the seed --seed + i, for its policy and its random
+events, so the results don't depend on the number of processes. A game ends when the target is bought, at the
+--horizon, or when the policy has nothing left it can buy, e.g. when
+more milk is used than can be made.
+
+Every game is a row of the CSV output, written as soon as the game
+finishes: its seed, whether it reached the target, how it ended (one of
+OUTCOMES), the game time it ended at, then the game time at which each
+Building and Convert first became visible (visible.<id>), each Building
+was first bought (bought.<id>) and each ice cream flavor was first made
+(made.<id>), empty if it never happened. A Resource passing a threshold
+while the game waits is timed at the tick its average rate over the wait
+reaches it, so purchases that spend it afterwards don't hide it. A
+summary of every column's distribution is printed at the end.
+"""
+import argparse
+import concurrent.futures
+import csv
+import os
+import random
+import statistics
+import sys
+from array import array
+
+import content
+import model
+import notation
+import optimizer
+import save
+
+POLICIES = ('random', 'greedy', 'script')
+# how a game ended: bought the target, reached the horizon with purchases still coming, nothing more could ever be bought, played MAX_PURCHASES
+OUTCOMES = ('finished', 'horizon', 'stuck', 'purchases')
+GAMES = 100
+HORIZON = 24 * 3600 # seconds of game time played at most
+MAX_PURCHASES = 2000 # purchases played at most
+POOL = 3 # the greedy policy chooses among this many of the quickest Buildings
+
+settings = None # (policy, script, target, horizon, clicks, pool) of this process
+fresh = None # save.dumps() of a new game
+gates = [] # (column, Resource, centi-units), it happened once there's that much of the Resource
+bought = [] # column of each Building's first purchase
+
+
+def columns(tables):
+    """Names of the CSV columns of the unlock times, see gates."""
+    names = [f'visible.{table["id"]}' for table in tables['buildings']]
+    names.extend(f'visible.{table["id"]}' for table in tables['converts'])
+    names.extend(f'bought.{table["id"]}' for table in tables['buildings'])
+    names.extend(f'made.{tables["resources"]["ids"][table["makes"]]}' for table in tables['converts'] if table['panel'] == 'ice_cream')
+    return names
+
+
+def start_worker(tables, worker_settings):
+    global settings, fresh
+    optimizer.start_worker(tables)
+    settings = worker_settings
+    game = optimizer.game
+    fresh = save.dumps(game, 0)
+    names = columns(tables)
+    thresholds = [(building.visible_resource, building.visible_value) for building in game.buildings]
+    thresholds.extend((convert.visible_resource, convert.visible_value) for convert in game.converts)
+    gates[:] = [(name, resource, cents) for name, (resource, cents) in zip(names, thresholds)]
+    bought[:] = names[len(thresholds):len(thresholds)+len(game.buildings)]
+    made = names[len(thresholds)+len(game.buildings):]
+    gates.extend((name, convert.new_resource, 1) for name, convert in zip(made, game.i_c_converts))
+
+
+class Watch:
+    """
+    Notes the game time each gate is first reached at while a purchase is
+    prepared, from the Resources before and after each step of the game.
+    times is only kept if the purchase is.
+    """
+
+    def __init__(self, game, elapsed, times):
+        self.game = game
+        self.elapsed = elapsed
+        self.times = dict(times)
+        self.values = array('q', game.ledger.values) # the Resources before the last step
+        self.observe(0)
+
+    def observe(self, n):
+        """Called after n ticks of the game were run, 0 for a conversion."""
+        values = self.game.ledger.values
+        for column, resource, cents in gates:
+            if column not in self.times and values[resource.index] >= cents:
+                before = self.values[resource.index]
+                ticks = 0
+                if before < cents: # passed during the step, at the tick its average rate over the step reaches it
+                    ticks = -(-(cents - before) * n // (values[resource.index] - before))
+                self.times[column] = self.elapsed + ticks
+        self.values[:] = values
+        self.elapsed = self.elapsed + n
+
+
+def candidates(game, rnd, purchases):
+    """Indexes of the Buildings the policy would buy next, in the order to try them."""
+    policy, script, target, horizon, clicks, pool = settings
+    if policy == 'script':
+        if purchases >= len(script):
+            return []
+        return [script[purchases]]
+    # the Buildings that are visible or can be made visible with what's produced now
+    estimates = {i: optimizer.estimate(game, optimizer.requirements(game, building), clicks) for i, building in enumerate(game.buildings)}
+    reachable = [i for i, ticks in estimates.items() if ticks < optimizer.UNREACHABLE]
+    if policy == 'random':
+        return rnd.sample(reachable, len(reachable))
+    reachable.sort(key=estimates.get)
+    quickest = reachable[:pool]
+    rnd.shuffle(quickest)
+    return quickest + reachable[pool:]
+
+
+def play(seed):
+    """Play one game, returns (outcome, time, {column: time})."""
+    policy, script, target, horizon, clicks, pool = settings
+    game = optimizer.game
+    save.loads(game, fresh)
+    game.reseed(seed) # the game's random events, the policy draws from rnd
+    game.random_events.start(game.ticks)
+    rnd = random.Random(seed)
+    elapsed = 0
+    times = Watch(game, elapsed, {}).times
+    for purchases in range(MAX_PURCHASES):
+        if game.buildings[target].num > 0:
+            return 'finished', elapsed, times
+        before = save.dumps(game, 0)
+        choices = candidates(game, rnd, purchases)
+        for i in choices:
+            building = game.buildings[i]
+            watch = Watch(game, elapsed, times)
+            waited = optimizer.prepare(game, optimizer.requirements(game, building), horizon - elapsed, clicks, watch.observe)
+            if waited is not None and game.act(model.BUY, i, 1):
+                elapsed = elapsed + waited
+                times = watch.times
+                times.setdefault(bought[i], elapsed)
+                break
+            save.loads(game, before) # couldn't buy it, try the next one
+        else:
+            # nothing can be bought before the horizon, see if the game only ran out of time
+            for i in choices:
+                if optimizer.prepare(game, optimizer.requirements(game, game.buildings[i]), optimizer.HORIZON, clicks) is not None:
+                    return 'horizon', elapsed, times
+                save.loads(game, before)
+            return 'stuck', elapsed, times
+    return 'purchases', elapsed, times
+
+
+def play_batch(seeds):
+    return [(seed, *play(seed)) for seed in seeds]
+
+
+def summarize(names, rows):
+    """Print how many games reached each column and the 10th, 50th and 90th percentile times."""
+    print(f'{"":40} {"games":>7} {"p10":>9} {"median":>9} {"p90":>9}')
+    for name in names:
+        times = sorted(row[name] for row in rows if row[name] is not None)
+        if not times:
+            print(f'{name:40} {0:7}')
+            continue
+        if len(times) > 1:
+            deciles = statistics.quantiles(times, n=10, method='inclusive')
+            p10, p90 = deciles[0], deciles[-1]
+        else:
+            p10 = p90 = times[0]
+        print(f'{name:40} {len(times):7} {notation.clock(round(p10)):>9} {notation.clock(round(statistics.median(times))):>9} {notation.clock(round(p90)):>9}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play many headless games and report how long everything takes to unlock.')
+    parser.add_argument('--games', type=int, default=GAMES)
+    parser.add_argument('--policy', choices=POLICIES, default='random')
+    parser.add_argument('--script', help='file of building ids to buy in order, for --policy script')
+    parser.add_argument('--pool', type=int, default=POOL, help='number of the quickest buildings the greedy policy chooses from')
+    parser.add_argument('--target', default=optimizer.TARGET, help='id of the building that ends a game')
+    parser.add_argument('--content', default=content.CONTENT_PATH, help='content file to play')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clicks', type=int, default=optimizer.CLICKS, help='Collect clicks per second while waiting')
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='seconds of game time played at most')
+    parser.add_argument('--processes', type=int, help='size of the process pool, by default one per core')
+    parser.add_argument('-o', '--output', default='balance.csv', help='CSV file to write a row per game to')
+    args = parser.parse_args()
+
+    tables = content.load(args.content)
+    ids = [table['id'] for table in tables['buildings']]
+    script = []
+    if args.policy == 'script':
+        if not args.script:
+            parser.error('--policy script needs --script')
+        with open(args.script) as f:
+            script = [line.strip() for line in f if line.strip()]
+        unknown = [building_id for building_id in script if building_id not in ids]
+        if unknown:
+            parser.error(f'unknown building ids in {args.script}: {", ".join(unknown)}')
+        script = [ids.index(building_id) for building_id in script]
+    if args.target not in ids:
+        parser.error(f'unknown building {args.target!r}')
+    worker_settings = (args.policy, script, ids.index(args.target), args.horizon, args.clicks, args.pool)
+
+    # batches small enough to keep every process busy until the end
+    processes = args.processes or os.cpu_count() or 1
+    seeds = range(args.seed, args.seed + args.games)
+    size = max(min(args.games // (processes * 8), 50), 1)
+    batches = [seeds[i:i+size] for i in range(0, len(seeds), size)]
+
+    names = columns(tables)
+    rows = []
+    outcomes = dict.fromkeys(OUTCOMES, 0) # number of games that ended each way
+    with open(args.output, 'w', newline='') as f, concurrent.futures.ProcessPoolExecutor(processes, initializer=start_worker, initargs=(tables, worker_settings)) as pool:
+        writer = csv.writer(f)
+        writer.writerow(['seed', 'policy', 'finished', 'outcome', 'time'] + names)
+        for future in concurrent.futures.as_completed([pool.submit(play_batch, batch) for batch in batches]):
+            for seed, outcome, elapsed, times in future.result():
+                row = {name: times.get(name) for name in names}
+                rows.append(row)
+                outcomes[outcome] = outcomes[outcome] + 1
+                writer.writerow([seed, args.policy, int(outcome == 'finished'), outcome, elapsed] + ['' if row[name] is None else row[name] for name in names])
+            f.flush()
+            print(f'{len(rows)}/{args.games} games', end='\r', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    print(f'{outcomes["finished"]} of {args.games} games bought {args.target}, {outcomes["horizon"]} ran into the horizon, {outcomes["stuck"]} had nothing more they could buy'
+          + (f', {outcomes["purchases"]} stopped after {MAX_PURCHASES} purchases' if outcomes['purchases'] else ''))
+    summarize(names, rows)
+
+
+if __name__ == '__main__':
+    main()
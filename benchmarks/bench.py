@@ -0,0 +1,179 @@
+"""
+Benchmarks of the game's hot paths, run without a display.
+
+    py benchmarks/bench.py                          run every benchmark, write results.json
+    py benchmarks/bench.py -o new.json --compare baseline.json
+
+Every benchmark runs on a model.Game copied 10, 100 and 1000 times over:
+every Resource, Building and Convert is added again under a new name,
+so a copy behaves like the real game and doesn't interact with the others.
+Times are the best of --repeat runs, in seconds per run. With --compare,
+benchmarks more than --threshold times slower than the baseline are
+listed and the exit code is 1.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model
+from game import HovertipButtons # importing game doesn't need a display
+
+SCALES = (10, 100, 1000)
+
+
+def scaled_game(scale):
+    """A model.Game with scale copies of every Resource, Building and Convert."""
+    game = model.Game()
+    resources = game.resource_list + game.ingredient_list
+    buildings = list(game.buildings)
+    converts = [game.convert_milk_i_c] + game.i_c_converts
+    for i in range(1, scale):
+        # Resources first, then everything that refers to them
+        mapping = {}
+        for resource in resources:
+            clone = type(resource)(game.ledger, f'{resource.name} {i}', game.ledger.max_nums[resource.index])
+            mapping[resource] = clone
+            if isinstance(resource, model.Ingredient):
+                game.ingredient_list.append(clone)
+            else:
+                game.resource_list.append(clone)
+        for building in buildings:
+            clone = copy.copy(building)
+            clone.name = f'{building.name} {i}'
+            mapping[building] = clone
+            game.buildings.append(clone)
+        for convert in converts:
+            clone = copy.copy(convert)
+            mapping[convert] = clone
+            game.i_c_converts.append(clone)
+        for original in buildings + converts:
+            clone = mapping[original]
+            for name, value in vars(original).items():
+                if isinstance(value, (model.Resource, model.Building)):
+                    setattr(clone, name, mapping[value])
+                elif isinstance(value, (list, tuple)):
+                    setattr(clone, name, type(value)(mapping.get(v, v) if isinstance(v, (model.Resource, model.Building)) else v for v in value))
+    # compile everything again with the copies
+    game.achievements = model.Achievements(game.resource_list + game.ingredient_list)
+    for convert in [game.convert_milk_i_c] + game.i_c_converts:
+        convert.achievements = game.achievements
+    game.production = model.Production(game.ledger, game.buildings)
+    return game
+
+
+def stocked_game(scale):
+    """A scaled_game where every Building is owned and every Resource has plenty."""
+    game = scaled_game(scale)
+    for resource in game.resource_list + game.ingredient_list:
+        resource.update_max_num(10**9 * model.CENT)
+        resource.value = 1e9
+    for building in game.buildings:
+        building.buy(5)
+    for resource in game.resource_list + game.ingredient_list:
+        resource.value = 1e6 # converters have something to convert, Resources have room to grow
+    game.production.compile()
+    return game
+
+
+def bench_tick(game):
+    for i in range(10):
+        game.tick()
+
+
+def bench_convert(game):
+    converts = [game.convert_milk_i_c] + game.i_c_converts
+    for i in range(1000):
+        converts[i % len(converts)].convert(1)
+
+
+def bench_convert_bulk(game):
+    for convert in [game.convert_milk_i_c] + game.i_c_converts:
+        convert.convert(1000) # one call however many, like the ×1000 radiobutton
+
+
+
+def bench_sell_all(game):
+    for building in game.buildings:
+        building.sell(building.num)
+
+
+def bench_achievements(game):
+    game.achievements.set_done([False] * len(game.achievements.done))
+    game.achievements.update()
+
+
+def bench_produce_text(game):
+    for host in game.buildings + [game.convert_milk_i_c] + game.i_c_converts:
+        HovertipButtons.produce_text(None, host, 'description') # doesn't use self
+
+
+# name -> (benchmark, whether it changes the game so it needs a new one every run)
+BENCHMARKS = {
+    'tick': (bench_tick, False),
+    'convert': (bench_convert, False),
+    'convert_bulk': (bench_convert_bulk, False),
+    'sell_all': (bench_sell_all, True),
+    'achievements': (bench_achievements, False),
+    'produce_text': (bench_produce_text, False),
+}
+
+
+def run(scales, repeat, names):
+    results = {}
+    for scale in scales:
+        game = stocked_game(scale)
+        for name in names:
+            benchmark, fresh = BENCHMARKS[name]
+            best = float('inf')
+            for i in range(repeat):
+                if fresh:
+                    game = stocked_game(scale)
+                start = time.perf_counter()
+                benchmark(game)
+                best = min(best, time.perf_counter() - start)
+            results[f'{name}@{scale}x'] = best
+            print(f'{name}@{scale}x'.ljust(24), f'{best * 1000:10.3f} ms', flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the benchmarks more than threshold times slower than in baseline."""
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before and seconds / before > threshold:
+            regressions.append((name, before, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of the game\'s hot paths.')
+    parser.add_argument('-o', '--output', default='results.json', help='file to write the results to')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown that counts as a regression')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat, args.only)
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(), 'time': time.time(), 'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f'REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({after / before:.2f}x)')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
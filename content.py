@@ -0,0 +1,259 @@
+"""
+Loading the game's content from content.json.
+content.json lists every Resource, Ingredient, Building and Convert by
+an id, and refers to other content by id. compile_tables() validates it
+and turns the ids into indexes: resources are numbered Resources first,
+then Ingredients, buildings in order, and every amount is stored in an
+array. load() keeps the compiled tables in __pycache__, named after a
+hash of content.json, so the file is only parsed and validated when it
+changes.
+
+The optional seasons repeat in order, a cycle called the year. Each one
+lasts a number of seconds and changes the efficiency of some producing
+Buildings by a percentage, which is negative in winter. Random events
+multiply what some Buildings produce, efficiency and all, e.g. by 3 in a
+frenzy: every so many seconds each one has a chance of starting, and it
+lasts a number of seconds. lucky is the
+chance that a collect or a conversion gives twice as much.
+
+Amounts are compiled to the model's fixed point integers: quantities in
+centi-units (CENT per unit) and percentages in ten-thousandths (BASIS
+is 100%). Cost multipliers stay floats.
+"""
+import hashlib
+import json
+import keyword
+import os
+import pickle
+from array import array
+
+CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content.json')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+COMPILER_VERSION = 7 # change when compile_tables() changes, so old caches aren't used
+
+BUILDING_TYPES = ('Building', 'Converter', 'StorageBuilding', 'EfficiencyBuilding', 'StorageAndEfficiencyBuilding')
+PANELS = ('control_panel', 'ice_cream')
+CENT = 100 # centi-units per unit
+# names of model.Game's own attributes, every Resource, Building and Convert is also an attribute of a Game named by its id
+RESERVED = frozenset((
+    'achievements', 'act', 'buildings', 'cheat', 'collect', 'converts', 'fast_forward', 'i_c_converts', 'ingredient_list',
+    'journal', 'ledger', 'lucky', 'lucky_draws', 'lucky_key', 'lucky_limit', 'lucky_times', 'production', 'random_events',
+    'record_caps', 'reseed', 'resource_list', 'seasons', 'seed', 'start_schedules', 'tables', 'tick', 'ticks',
+    'ticks_until_achievement',
+))
+BASIS = 10000 # ten-thousandths in 100%
+
+
+def check(condition, message):
+    if not condition:
+        raise ValueError(f'content: {message}')
+
+
+def attribute_id(value, where):
+    """Check that value can be the id of a Resource, Building or Convert, the name of an attribute of a Game."""
+    check(isinstance(value, str) and value.isidentifier() and not keyword.iskeyword(value) and not value.startswith('_'), f'{where} id should be a name made of letters, digits and underscores')
+    check(value not in RESERVED, f'{where} id is already the name of something else in a Game')
+    return value
+
+
+def number(value, where):
+    check(isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0, f'{where} should be a number >= 0, not {value!r}')
+    return value
+
+
+def fixed(value, scale, where):
+    """value as an integer number of 1/scale, e.g. fixed(0.63, CENT, ...) == 63."""
+    return round(number(value, where) * scale)
+
+
+def positive(amounts, where):
+    """Check that compiled amounts are all > 0, e.g. costs, which are divided by."""
+    check(all(amount > 0 for amount in amounts), f'{where} should be more than 0 after rounding to hundredths')
+
+
+def index(ids, value, where):
+    check(value in ids, f'{where} refers to unknown id {value!r}')
+    return ids[value]
+
+
+def pairs(ids, items, where, scale=CENT):
+    """Compile [[id, amount], ...] into an array of indexes and an array of amounts in 1/scale."""
+    check(isinstance(items, list), f'{where} should be a list')
+    indexes, amounts = array('I'), array('q')
+    for item in items:
+        check(isinstance(item, list) and len(item) == 2, f'{where} items should be [id, amount]')
+        indexes.append(index(ids, item[0], where))
+        amounts.append(fixed(item[1], scale, where))
+    return indexes, amounts
+
+
+def seconds(value, where):
+    check(isinstance(value, int) and not isinstance(value, bool) and value > 0, f'{where} should be a whole number of seconds > 0')
+    return value
+
+
+def efficiency_changes(building_ids, buildings, items, where):
+    """Compile [[building id, change], ...] into the change of every building in 1/BASIS, mostly 0."""
+    check(isinstance(items, list), f'{where} should be a list')
+    changes = array('q', [0] * len(buildings))
+    for item in items:
+        check(isinstance(item, list) and len(item) == 2, f'{where} items should be [id, change]')
+        i = index(building_ids, item[0], where)
+        check(buildings[i]['type'] in ('Building', 'Converter'), f'{where} should only change buildings that produce something')
+        # a change can slow a building down as far as stopping it
+        check(isinstance(item[1], (int, float)) and not isinstance(item[1], bool) and item[1] >= -1, f'{where} change should be a number >= -1, not {item[1]!r}')
+        changes[i] = round(item[1] * BASIS)
+    return changes
+
+
+def production_multipliers(building_ids, buildings, items, where):
+    """Compile [[building id, multiplier], ...] into the multiplier of every building in 1/BASIS, mostly BASIS."""
+    check(isinstance(items, list), f'{where} should be a list')
+    multipliers = array('q', [BASIS] * len(buildings))
+    for item in items:
+        check(isinstance(item, list) and len(item) == 2, f'{where} items should be [id, multiplier]')
+        i = index(building_ids, item[0], where)
+        check(buildings[i]['type'] in ('Building', 'Converter'), f'{where} should only change buildings that produce something')
+        multipliers[i] = fixed(item[1], BASIS, f'{where} multiplier') # 0 stops a building
+    return multipliers
+
+
+def compile_tables(data):
+    """Validate the parsed content.json and return its integer indexed tables."""
+    check(isinstance(data, dict), 'should be an object')
+    for key in ('resources', 'ingredients', 'buildings', 'converts'):
+        check(isinstance(data.get(key), list), f'{key} should be a list')
+
+    # resources, every id refers to an index into these tables
+    resources = {'ids': [], 'names': [], 'max_nums': array('q'), 'ingredient': array('b'), 'styles': []}
+    resource_ids = {}
+    for ingredient, key in ((0, 'resources'), (1, 'ingredients')):
+        for item in data[key]:
+            where = f'{key} {item.get("id")!r}'
+            check(isinstance(item.get('id'), str) and item['id'] not in resource_ids, f'{where} needs a unique id')
+            attribute_id(item['id'], where)
+            check(isinstance(item.get('name'), str), f'{where} needs a name')
+            resource_ids[item['id']] = len(resources['ids'])
+            resources['ids'].append(item['id'])
+            resources['names'].append(item['name'])
+            resources['max_nums'].append(int(number(item.get('max'), f'{where} max')) * CENT)
+            resources['ingredient'].append(ingredient)
+            style = item.get('style')
+            check(style is None or isinstance(style, dict), f'{where} style should be an object')
+            resources['styles'].append(None if style is None else (style.get('foreground', ''), bool(style.get('bold'))))
+
+    # buildings, ids are known before compiling so that buildings can refer to later ones
+    building_ids = {}
+    for item in data['buildings']:
+        check(isinstance(item.get('id'), str) and item['id'] not in building_ids and item['id'] not in resource_ids, f'building {item.get("id")!r} needs a unique id')
+        attribute_id(item['id'], f'building {item["id"]!r}')
+        building_ids[item['id']] = len(building_ids)
+    buildings = []
+    for item in data['buildings']:
+        where = f'building {item["id"]!r}'
+        kind = item.get('type')
+        check(kind in BUILDING_TYPES, f'{where} type should be one of {", ".join(BUILDING_TYPES)}')
+        check(isinstance(item.get('name'), str), f'{where} needs a name')
+        check(isinstance(item.get('cost'), list) and item['cost'], f'{where} needs a cost')
+        buy, costs, cost_mults = array('I'), array('q'), array('d')
+        for cost in item['cost']:
+            check(isinstance(cost, list) and len(cost) == 3, f'{where} cost items should be [id, cost, multiplier]')
+            buy.append(index(resource_ids, cost[0], f'{where} cost'))
+            costs.append(fixed(cost[1], CENT, f'{where} cost'))
+            cost_mults.append(number(cost[2], f'{where} cost multiplier'))
+            check(cost[2] >= 1, f'{where} cost multiplier should be >= 1, not {cost[2]!r}')
+        positive(costs, f'{where} cost')
+        building = {
+            'id': item['id'], 'type': kind, 'name': item['name'],
+            'description': item.get('description', ''), 'column': item.get('column', 0), 'row': item.get('row', 0),
+            'buy': buy, 'costs': costs, 'cost_mults': cost_mults,
+        }
+        check(isinstance(item.get('visible'), list) and len(item['visible']) == 2, f'{where} visible should be [id, amount]')
+        building['visible'] = index(resource_ids, item['visible'][0], f'{where} visible')
+        building['visible_value'] = fixed(item['visible'][1], CENT, f'{where} visible')
+        if kind in ('Building', 'Converter'):
+            building['produces'], building['bonus_vals'] = pairs(resource_ids, item.get('produces'), f'{where} produces')
+        if kind == 'Converter':
+            building['consumes'], building['conversion_costs'] = pairs(resource_ids, item.get('consumes'), f'{where} consumes')
+            positive(building['conversion_costs'], f'{where} consumes')
+        if kind in ('StorageBuilding', 'StorageAndEfficiencyBuilding'):
+            building['expands'], building['expand_vals'] = pairs(resource_ids, item.get('expands'), f'{where} expands')
+        if kind in ('EfficiencyBuilding', 'StorageAndEfficiencyBuilding'):
+            building['improves'], building['efficiency_increases'] = pairs(building_ids, item.get('improves'), f'{where} improves', BASIS)
+        buildings.append(building)
+
+    # ice cream conversions
+    converts = []
+    convert_ids = set()
+    for item in data['converts']:
+        where = f'convert {item.get("id")!r}'
+        check(isinstance(item.get('id'), str) and item['id'] not in convert_ids and item['id'] not in building_ids and item['id'] not in resource_ids, f'{where} needs a unique id')
+        attribute_id(item['id'], where)
+        convert_ids.add(item['id'])
+        check(item.get('panel') in PANELS, f'{where} panel should be one of {", ".join(PANELS)}')
+        buy, costs = pairs(resource_ids, item.get('cost'), f'{where} cost')
+        check(len(buy) > 0, f'{where} needs a cost')
+        positive(costs, f'{where} cost')
+        check(isinstance(item.get('visible'), list) and len(item['visible']) == 2, f'{where} visible should be [id, amount]')
+        converts.append({
+            'id': item['id'], 'text': item.get('text', item['id']), 'description': item.get('description', ''), 'panel': item['panel'],
+            'buy': buy, 'costs': costs, 'makes': index(resource_ids, item.get('makes'), f'{where} makes'),
+            'reward': fixed(item.get('reward'), CENT, f'{where} reward'),
+            'visible': index(resource_ids, item['visible'][0], f'{where} visible'),
+            'visible_value': fixed(item['visible'][1], CENT, f'{where} visible'),
+        })
+
+    # seasons, in the order they follow each other, each one changes the efficiency of some buildings while it lasts
+    seasons = {'ids': [], 'names': [], 'lengths': array('q'), 'changes': []}
+    check(isinstance(data.get('seasons', []), list), 'seasons should be a list')
+    for item in data.get('seasons', []):
+        where = f'season {item.get("id")!r}'
+        check(isinstance(item.get('id'), str) and item['id'] not in seasons['ids'], f'{where} needs a unique id')
+        check(isinstance(item.get('name'), str), f'{where} needs a name')
+        seasons['ids'].append(item['id'])
+        seasons['names'].append(item['name'])
+        seasons['lengths'].append(seconds(item.get('length'), f'{where} length'))
+        seasons['changes'].append(efficiency_changes(building_ids, buildings, item.get('efficiency', []), f'{where} efficiency'))
+
+    # random events, each one has a chance of starting every so often and multiplies what some buildings produce while it lasts
+    events = {'ids': [], 'names': [], 'every': array('q'), 'chances': array('q'), 'lengths': array('q'), 'multipliers': []}
+    check(isinstance(data.get('random_events', []), list), 'random_events should be a list')
+    for item in data.get('random_events', []):
+        where = f'random event {item.get("id")!r}'
+        check(isinstance(item.get('id'), str) and item['id'] not in events['ids'], f'{where} needs a unique id')
+        check(isinstance(item.get('name'), str), f'{where} needs a name')
+        every, length = seconds(item.get('every'), f'{where} every'), seconds(item.get('length'), f'{where} length')
+        check(length <= every, f'{where} length should be at most every, an event is over before it can start again')
+        events['ids'].append(item['id'])
+        events['names'].append(item['name'])
+        events['every'].append(every)
+        events['chances'].append(fixed(item.get('chance'), BASIS, f'{where} chance'))
+        events['lengths'].append(length)
+        events['multipliers'].append(production_multipliers(building_ids, buildings, item.get('production', []), f'{where} production'))
+
+    # the chance that a collect or a conversion gives twice as much
+    lucky = fixed(data.get('lucky', 0), BASIS, 'lucky')
+    return {'resources': resources, 'buildings': buildings, 'converts': converts, 'seasons': seasons, 'random_events': events, 'lucky': lucky}
+
+
+def load(path=CONTENT_PATH):
+    """The compiled tables of the content file at path, from the cache if it's up to date."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw + str(COMPILER_VERSION).encode()).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f'content-{digest}.pickle')
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass # not compiled yet
+    tables = compile_tables(json.loads(raw))
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(tables, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass # the cache only makes the next start faster
+    return tables
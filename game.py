@@ -1,81 +1,140 @@
 """
 Incremental game - GUI project
 Layout idea and concepts are modeled on https://kittensgame.com/web/#
+The game state lives in model.py, the classes here are Tk views of it.
 """
+import concurrent.futures
+import math
+import os
+import random
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk, font, messagebox
 
+import history
+import journal
+import model
+import notation
+import optimizer
+import profiler
+import save
 from tooltip import Hovertip
 
+SAVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'incremental-game.sav')
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile.json') # written by Options > Save profile
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'incremental-game.journal') # every action of this session, see journal.py
+AUTOSAVE_INTERVAL = 60000 # milliseconds between saves
+MAX_CATCH_UP = 600 # most late ticks that are run at once, any more are dropped
+START_TIME = time.perf_counter() # for measuring how long the window takes to be ready
+RECOMMEND_BEAM = 8 # beam width of the search behind Options > Recommend next purchase, see optimizer.py
+GRAPH_SIZE = (480, 140) # pixels of each graph on the Statistics tab
+GRAPH_MARGIN = 20 # pixels around each graph for its labels
 
-class Resource:
+
+def frame_rate(default=10):
+    """Most times per second the views are refreshed, ICG_FRAME_RATE if it's set to a whole number, from 1 to 1000."""
+    try:
+        return min(max(int(os.environ.get('ICG_FRAME_RATE', default)), 1), 1000)
+    except ValueError:
+        return default
+
+
+FRAME_RATE = frame_rate()
+
+
+def rate_text(total):
+    """A per second rate in units as the text of a label, e.g. '+1.5/s', or '' if it rounds to 0."""
+    total = round(total, 2)
+    if total > 0.0:
+        return f'+{notation.compact(total)}/s'
+    if total < 0.0:
+        return f'{notation.compact(total)}/s'
+    return ''
+
+
+class ResourceView:
     """
-    A Resource represnts a resource used to build / create stuff.
-    self.resource counts the quantity of the resource
-    self.per_second counds the per/second increase of the resource
+    Shows a model.Resource.
+    self.resource shows the quantity of the resource
+    self.per_second shows the per/second increase of the resource
     """
 
-    def __init__(self, frame, row, name, max_num, style='TLabel'):
-        self.resource = tk.DoubleVar()
+    def __init__(self, frame, row, resource, style='TLabel'):
+        self.model = resource # the model.Resource being shown
+        self.resource = tk.StringVar()
         self.per_second = tk.StringVar()
         self.text_visible = False # True if the label is visible
         self.frame = frame
         self.row = row
-        self.name = name
+        self.name = resource.name
         self.style = style
-        self.total = 0.0 # used in update_per_second
         self.max_num_var = tk.StringVar() # the maximum value that self.resource can be
-        self.max_num = 0
-        self.update_max_num(max_num) # set the default max_num as the argument max_num
         self.efficiency_bonus_var = tk.StringVar()
-        self.current_efficiency_bonus = 0.0 # used to keep track of what's displayed by efficiency_bonus_var
-
-    def update(self, p):
-        if round(self.resource.get() + p, 2) < 0:
-            self.resource.set(0)
-        else:
-            self.resource.set(min(round(self.resource.get() + p, 2), self.max_num))
+        self.shown = {} # Tk variable -> the value it was last set to
+        self.per_second_hovertip = None # created by show()
+
+    def show(self):
+        if self.style != 'TLabel':
+            self.frame.register_style(self.style) # styles are only configured once they're used
+        # unchanging label, shows the name of the resource
+        ttk.Label(self.frame, text=self.name, style=self.style).grid(column=0, row=self.row, sticky='W')
+        # changing label, shows the amount of the resource
+        ttk.Label(self.frame, textvariable=self.resource).grid(column=1, row=self.row, padx=(10, 0), sticky='E')
+        # changing label, shows the max number of the resource
+        ttk.Label(self.frame, textvariable=self.max_num_var, foreground='#7d7d7d').grid(column=2, row=self.row, sticky='W')
+        # changing label, shows the resource per second, its Hovertip shows where that comes from
+        per_second_label = ttk.Label(self.frame, textvariable=self.per_second)
+        per_second_label.grid(column=3, row=self.row, padx=(0, 5), sticky='W')
+        self.per_second_hovertip = Hovertip(per_second_label, self.sources_text, hover_delay=10)
+        # changing label, shows the efficiency bonus
+        self.efficiency_bonus_label = ttk.Label(self.frame, textvariable=self.efficiency_bonus_var)
+        self.efficiency_bonus_label.grid(column=4, row=self.row, sticky='W')
+        self.text_visible = True # label should now be visible
+
+    def set(self, var, value):
+        """Set a Tk variable only if what it shows changes, every set() is a call into Tcl."""
+        if self.shown.get(var) != value:
+            self.shown[var] = value
+            var.set(value)
+            return True
+        return False
+
+    def refresh(self):
+        """Copy the values of the model.Resource into the Labels."""
+        if not self.model.seen:
+            return # .grid() for resources are called when the resources increment for the very first time
         if not self.text_visible:
-            # unchanging label, shows the name of the resource
-            ttk.Label(self.frame, text=self.name, style=self.style).grid(column=0, row=self.row, sticky='W')
-            # changing label, shows the amount of the resource
-            ttk.Label(self.frame, textvariable=self.resource).grid(column=1, row=self.row, padx=(10, 0), sticky='E')
-            # changing label, shows the max number of the resource
-            ttk.Label(self.frame, textvariable=self.max_num_var, foreground='#7d7d7d').grid(column=2, row=self.row, sticky='W')
-            # changing label, shows the resource per second
-            ttk.Label(self.frame, textvariable=self.per_second).grid(column=3, row=self.row, padx=(0, 5), sticky='W')
-            # changing label, shows the efficiency bonus
-            self.efficiency_bonus_label = ttk.Label(self.frame, textvariable=self.efficiency_bonus_var)
-            self.efficiency_bonus_label.grid(column=4, row=self.row, sticky='W')
-            self.text_visible = True # label should now be visible
-
-    def update_per_second(self, p):
-        self.total = self.total + p
+            self.show()
+        self.set(self.resource, notation.compact(self.model.value))
+        self.set(self.max_num_var, f'/{notation.compact(self.model.max_num)}')
         # update the label showing the resource per second
-        if self.total > 0.0 and round(self.total, 2) > 0.0:
-            self.per_second.set(f'+{round(self.total, 2)}/s')
-        elif self.total < 0.0 and round(self.total, 2) < 0.0:
-            self.per_second.set(f'{round(self.total, 2)}/s')
-        else:
-            self.per_second.set('')
-
-    def update_max_num(self, p):
-        # update label showing the max number of the resource
-        self.max_num = int(self.max_num + p)
-        self.max_num_var.set(f'/{self.max_num}')
-    
-    def update_efficiency_bonus(self, p):
+        if self.set(self.per_second, rate_text(self.model.total)):
+            self.per_second_hovertip.refresh()
         # update label showing the efficiency bonus
-        self.current_efficiency_bonus = self.current_efficiency_bonus + p
-        percentage = int(round(self.current_efficiency_bonus, 2) * 100)
+        percentage = self.model.current_efficiency_bonus // 100
         if percentage > 0:
-            self.efficiency_bonus_var.set(f'[+{percentage}%]')
-            self.efficiency_bonus_label.config(foreground='#008000')
+            if self.set(self.efficiency_bonus_var, f'[+{percentage}%]'):
+                self.efficiency_bonus_label.config(foreground='#008000')
         elif percentage < 0:
-            self.efficiency_bonus_var.set(f'[{percentage}%]')
-            self.efficiency_bonus_label.config(foreground='#ff0000')
+            if self.set(self.efficiency_bonus_var, f'[{percentage}%]'):
+                self.efficiency_bonus_label.config(foreground='#ff0000')
         else:
-            self.efficiency_bonus_var.set('')
+            self.set(self.efficiency_bonus_var, '')
+
+    def sources_text(self):
+        """Text of the per second Hovertip, what each Building adds or takes away every second."""
+        lines = []
+        for building, rate in self.frame.production.breakdown(self.model):
+            count = f'{building.activated_num}/{building.num}' if isinstance(building, model.Converter) else building.num
+            line = f'{building.name} ({count}): {rate_text(model.units(rate, model.RATE))}'
+            effects = self.frame.seasons.describe(building) + self.frame.random_events.describe(building)
+            if effects and self.model in building.new_resources: # efficiency changes what's produced, not what a Converter uses
+                line += f' ({", ".join(f"{name} {change // 100:+}%" for name, change in effects)})'
+            lines.append(line)
+        if self.model.current_efficiency_bonus:
+            lines.append(f'Includes the efficiency bonus of {self.model.current_efficiency_bonus // 100}%')
+        return '\n'.join(lines) or 'Not produced by any building'
 
 
 class ResourceFrame(ttk.Frame):
@@ -84,302 +143,219 @@ class ResourceFrame(ttk.Frame):
     of those Resources, and per_second bonuses.
     """
 
-    def __init__(self, parent):
+    def __init__(self, parent, game):
         super().__init__(parent)
         self.columnconfigure(1, minsize=60)
+        self.production = game.production # the per second Hovertips show its breakdown()
+        self.seasons = game.seasons # and what the season and random events change
+        self.random_events = game.random_events
+
+        self.season_var = tk.StringVar() # the season, the time left until the next one and the random events going on
 
         self.style = ttk.Style()
         self.text_font = font.nametofont('TkTextFont')
-        self.style.configure('Vanilla.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground='#D1BEA8') # bold b/c color is hard to read
-        self.style.configure('Strawberry.TLabel', font=('TkTextFont', self.text_font['size']), foreground='#FC5A8D')
-        self.style.configure('Chocolate.TLabel', font=('TkTextFont', self.text_font['size']), foreground='#7B3F00')
-        self.style.configure('Neapolitan.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground='#808080')
-        self.style.configure('MintChip.TLabel', font=('TkTextFont', self.text_font['size']), foreground='#3EB489')
-        self.style.configure('Cherry.TLabel', font=('TkTextFont', self.text_font['size']), foreground='#DE3163')
-        self.style.configure('FrenchVanilla.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground='#D7BB6F')
-        self.style.configure('Peach.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground="#FFC75D")
-        self.style.configure('CookiesAndCream.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'))
-        self.style.configure('BananaSplit.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground='#BBBA82')
-        self.style.configure('RockyRoad.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground='#5B3F36')
-        self.style.configure('Mango.TLabel', font=('TkTextFont', self.text_font['size'], 'bold'), foreground='#FFB56F')
 
         # resources
         ttk.Label(self, text='Resources').grid(column=0, row=0, columnspan=3, sticky='W')
+        ttk.Label(self, textvariable=self.season_var, foreground='#7d7d7d').grid(column=3, row=0, columnspan=2, sticky='W')
         # .grid() for resources are called when the resources increment for the very first time
-        # milk
-        self.milk = Resource(frame=self, row=1, name='Milk', max_num=5000)
-        # ice cream
-        self.ice_cream = Resource(frame=self, row=2, name='Ice Cream', max_num=800)
-        # vanilla ice cream
-        self.vanilla_i_c = Resource(frame=self, row=3, name='    Vanilla', max_num=400, style='Vanilla.TLabel')
-        # strawberry ice cream
-        self.strawberry_i_c = Resource(frame=self, row=4, name='    Strawberry', max_num=400, style='Strawberry.TLabel')
-        # chocolate ice cream
-        self.chocolate_i_c = Resource(frame=self, row=5, name='    Chocolate', max_num=400, style='Chocolate.TLabel')
-        # neapolitan ice cream
-        self.neapolitan_i_c = Resource(frame=self, row=6, name='    Neapolitan', max_num=400, style='Neapolitan.TLabel')
-        # mint chocolate chip ice cream
-        self.mint_chip_i_c = Resource(frame=self, row=7, name='    Mint Chip', max_num=400, style='MintChip.TLabel')
-        # cherry ice cream
-        self.cherry_i_c = Resource(frame=self, row=8, name='    Cherry', max_num=400, style='Cherry.TLabel')
-        # french vanilla ice cream
-        self.french_vanilla_i_c = Resource(frame=self, row=9, name='    French Vanilla', max_num=400, style='FrenchVanilla.TLabel')
-        # cookies and cream ice cream
-        self.cookies_and_cream_i_c = Resource(frame=self, row=10, name='    Cookies and Cream', max_num=400, style='CookiesAndCream.TLabel')
-        # peach ice cream
-        self.peach_i_c = Resource(frame=self, row=11, name='    Peach', max_num=400, style='Peach.TLabel')
-        # banana split ice cream
-        self.banana_split = Resource(frame=self, row=12, name='    Banana Split', max_num=400, style='BananaSplit.TLabel')
-        # rocky road ice cream
-        self.rocky_road = Resource(frame=self, row=13, name='    Rocky Road', max_num=400, style='RockyRoad.TLabel')
-        # mango ice cream
-        self.mango_i_c = Resource(frame=self, row=14, name='    Mango', max_num=400, style='Mango.TLabel')
-        # TODO: add more resources here
-
-        # TODO: maybe make a hovertip over the per second labels to show where the per seconds are coming from
         # bonuses / combos
         # TODO: add new labels for combos or bonuses
 
         # keep a list of all resources
-        self.resource_list = [
-            self.milk, self.ice_cream, self.vanilla_i_c, self.strawberry_i_c, self.chocolate_i_c,
-            self.neapolitan_i_c, self.mint_chip_i_c, self.cherry_i_c, self.french_vanilla_i_c,
-            self.cookies_and_cream_i_c, self.peach_i_c, self.banana_split, self.rocky_road, self.mango_i_c,
-        ]
-
-
-class Ingredient(Resource):
-    
-    def __init__(self, frame, row, name, max_num, style='TLabel'):
-        super().__init__(frame, row, name, max_num, style)
-        self.frame = frame
-
-    def update(self, p):
+        self.styles = {} # name -> (foreground, bold) of the styles not configured yet
+        self.resource_list = []
+        resources = game.tables['resources']
+        for resource_id, ingredient, style in zip(resources['ids'], resources['ingredient'], resources['styles']):
+            if ingredient:
+                continue # shown by IngredientFrame
+            style_name = 'TLabel'
+            if style is not None: # coloured ice cream flavours, bold if the colour is hard to read
+                style_name = f'{resource_id}.TLabel'
+                self.styles[style_name] = style
+            resource_view = ResourceView(self, len(self.resource_list) + 1, getattr(game, resource_id), style=style_name)
+            self.resource_list.append(resource_view)
+
+
+    def show_season(self, ticks):
+        """Show the season at ticks and how long it lasts, and the random events going on."""
+        parts = [self.random_events.names[e] for e in self.random_events.active()]
+        if self.seasons.current is not None:
+            parts.insert(0, f'{self.seasons.names[self.seasons.current]}, {notation.clock(self.seasons.left(ticks))} left')
+        self.season_var.set(' · '.join(parts))
+
+    def register_style(self, name):
+        """Configure the ttk style called name the first time it's used."""
+        style = self.styles.pop(name, None)
+        if style is not None:
+            foreground, bold = style
+            self.style.configure(name, font=('TkTextFont', self.text_font['size']) + (('bold',) if bold else ()))
+            if foreground:
+                self.style.configure(name, foreground=foreground)
+
+
+class IngredientView(ResourceView):
+
+    def show(self):
         if not self.frame.ingredient_lb_visible:
             self.frame.ingredient_lb.grid()
             self.frame.ingredient_lb_visible = True
-        super().update(p)
+        super().show()
 
 
 class IngredientFrame(ttk.Frame):
     """Basically another ResourceFrame."""
 
-    def __init__(self, parent):
+    def __init__(self, parent, game):
         super().__init__(parent)
         self.columnconfigure(1, minsize=60)
+        self.production = game.production
+        self.seasons = game.seasons
+        self.random_events = game.random_events
 
         # ingredients label
         self.ingredient_lb = ttk.Label(self, text='Ingredients')
         self.ingredient_lb.grid(column=0, row=0, sticky='W')
         self.ingredient_lb.grid_remove()
         self.ingredient_lb_visible = False # change this when an Ingredient increases for the first time
-        
-        # .grid() for ingredients are called when ingredients increment for the very first time
-        # vanilla (spice)
-        self.vanilla_spice = Ingredient(frame=self, row=1, name='Vanilla (spice)', max_num=500)
-        # strawberry (fruit)
-        self.strawberry_fruit = Ingredient(frame=self, row=2, name='Strawberry (fruit)', max_num=500)
-        # chocolate (food)
-        self.chocolate_food = Ingredient(frame=self, row=3, name='Chocolate (food)', max_num=500)
-        # peppermint
-        self.peppermint = Ingredient(frame=self, row=4, name='Peppermint', max_num=500)
-        # cherry (fruit)
-        self.cherry_fruit = Ingredient(frame=self, row=5, name='Cherry (fruit)', max_num=500)
-        # egg
-        self.egg = Ingredient(frame=self, row=6, name='Egg', max_num=500)
-        # cookie
-        self.sandwich_cookie = Ingredient(frame=self, row=7, name='Sandwich Cookie', max_num=500)
-        # peach (fruit)
-        self.peach_fruit = Ingredient(frame=self, row=8, name='Peach (fruit)', max_num=500)
-        # banana
-        self.banana = Ingredient(frame=self, row=9, name='Banana', max_num=500)
-        # almond
-        self.almond = Ingredient(frame=self, row=10, name='Almond', max_num=500)
-        # marshmallow
-        self.marshmallow = Ingredient(frame=self, row=11, name='Marhsmallow', max_num=500)
-        # mango (fruit)
-        self.mango_fruit = Ingredient(frame=self, row=12, name='Mango', max_num=500)
-
-        # TODO: add more ingredients here
 
+        # .grid() for ingredients are called when ingredients increment for the very first time
         # keep list of all ingredients
-        self.ingredient_list = [
-            self.vanilla_spice, self.strawberry_fruit, self.chocolate_food, self.peppermint,
-            self.cherry_fruit, self.egg, self.sandwich_cookie, self.peach_fruit, self.banana,
-            self.almond, self.marshmallow, self.mango_fruit,
-        ]
+        self.ingredient_list = []
+        resources = game.tables['resources']
+        for resource_id, ingredient in zip(resources['ids'], resources['ingredient']):
+            if ingredient:
+                ingredient_view = IngredientView(self, len(self.ingredient_list) + 1, getattr(game, resource_id))
+                self.ingredient_list.append(ingredient_view)
 
 
-class Building:
+class BuildingView:
     """
-    For buildings that can be bought and sold.
-    Standard Building increases production of new_resource by +bonus_val/s
+    Button for buying a model.Building. The Button is only created once the
+    Building becomes visible, most of them stay hidden for a long time.
     """
-    # TODO: is r_frame a necessary parameter? can it be deleted?
-    # TODO: make new_resource and bonus_val into sequence types
-    def __init__(self, parent, r_frame, buy_resources, new_resources, costs, cost_mults, bonus_vals, name, col, row, visible_resource, visible_value, colspan=3):
+    BUY_MAX = 0 # value of buy_num for buying as many as can be afforded
+    padx = 5 # padding of the Button
+    game = None # the model.Game, every action goes through its act(), set by ControlPanelFrame
+
+    def __init__(self, parent, building, col, row, colspan=3):
         self.parent = parent # frame Button will be on
-        self.r_frame = r_frame # to access the ResourceFrame
-        self.buy_resources = buy_resources # Resource(s) that are used to buy the building
-        self.new_resources = new_resources # Resource(s) that the building generates
-        self.num = 0 # number of buildings owned
-        self.costs = costs # cost to build a building
-        self.cost_mults = cost_mults # how much the price increases each time a new bulding is bought
-        self.bonus_vals = bonus_vals # the bonus the building applies to each resource in new_resources, every new_resource has an associated bonus_val, same index
-        self.name = name # name of building
+        self.building = building # the model.Building bought by the Button
+        self.index = self.game.buildings.index(building)
+        self.name = building.name
         self.col = col
         self.row = row
         self.colspan = colspan
-        self.button = ttk.Button(self.parent, text=self.name, state='disabled', width=25, command=self.buy)
-        self.button.grid(column=self.col, row=self.row, columnspan=self.colspan, padx=5, pady=5, sticky='WE')
-        self.button.grid_remove() # hide the button until certain requirements are met
+        self.button = None # created by make_visible()
         self.button_visible = False # True if the Button for the Building is visible
-        self.visible_resource = visible_resource # the Resource used to tell if the button should be visible
-        self.visible_value = visible_value # number of visible_resources needed to make button visible
-        self.efficiency_bonus = 1.0 # modify the bonus given to use(), this bonus applies to the building as a whole, all things the buliding produces is affected
+        self.enabled = False # True if the Button is not disabled
+        self.description = '' # text of the Hovertip
+        self.hovertip = None # created with the Button
 
     def buy(self):
-        # deduct cost from Resource(s) to buy building
-        for buy_resource, cost in zip(self.buy_resources, self.costs):
-            buy_resource.update(-cost)
-        self.num = self.num + 1 # increase the number of this Building
-        self.button['text'] = f'{self.name} ({self.num})' # update quantity on this Building's button
-        for cost, cost_mult, i in zip(self.costs, self.cost_mults, range(len(self.costs))):
-            self.costs[i] = cost * cost_mult # increase each cost by cost_mult
-        for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
-            new_resource.update_per_second(bonus_val * self.efficiency_bonus) # increase each Resource the building generates
-        self.update_hovertip()
+        n = BuildingView.buy_num.get()
+        if self.game.act(model.BUY, self.index, None if n == BuildingView.BUY_MAX else n) == 0:
+            return # nothing could be afforded
+        self.update_text() # update quantity on this Building's button
         self.hovertip.showtip()
+        self.hovertip.refresh() # costs have changed
 
     def sell(self, s):
-        # s is the number of hosts to sell
-        for j in range(s):
-            for cost, cost_mult, i in zip(self.costs, self.cost_mults, range(len(self.costs))):
-                self.costs[i] = cost / cost_mult # update the cost
-                self.buy_resources[i].update(cost / cost_mult) # refund the user
-            for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
-                new_resource.update_per_second(-bonus_val * self.efficiency_bonus) # update per second Label
-            self.num = self.num - 1 # update the number of Building
-        if self.num != 0:
-            self.button['text'] = f'{self.name} ({self.num})'
-        else:
-            self.button['text'] = self.name # Button doesn't show quantity if quantity is 0
+        self.game.act(model.SELL, self.index, s)
+        self.update_text()
 
-    def available(self):
-        for buy_resource, cost in zip(self.buy_resources, self.costs):
-            if (buy_resource.resource.get() < cost):
-                self.button.state(['disabled'])
-                break
-        else:
-            self.button.state(['!disabled'])
+    def text(self):
+        if self.building.num != 0:
+            return f'{self.name} ({self.building.num})'
+        return self.name # Button doesn't show quantity if quantity is 0
 
-    def use(self):
-        for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
-            new_resource.update(self.num * bonus_val * self.efficiency_bonus) # increase each new_resource
+    def update_text(self):
+        if self.button is not None:
+            self.button['text'] = self.text()
+
+    def watched(self):
+        """The model.Resources that available() depends on."""
+        return [*self.building.buy_resources, self.building.visible_resource]
+
+    def available(self):
+        if not self.button_visible:
+            if not self.building.is_visible():
+                return
+            self.make_visible()
+        enabled = self.building.can_buy()
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.button.state(['!disabled' if enabled else 'disabled'])
 
     def create_hovertip(self, description):
         self.description = description
-        self.hovertip = HovertipButtons(self, description)
 
     def update_hovertip(self):
-        self.hovertip.hidetip()
-        self.hovertip = HovertipButtons(self, self.description)
+        if self.hovertip is not None:
+            self.hovertip.refresh()
 
     def make_visible(self):
-        self.button.grid()
+        self.button = ttk.Button(self.parent, text=self.text(), state='disabled', width=25, command=self.buy)
+        self.button.grid(column=self.col, row=self.row, columnspan=self.colspan, padx=self.padx, pady=5, sticky='WE')
         self.button_visible = True
+        self.hovertip = HovertipButtons(self.button, self.building, self.description)
 
 
-class Converter(Building):
+class ConverterView(BuildingView):
     """
-    Buildings but the number of buildings activated can be changed
-    by the user.
-
-    While activated, a Converter deducts from old_resource to add
-    some value to the new_resource.
+    Button for buying a model.Converter, along with '+' and '-' Buttons
+    that change the number of Converters activated.
     """
-    # TODO: modify Converter to allow converting old_resources into multiple new_resources
-    def __init__(self, parent, r_frame, buy_resources, old_resources, new_resources, costs, cost_mults, bonus_vals, conversion_costs, name, col, row, visible_resource, visible_value, colspan=1):
-        super().__init__(parent, r_frame, buy_resources, new_resources, costs, cost_mults, bonus_vals, name, col, row, visible_resource, visible_value, colspan)
-        self.old_resources = old_resources # Resource that gets converted into new_resource
-        self.new_resources = new_resources # Resources converted from old_resource
-        self.conversion_costs = conversion_costs # number(s) of old_resources spent for each conversion
-        # Building Button
-        self.button.grid(column=col, row=row, padx=(5, 0), pady=5, sticky='WE')
-        self.button.grid_remove()
-        self.activated_num = 0 # number of Converters activated
+    padx = (5, 0)
+
+    def __init__(self, parent, building, col, row, colspan=1):
+        super().__init__(parent, building, col, row, colspan)
+        self.activated_up_b = None # created with the Building Button
+        self.activated_down_b = None
+
+    def make_visible(self):
+        super().make_visible()
         # increase the number of Converters activated
         self.activated_up_b = ttk.Button(self.parent, text='+', state='disabled', width=1, command=lambda: self.activated_increase(1))
-        self.activated_up_b.grid(column=col+1, row=row, sticky='WE')
-        self.activated_up_b.grid_remove() # show when at least 1 Converter is owned
+        self.activated_up_b.grid(column=self.col+1, row=self.row, sticky='WE')
         # decrease the number of Converters activated
         self.activated_down_b = ttk.Button(self.parent, text='-', state='disabled', width=1, command=lambda: self.activated_increase(-1))
-        self.activated_down_b.grid(column=col+2, row=row, padx=(0, 5), sticky='WE')
-        self.activated_down_b.grid_remove() # show at same time as activated_up_b
-        self.previous_activated_num = self.activated_num # used in available()
+        self.activated_down_b.grid(column=self.col+2, row=self.row, padx=(0, 5), sticky='WE')
+        if self.building.num == 0: # show when at least 1 Converter is owned, a loaded game can already have some
+            self.activated_up_b.grid_remove()
+            self.activated_down_b.grid_remove()
 
     def activated_increase(self, i):
-        self.activated_num = self.activated_num + i
-        self.button['text'] = f'{self.name} ({self.activated_num}/{self.num})'
+        self.game.act(model.ACTIVATE, self.index, i)
+        self.update_text()
 
     def buy(self):
-        # deduct cost from Resource(s) to buy building
-        for buy_resource, cost in zip(self.buy_resources, self.costs):
-            buy_resource.update(-cost)
-        self.num = self.num + 1 # increase the number of this Converter
-        self.activated_increase(1) # when buying a new Converter, it is activated by default
-        self.button['text'] = f'{self.name} ({self.activated_num}/{self.num})' # update button's text to show number activated & total quantity
         self.activated_up_b.grid()
         self.activated_down_b.grid()
-        for cost, cost_mult, i in zip(self.costs, self.cost_mults, range(len(self.costs))):
-            self.costs[i] = cost * cost_mult # increase each cost of Converter by cost_mult
-        self.update_hovertip()
-        self.hovertip.showtip()
+        super().buy()
 
-    def sell(self, s):
-        # s is the number of hosts to sell
-        for i in range(s):
-            for cost, cost_mult, i in zip(self.costs, self.cost_mults, range(len(self.costs))):
-                self.costs[i] = cost / cost_mult # update the cost
-                self.buy_resources[i].update(cost / cost_mult) # refund the user
-            self.num = self.num - 1 # update the number of Building
-            if self.activated_num > self.num: # when maxmium Converters are being used
-                self.activated_num = self.activated_num - 1
-        if self.num != 0:
-            self.button['text'] = f'{self.name} ({self.activated_num}/{self.num})'
-        else:
-            self.button['text'] = self.name # Button doesn't show quantity if quantity is 0
-
-    def use(self):
-        for old_resource, conversion_cost in zip(self.old_resources, self.conversion_costs):
-            if old_resource.resource.get() + (self.activated_num * -conversion_cost) < 0:
-                break # if there is ever not enough old_resources for the full conversion, stop the conversion
-        else: # no break
-            for old_resource, conversion_cost in zip(self.old_resources, self.conversion_costs):
-                # no need to check if updating results in neagtive old_resource b/c it was done above
-                old_resource.update(self.activated_num * -conversion_cost)
-            for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
-                new_resource.update(self.activated_num * bonus_val * self.efficiency_bonus) # add each new_resource for a conversion
+    def text(self):
+        if self.building.num != 0:
+            # show number activated & total quantity
+            return f'{self.name} ({self.building.activated_num}/{self.building.num})'
+        return self.name # Button doesn't show quantity if quantity is 0
 
     def available(self):
         # whether or not the Converter can be bought
-        for buy_resource, cost in zip(self.buy_resources, self.costs):
-            if (buy_resource.resource.get() < cost):
-                self.button.state(['disabled'])
-                break
-        else: # no break
-            self.button.state(['!disabled'])
-        
-        if self.num > 0:
+        super().available()
+        if not self.button_visible:
+            return
+
+        if self.building.num > 0:
             # activated up button
-            if self.activated_num < self.num:
+            if self.building.activated_num < self.building.num:
                 # less than maximum number of Converters activated
                 self.activated_up_b.state(['!disabled'])
             else:
                 # maximum number of Converters activated
                 self.activated_up_b.state(['disabled'])
             # activated down Button
-            if self.activated_num > 0:
+            if self.building.activated_num > 0:
                 # more than 0 activated Converters
                 self.activated_down_b.state(['!disabled'])
             else:
@@ -388,169 +364,67 @@ class Converter(Building):
         else: # if there are no Converters, hide the '+' and '-' Buttons
             self.activated_up_b.grid_remove()
             self.activated_down_b.grid_remove()
-        # update the per second labels 
-        diff = self.previous_activated_num - self.activated_num
-        if diff > 0: # previous is higher than current
-            sign = 1
-        elif diff < 0: # previous is lower than current
-            sign = -1
-        for i in range(abs(diff)): # if diff == 0, then range(0)
-            for old_resource, conversion_cost in zip(self.old_resources, self.conversion_costs):
-                old_resource.update_per_second(sign * conversion_cost) # update to show lower/higher cost
-            for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
-                new_resource.update_per_second(sign * -1 * bonus_val * self.efficiency_bonus) # update to show lower/higher increase
-        self.previous_activated_num = self.activated_num # update for next time
-
-
-class StorageBuilding(Building):
-    """Building that increases the maximum amount of a sequence of Resources."""
-
-    def __init__(self, parent, r_frame, buy_resources, costs, cost_mults, name, col, row, visible_resource, visible_value, expand_resources, expand_vals, colspan=3):
-        # TODO: is there a way to do this w/o sending self.r_frame.milk? Maybe there should be an even simpler class than Buliding
-        #       that doesn't take a new_resource 
-        # new_resource and bonus_val won't be used. send self.r_frame.milk as new_resource
-        # and have bonus_val as 0, so Building's buy(), sell(), and use() won't change self.r_frame.milk
-        super().__init__(parent, r_frame, buy_resources, (r_frame.milk,), costs, cost_mults, [0], name, col, row, visible_resource, visible_value, colspan)
-        self.expand_resources = expand_resources # sequence of resources whos max_num is to be expanded
-        self.expand_vals = expand_vals # sequence of values to expand each resource by
-
-    def buy(self):
-        for expand_resource, expand_val in zip(self.expand_resources, self.expand_vals):
-            expand_resource.update_max_num(expand_val)
-        super().buy()
-
-    def sell(self, s):
-        for i in range(s):
-            for expand_resource, expand_val in zip(self.expand_resources, self.expand_vals):
-                expand_resource.update_max_num(-expand_val)
-        super().sell(s)
-
-
-class EfficiencyBuilding(Building):
-    """
-    Building that improves the production of a sequence of Buildings'
-    new resources by a sequence of percentages.
-    """
-
-    def __init__(self, parent, r_frame, buy_resources, costs, cost_mults, name, col, row, visible_resource, visible_value, applied_buildings, efficiency_increases, colspan=3):
-        # simlar to StorageBuilding, a Resource is not being directly increased because of this Building
-        # this Building only modifies the production of other Buildings
-        self.applied_buildings = applied_buildings
-        self.efficiency_increases = efficiency_increases
-        self.new_resources = []
-        self.bonus_vals = []
-        # add every new_resource and bonus_val from every applied_building to new_resources and bonus_vals
-        for building in applied_buildings:
-            for new_resource, bonus_val in zip(building.new_resources, building.bonus_vals):
-                self.new_resources.append(new_resource)
-                self.bonus_vals.append(bonus_val)
-        super().__init__(parent, r_frame, buy_resources, self.new_resources, costs, cost_mults, self.bonus_vals, name, col, row, visible_resource, visible_value, colspan)
-
-    def buy(self):
-        # deduct cost from Resource(s) to buy building
-        for buy_resource, cost in zip(self.buy_resources, self.costs):
-            buy_resource.update(-cost)
-        self.num = self.num + 1 # increase the number of this Building
-        self.button['text'] = f'{self.name} ({self.num})' # update quantity on this Building's button
-        for cost, cost_mult, i in zip(self.costs, self.cost_mults, range(len(self.costs))):
-            self.costs[i] = cost * cost_mult # increase each cost by cost_mult
-        for building, efficiency_increase in zip(self.applied_buildings, self.efficiency_increases): # increase efficiency_bonus of every Building in self.applied_buildings
-            building.efficiency_bonus += efficiency_increase # increase efficiency_bonus
-            for new_resource, bonus_val in zip(building.new_resources, building.bonus_vals):
-                new_resource.update_efficiency_bonus(efficiency_increase) # update the [+x%] label
-                new_resource.update_per_second(building.num * bonus_val * efficiency_increase) # update per second label
-        self.update_hovertip()
-        self.hovertip.showtip()
-
-    def sell(self, s):
-        # s is the number of hosts to sell
-        for i in range(s):
-            for cost, cost_mult, i in zip(self.costs, self.cost_mults, range(len(self.costs))):
-                self.costs[i] = cost / cost_mult # update the cost
-                self.buy_resources[i].update(self.costs[i]) # refund the user
-            for building, efficiency_increase in zip(self.applied_buildings, self.efficiency_increases): # decrease efficiency_bonus of every Building in self.applied_buildings
-                building.efficiency_bonus -= efficiency_increase # decrease efficiency_bonus
-                for new_resource, bonus_val in zip(building.new_resources, building.bonus_vals):
-                    new_resource.update_efficiency_bonus(-efficiency_increase) # update the [+%] label
-                    new_resource.update_per_second(building.num * bonus_val * -efficiency_increase) # update per second label
-            self.num = self.num - 1 # update the number of Building
-        if self.num != 0:
-            self.button['text'] = f'{self.name} ({self.num})'
-        else:
-            self.button['text'] = self.name # Button doesn't show quantity if quantity is 0
-
-    def use(self):
-        pass # do nothing
 
 
-class StorageAndEfficiencyBuilding(EfficiencyBuilding):
-    """Building with that increases both storage and efficiency"""
-
-    # copying code from StorageBuilding rather than trying to do multiple inheritance stuff
-    def __init__(self, parent, r_frame, buy_resources, costs, cost_mults, name, col, row, visible_resource, visible_value, applied_buildings, efficiency_increases, expand_resources, expand_vals,  colspan=3):
-        super().__init__(parent, r_frame, buy_resources, costs, cost_mults, name, col, row, visible_resource, visible_value, applied_buildings, efficiency_increases)
-        self.expand_resources = expand_resources # sequence of resources whos max_num is to be expanded
-        self.expand_vals = expand_vals # sequence of values to expand each resource by
-        self.bought_before = False # True if the StorageAndEfficiencyBuilding has been bought before
+class SpecialBuildingView(BuildingView):
+    """Button for the model.StorageAndEfficiencyBuilding, the last building in the game."""
 
     def buy(self):
-        for expand_resource, expand_val in zip(self.expand_resources, self.expand_vals):
-            expand_resource.update_max_num(expand_val)
+        bought_before = self.building.bought_before
         super().buy()
-        if not self.bought_before:
+        if not bought_before:
             messagebox.showinfo(message="Congratulations!", detail="Thanks for playing!\nYou've bought the last building in the game.\nYou can keep playing, but there's nothing else to discover.")
-            self.bought_before = True
 
-    def sell(self, s):
-        for i in range(s):
-            for expand_resource, expand_val in zip(self.expand_resources, self.expand_vals):
-                expand_resource.update_max_num(-expand_val)
-        super().sell(s)
 
-
-class Convert:
+class ConvertView:
     """Makes a Button that exchanges some old resource for a new resource."""
-    achievement_bonus = 1.0 # achievemnt bonus applies to all ice cream conversions
-
-    def __init__(self, parent, text, buy_resources, new_resource, costs, reward, col, row, visible_resource, visible_value, colspan=1):
-        self.buy_resources = buy_resources # Resource(s) that gets converted into new_resource
-        self.new_resource = new_resource # Resource converted from buy_resource
-        self.costs = costs # number of buy_resources spent for each conversion
-        self.reward = reward # number of new_resources received for each conversion
-        self.button = ttk.Button(parent, text=text, state='disabled', width=25, command=self.convert)
-        self.button.grid(column=col, row=row, columnspan=colspan, padx=5, pady=5, sticky='WE')
-        self.button.grid_remove() # hide the button until certain requirements are met
+    CONVERT_MAX = 0 # value of convert_num for converting as much as possible
+    CONVERT_CUSTOM = -1 # value of convert_num for converting the number typed in custom_num
+    game = None # the model.Game, set by ControlPanelFrame
+
+    def __init__(self, parent, convert, text, col, row, colspan=1):
+        self.convert = convert # the model.Convert used by the Button
+        self.index = self.game.converts.index(convert)
+        self.parent = parent
+        self.text = text
+        self.col = col
+        self.row = row
+        self.colspan = colspan
+        self.button = None # created by make_visible(), once the requirements are met
         self.button_visible = False # True if the Button for the Building is visible
-        self.visible_resource = visible_resource # the Resource used to tell if the button should be visible
-        self.visible_value = visible_value # number of visible_resources needed to make button visible
-
-    def convert(self):
-        # send buy_resources as a tuple e.g. (ice_cream, vanilla_spice)
-        # send costs as a tuple e.g. (3, 10)
-        for i in range(Convert.convert_num.get()):
-            for buy_resource, cost in zip(self.buy_resources, self.costs):
-                if buy_resource.resource.get() - cost < 0:
-                    break # if there is ever not enough buy_resources for the full conversion, stop the conversion
-            else: # no break
-                for buy_resource, cost in zip(self.buy_resources, self.costs):
-                    # no need to check if updating results in neagtive buy_resource b/c it was done above
-                    buy_resource.update(-cost)
-                self.new_resource.update(self.reward * Convert.achievement_bonus)
+        self.enabled = False # True if the Button is not disabled
+        self.description = '' # text of the Hovertip
+
+    def convert_(self):
+        n = ConvertView.convert_num.get()
+        if n == ConvertView.CONVERT_MAX:
+            n = None # model.Convert.convert() converts as much as possible
+        elif n == ConvertView.CONVERT_CUSTOM:
+            n = min(int(ConvertView.custom_num.get() or 0), 2**62) # the Entry only allows digits, at most what a journal record holds
+        self.game.act(model.CONVERT, self.index, n)
+
+    def watched(self):
+        """The model.Resources that available() depends on."""
+        return [*self.convert.buy_resources, self.convert.visible_resource]
 
     def available(self):
-        for buy_resource, cost in zip(self.buy_resources, self.costs):
-            if (buy_resource.resource.get() < cost):
-                self.button.state(['disabled'])
-                break
-        else:
-            self.button.state(['!disabled'])
+        if not self.button_visible:
+            if not self.convert.is_visible():
+                return
+            self.make_visible()
+        enabled = self.convert.can_convert()
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.button.state(['!disabled' if enabled else 'disabled'])
 
     def create_hovertip(self, description):
-        self.hovertip = HovertipButtons(self, description)
+        self.description = description
 
     def make_visible(self):
-        self.button.grid()
+        self.button = ttk.Button(self.parent, text=self.text, state='disabled', width=25, command=self.convert_)
+        self.button.grid(column=self.col, row=self.row, columnspan=self.colspan, padx=5, pady=5, sticky='WE')
         self.button_visible = True
+        self.hovertip = HovertipButtons(self.button, self.convert, self.description)
 
 
 class ControlPanelFrame(ttk.Frame):
@@ -558,108 +432,57 @@ class ControlPanelFrame(ttk.Frame):
 
     def __init__(self, parent, main):
         super().__init__(parent)
-        self.r_frame = main.r_frame
-        self.i_frame = main.i_frame
+        game = main.game
+        BuildingView.game = ConvertView.game = game
 
         # button for collecting milk
-        self.collect_b = ttk.Button(self, text='Collect', width=25, command=lambda: self.r_frame.milk.update(1))
+        self.collect_b = ttk.Button(self, text='Collect', width=25, command=lambda: game.act(model.COLLECT))
         self.collect_b.grid(column=0, row=0, columnspan=3, padx=5, pady=5, sticky='EW')
         self.collect_b_hovertip = Hovertip(self.collect_b, 'Collect some milk...', hover_delay=10)
         # convert milk to ice cream
-        self.convert_milk_i_c = Convert(self, 'Make ice cream', (self.r_frame.milk,), self.r_frame.ice_cream, [25], 1, 3, 0, self.r_frame.milk, 0, 3)
-        self.convert_milk_i_c.make_visible() # make this button visible immediately
-        Convert.convert_num = tk.IntVar(value=1)
-        self.convert_milk_i_c.create_hovertip('Uses milk to create plain ice cream')
-        # cow
-        self.cow = Building(self, self.r_frame, (self.r_frame.milk,), (self.r_frame.milk,), [10], [1.12], [0.63], 'Cow', 0, 1, self.r_frame.milk, 3)
-        self.cow.create_hovertip('Get a cow')
-        # factory
-        self.factory = Converter(self, self.r_frame, (self.r_frame.ice_cream,), (self.r_frame.milk,), (self.r_frame.ice_cream,), [10], [1.75], [1], (self.convert_milk_i_c.costs[0]/10,), 'Factory', 3, 1, self.r_frame.ice_cream, 1)
-        self.factory.create_hovertip("Converts milk to ice cream.\nFactories stop running if you don't have enough milk\nand continue running when you have enough.\nFactories still work even without room for more ice cream.")
-        # vanilla plantation
-        self.vanilla_plantation = Building(self, self.r_frame, (self.r_frame.ice_cream,), (self.i_frame.vanilla_spice,), [10], [1.29], [0.15], 'Vanilla Plantation', 0, 2, self.r_frame.ice_cream, 1)
-        self.vanilla_plantation.create_hovertip('Plantation for growing Vanilla planifolia')
-        # strawberry field
-        self.strawberry_field = Building(self, self.r_frame, (self.r_frame.ice_cream,), (self.i_frame.strawberry_fruit,), [10], [1.3], [0.15], 'Strawberry Field', 3, 2, self.r_frame.ice_cream, 1)
-        self.strawberry_field.create_hovertip('Produces strawberries')
-        # chocolate processor
-        self.chocolate_processor = Building(self, self.r_frame, (self.r_frame.ice_cream,), (self.i_frame.chocolate_food,), [10], [1.31], [0.15], 'Chocolate Processor', 0, 3, self.r_frame.ice_cream, 1)
-        self.chocolate_processor.create_hovertip('Build facilities to order and process cocoa beans')
-        # peppermint farm
-        self.peppermint_farm = Building(self, self.r_frame, (self.r_frame.neapolitan_i_c,), (self.i_frame.peppermint,), [3], [1.14], [0.22], 'Peppermint Farm', 3, 3, self.r_frame.neapolitan_i_c, 1)
-        self.peppermint_farm.create_hovertip('Cultivate peppermint (Mentha x piperita)')
-        # cold storage
-        cold_expand_vals = [] # contains amount to increase each resource in resource_list by
-        for resource in self.r_frame.resource_list:
-            cold_expand_vals.append(resource.max_num) # double the max amount of each resource
-        self.cold_storage = StorageBuilding(self, self.r_frame, (self.r_frame.mint_chip_i_c,), [12], [1.25], 'Cold Storage', 0, 4, self.r_frame.mint_chip_i_c, 1, self.r_frame.resource_list, cold_expand_vals)
-        self.cold_storage.create_hovertip('Provides space to store all cold resources.')
-        # milking machine
-        self.milking_machine = EfficiencyBuilding(self, self.r_frame, (self.r_frame.ice_cream, self.r_frame.neapolitan_i_c), [100, 6], [1.15, 1.5], 'Milking Machine', 3, 4, self.r_frame.mint_chip_i_c, 1, [self.cow], [0.20])
-        self.milking_machine.create_hovertip('Each machine improves the milk output of your cows by 20%')
-        # cherry orchard
-        self.cherry_orchard = Building(self, self.r_frame, (self.r_frame.neapolitan_i_c, self.r_frame.mint_chip_i_c), (self.i_frame.cherry_fruit,), [5, 7], [1.2, 1.18], [0.18], 'Cherry Orchard', 0, 5, self.r_frame.mint_chip_i_c, 1)
-        self.cherry_orchard.create_hovertip('Orchard for growing cherries')
-        # warehouse
-        warehouse_expand_vals = [] # contains amount to increase each ingredient in ingredient_list by
-        for ingredient in self.i_frame.ingredient_list:
-            warehouse_expand_vals.append(ingredient.max_num) # double the max amount of each ingredient
-        self.warehouse = StorageBuilding(self, self.r_frame, (self.r_frame.ice_cream, self.r_frame.strawberry_i_c, self.r_frame.cherry_i_c), [125, 15, 5], [1.5, 1.2, 1.15], 'Warehouse', 3, 5, self.r_frame.cherry_i_c, 1, self.i_frame.ingredient_list, warehouse_expand_vals)
-        self.warehouse.create_hovertip('Provides space to store your ingredients')
-        # neapolitan investor
-        self.neapolitan_investor = EfficiencyBuilding(self, self.r_frame, (self.r_frame.neapolitan_i_c,), [7], [1.14], 'Neapolitan Investor', 0, 6, self.r_frame.cherry_i_c, 1, (self.vanilla_plantation, self.strawberry_field, self.chocolate_processor), (0.4, 0.4, 0.4))
-        self.neapolitan_investor.create_hovertip('Invest in the Neapolitan ice cream trade')
-        # chicken coop
-        self.chicken_coop = Building(self, self.r_frame, (self.r_frame.cherry_i_c,), (self.i_frame.egg,), [5], [1.18], [0.72], 'Chicken Coop', 3, 6, self.r_frame.cherry_i_c, 1)
-        self.chicken_coop.create_hovertip('Build a coop to get eggs from chickens')
-        # cookie manufacturer
-        self.cookie_manufacturer = Converter(self, self.r_frame, (self.r_frame.chocolate_i_c, self.r_frame.french_vanilla_i_c), (self.r_frame.milk, self.i_frame.chocolate_food), (self.i_frame.sandwich_cookie,), [10, 5], [1.2, 1.18], [0.25], [3, 4], 'Cookie Manufacturer', 0, 7, self.r_frame.french_vanilla_i_c, 1)
-        self.cookie_manufacturer.create_hovertip('Build a manufacturer that specialises in creating sandwich cookies.\nManufacturers stop running if you run out of chocolate and\nfrench vanilla ice cream and continue when you have enough.\nManufacturers still work even wtihout room for more sandwich cookies.')
-        # peach orchard
-        self.peach_orchard = Building(self, self.r_frame, (self.r_frame.cherry_i_c, self.r_frame.french_vanilla_i_c), (self.i_frame.peach_fruit,), [9, 5], [1.12, 1.12], [0.24], 'Peach Orchard', 3, 7, self.r_frame.french_vanilla_i_c, 1)
-        self.peach_orchard.create_hovertip('Orchard for growing peaches')
-        # banana plantation
-        self.banana_plantation = Building(self, self.r_frame, (self.r_frame.peach_i_c,), (self.i_frame.banana,), [5], [1.27], [0.16], 'Banana Plantation', 0, 8, self.r_frame.peach_i_c, 1)
-        self.banana_plantation.create_hovertip("Plantation for growing bananas (Musa acuminata)")
-        # almond orchard
-        self.almond_orchard = Building(self, self.r_frame, (self.r_frame.peach_i_c,), (self.i_frame.almond,), [5], [1.27], [0.18], 'Almond Orchard', 3, 8, self.i_frame.banana, 1)
-        self.almond_orchard.create_hovertip('Orchard for growing almonds')
-        # marshmallow producer
-        self.marshmallow_producer = Building(self, self.r_frame, (self.r_frame.banana_split, self.r_frame.cookies_and_cream_i_c), (self.i_frame.marshmallow,), [5, 5], [1.28, 1.33], [0.21], 'Marshmallow Producer', 0, 9, self.i_frame.banana, 1)
-        self.marshmallow_producer.create_hovertip('Produces marshmallows')
-        # mango orchard
-        self.mango_orchard = Building(self, self.r_frame, (self.r_frame.banana_split,), (self.i_frame.mango_fruit,), [5], [1.13], [0.11], 'Mango Orchard', 3, 9, self.i_frame.marshmallow, 1)
-        self.mango_orchard.create_hovertip('Orchard for growing mangoes')
-        # chocolate R&D
-        self.chocolate_r_n_d = EfficiencyBuilding(self, self.r_frame, (self.r_frame.chocolate_i_c, self.r_frame.mint_chip_i_c, self.r_frame.cookies_and_cream_i_c), [14, 12, 10], [1.51, 1.5, 1.49], 'Chocolate R&D', 0, 10, self.i_frame.marshmallow, 1, (self.cow, self.chocolate_processor, self.peppermint_farm, self.cookie_manufacturer, self.almond_orchard, self.marshmallow_producer, self.factory), (0.35, 0.30, 0.30, 0.25, 0.20, 0.20, 0.10))
-        self.chocolate_r_n_d.create_hovertip('Invest in research and development for the chocolate industry')
-        # universal enhancer
-        fruit_buildings = [ # list of buildings that universal enhancer applies to
-            self.strawberry_field, self.cherry_orchard, self.peach_orchard, self.banana_plantation, self.almond_orchard, self.mango_orchard
-        ]
-        self.universal_enhancer = EfficiencyBuilding(self, self.r_frame, (self.r_frame.mango_i_c,), [25], [1.8], 'Universal Enhancer', 3, 10, self.r_frame.mango_i_c, 1, fruit_buildings, [0.35 for i in range(len(fruit_buildings))])
-        self.universal_enhancer.create_hovertip('Enhances the efficiency of fruit-dedicated buildings')
-        # depository, expand_resources is a shallow copy of all the resources in self.r_frame.resource_list and ingredients in self.i_frame.ingredient_list
-        self.depository = StorageBuilding(self, self.r_frame, (self.r_frame.rocky_road,), [25], [1.8], 'Depository', 0, 11, self.r_frame.rocky_road, 1, self.r_frame.resource_list+self.i_frame.ingredient_list, [5000]+[1600]+[800 for r in range(len(self.r_frame.resource_list)-2)]+[1000 for i in range(len(self.i_frame.ingredient_list))])
-        self.depository.create_hovertip('Provides space for depositing all resources and ingredients')
-
-        # keep list of Buildings/Converters, when you add a new Bulding, you need to add it here
-        self.buildings = [
-            self.cow, self.factory, self.vanilla_plantation, self.strawberry_field, self.chocolate_processor,
-            self.peppermint_farm, self.cold_storage, self.milking_machine, self.cherry_orchard, self.warehouse,
-            self.neapolitan_investor, self.chicken_coop, self.cookie_manufacturer, self.peach_orchard,
-            self.banana_plantation, self.almond_orchard, self.marshmallow_producer, self.mango_orchard,
-            self.chocolate_r_n_d, self.universal_enhancer, self.depository,
-        ]
-
-        # special building
-        produce_buildings = [] # list of buildings that special building applies to
-        for building in self.buildings:
-            if not isinstance(building, (StorageBuilding, EfficiencyBuilding)):
-                produce_buildings.append(building)
-        self.special_building = StorageAndEfficiencyBuilding(self, self.r_frame, self.r_frame.resource_list, [50 for i in range(len(self.r_frame.resource_list))], [1.2 for i in range(len(self.r_frame.resource_list))], 'Special Building', 3, 11, self.r_frame.rocky_road, 1, produce_buildings, [1.00 for i in range(len(produce_buildings))], self.r_frame.resource_list+self.i_frame.ingredient_list, [100000 for i in range(len(self.r_frame.resource_list+self.i_frame.ingredient_list))] )
-        self.special_building.create_hovertip('Special building with special effects')
-        self.buildings.append(self.special_building)
+        ConvertView.convert_num = tk.IntVar(value=1)
+        ConvertView.custom_num = tk.StringVar(value='5')
+        self.converts = [] # ConvertViews on the control panel
+        for convert, table in zip(game.converts, game.tables['converts']):
+            if table['panel'] == 'control_panel':
+                convert_view = ConvertView(self, convert, table['text'], 3, 0, 3)
+                convert_view.create_hovertip(table['description'])
+                convert_view.make_visible() # make this button visible immediately
+                self.converts.append(convert_view)
+        # Radiobuttons to select how many Buildings to buy with each click
+        BuildingView.buy_num = tk.IntVar(value=1)
+        self.buy_num_frame = ttk.Frame(self)
+        buy_rb_label = ttk.Label(self.buy_num_frame, text='Buy')
+        Hovertip(buy_rb_label, "Control the number of buildings to buy at a time.\nIf you can't afford the number selected,\nthe quantity bought will be as much as possible.", hover_delay=10)
+        buy_1 = ttk.Radiobutton(self.buy_num_frame, text='×1', variable=BuildingView.buy_num, value=1)
+        buy_10 = ttk.Radiobutton(self.buy_num_frame, text='×10', variable=BuildingView.buy_num, value=10)
+        buy_100 = ttk.Radiobutton(self.buy_num_frame, text='×100', variable=BuildingView.buy_num, value=100)
+        buy_max = ttk.Radiobutton(self.buy_num_frame, text='×max', variable=BuildingView.buy_num, value=BuildingView.BUY_MAX)
+        self.buy_num_frame.grid(column=6, row=0, rowspan=12, padx=(20, 5), sticky='NE')
+        buy_rb_label.grid(column=0, row=0, sticky='WE')
+        buy_1.grid(column=0, row=1, padx=(10, 0), sticky='WE')
+        buy_10.grid(column=0, row=2, padx=(10, 0), sticky='WE')
+        buy_100.grid(column=0, row=3, padx=(10, 0), sticky='WE')
+        buy_max.grid(column=0, row=4, padx=(10, 0), sticky='WE')
+        # keep list of Buildings/Converters, same order as game.buildings
+        self.buildings = []
+        for building, table in zip(game.buildings, game.tables['buildings']):
+            if isinstance(building, model.Converter):
+                building_view = ConverterView(self, building, table['column'], table['row'])
+            elif isinstance(building, model.StorageAndEfficiencyBuilding):
+                building_view = SpecialBuildingView(self, building, table['column'], table['row'])
+            else:
+                building_view = BuildingView(self, building, table['column'], table['row'])
+            building_view.create_hovertip(table['description'])
+            self.buildings.append(building_view)
+        self.recommendation_var = None # created when there's a recommendation to show
+
+    def show_recommendation(self, text):
+        """Show the purchase recommended by Options > Recommend next purchase."""
+        if self.recommendation_var is None:
+            self.recommendation_var = tk.StringVar()
+            ttk.Label(self, textvariable=self.recommendation_var).grid(column=0, row=99, columnspan=6, padx=5, pady=5, sticky='W')
+        self.recommendation_var.set(text)
 
 
 class IceCreamFrame(ttk.Frame):
@@ -667,104 +490,82 @@ class IceCreamFrame(ttk.Frame):
 
     def __init__(self, parent, main):
         super().__init__(parent)
-        self.r_frame = main.r_frame
-        self.i_frame = main.i_frame
+        game = main.game
 
         # Radiobuttons to select how much to convert for each conversion
         self.convert_num_frame = ttk.Frame(self)
         convert_rb_label = ttk.Label(self.convert_num_frame, text='Controls')
-        Hovertip(convert_rb_label, "Control the number of ice cream to convert at a time.\nIf you don't have enough for the number selected,\nthe quantity converted will be as much as possible.\nThis value also applies to the 'Make ice cream' button.", hover_delay=10)
-        times_1 = ttk.Radiobutton(self.convert_num_frame, text='×1', variable=Convert.convert_num, value=1)
-        times_10 = ttk.Radiobutton(self.convert_num_frame, text='×10', variable=Convert.convert_num, value=10)
-        times_100 = ttk.Radiobutton(self.convert_num_frame, text='×100', variable=Convert.convert_num, value=100)
-        times_1000 = ttk.Radiobutton(self.convert_num_frame, text='×1000', variable=Convert.convert_num, value=1000)
+        Hovertip(convert_rb_label, "Control the number of ice cream to convert at a time.\nIf you don't have enough for the number selected,\nthe quantity converted will be as much as possible.\n'×max' converts as much as possible and the box converts\nany number you type.\nThis value also applies to the 'Make ice cream' button.", hover_delay=10)
+        times_1 = ttk.Radiobutton(self.convert_num_frame, text='×1', variable=ConvertView.convert_num, value=1)
+        times_10 = ttk.Radiobutton(self.convert_num_frame, text='×10', variable=ConvertView.convert_num, value=10)
+        times_100 = ttk.Radiobutton(self.convert_num_frame, text='×100', variable=ConvertView.convert_num, value=100)
+        times_1000 = ttk.Radiobutton(self.convert_num_frame, text='×1000', variable=ConvertView.convert_num, value=1000)
+        times_max = ttk.Radiobutton(self.convert_num_frame, text='×max', variable=ConvertView.convert_num, value=ConvertView.CONVERT_MAX)
+        times_custom = ttk.Radiobutton(self.convert_num_frame, text='×', variable=ConvertView.convert_num, value=ConvertView.CONVERT_CUSTOM)
+        # Entry for converting any number, only digits can be typed
+        only_digits = (self.register(lambda new_text: new_text.isdigit() or new_text == ''), '%P')
+        custom_entry = ttk.Entry(self.convert_num_frame, textvariable=ConvertView.custom_num, width=7, validate='key', validatecommand=only_digits)
+        custom_entry.bind('<FocusIn>', lambda e: ConvertView.convert_num.set(ConvertView.CONVERT_CUSTOM)) # typing a number selects it
         self.convert_num_frame.grid(column=1, row=0, rowspan=10, padx=(70, 0), sticky='NE')
         convert_rb_label.grid(column=0, row=0, sticky='WE')
         times_1.grid(column=0, row=1, padx=(10, 0), sticky='WE')
         times_10.grid(column=0, row=2, padx=(10, 0), sticky='WE')
         times_100.grid(column=0, row=3, padx=(10, 0), sticky='WE')
         times_1000.grid(column=0, row=4, padx=(10, 0), sticky='WE')
+        times_max.grid(column=0, row=5, padx=(10, 0), sticky='WE')
+        times_custom.grid(column=0, row=6, padx=(10, 0), sticky='W')
+        custom_entry.grid(column=0, row=6, padx=(40, 0), sticky='W')
 
-        # vanilla ice cream
-        self.vanilla_i_c_convert = Convert(self, 'Vanilla', (self.r_frame.ice_cream, self.i_frame.vanilla_spice), self.r_frame.vanilla_i_c, [3, 8], 1, 0, 1, self.r_frame.milk, 0)
-        self.vanilla_i_c_convert.create_hovertip('Produce vanilla ice cream')
-        # strawberry ice cream
-        self.strawberry_i_c_convert = Convert(self, 'Strawberry', (self.r_frame.ice_cream, self.i_frame.strawberry_fruit), self.r_frame.strawberry_i_c, [3, 8], 1, 0, 2, self.r_frame.milk, 0)
-        self.strawberry_i_c_convert.create_hovertip('Produce strawberry ice cream')
-        # chocolate ice cream
-        self.chocolate_i_c_convert = Convert(self, 'Chocolate', (self.r_frame.ice_cream, self.i_frame.chocolate_food), self.r_frame.chocolate_i_c, [3, 8], 1, 0, 3, self.r_frame.milk, 0)
-        self.chocolate_i_c_convert.create_hovertip('Produce chocolate ice cream')
-        # neapolitan ice cream
-        self.neapolitan_i_c_convert = Convert(self, 'Neapolitan', (self.r_frame.vanilla_i_c, self.r_frame.strawberry_i_c, self.r_frame.chocolate_i_c), self.r_frame.neapolitan_i_c, [3, 3, 3], 1, 0, 4, self.r_frame.milk, 0)
-        self.neapolitan_i_c_convert.create_hovertip('Produce neapolitan ice cream')
-        # mint chocolate chip ice cream
-        self.mint_chip_i_c_convert = Convert(self, 'Mint Chocolate Chip', (self.r_frame.ice_cream, self.i_frame.chocolate_food, self.i_frame.peppermint), self.r_frame.mint_chip_i_c, [3, 4, 5], 1, 0, 5, self.i_frame.peppermint, 1)
-        self.mint_chip_i_c_convert.create_hovertip('Produce mint chocolate chip ice cream')
-        # cherry ice cream
-        self.cherry_i_c_convert = Convert(self, 'Cherry', (self.r_frame.ice_cream, self.i_frame.cherry_fruit), self.r_frame.cherry_i_c, [4, 8], 1, 0, 6, self.i_frame.cherry_fruit, 1)
-        self.cherry_i_c_convert.create_hovertip('Produce cherry ice cream')
-        # french vanilla ice cream
-        self.french_vanilla_i_c_convert = Convert(self, 'French Vanilla', (self.r_frame.ice_cream, self.i_frame.vanilla_spice, self.i_frame.egg), self.r_frame.french_vanilla_i_c, [5, 7, 7], 1, 0, 7, self.i_frame.egg, 1)
-        self.french_vanilla_i_c_convert.create_hovertip('Produce vanilla ice cream')
-        # cookies and cream ice cream
-        self.cookies_and_cream_i_c_convert = Convert(self, 'Cookies and Cream', (self.r_frame.ice_cream, self.i_frame.sandwich_cookie), self.r_frame.cookies_and_cream_i_c, [8, 5], 1, 0, 8, self.i_frame.sandwich_cookie, 1)
-        self.cookies_and_cream_i_c_convert.create_hovertip('Produce cookies and cream ice cream')
-        # peach ice cream
-        self.peach_i_c_convert = Convert(self, 'Peach', (self.r_frame.ice_cream, self.i_frame.peach_fruit), self.r_frame.peach_i_c, [6, 10], 1, 0, 9, self.i_frame.peach_fruit, 1)
-        self.peach_i_c_convert.create_hovertip('Produce peach ice cream')
-        # banana split
-        self.banana_split_convert = Convert(self, 'Banana Split', (self.r_frame.neapolitan_i_c, self.i_frame.banana, self.i_frame.cherry_fruit), self.r_frame.banana_split, [3, 1, 3], 1, 0, 10, self.i_frame.banana, 1)
-        self.banana_split_convert.create_hovertip('Create a banana split')
-        # rocky road ice cream
-        self.rocky_road_convert = Convert(self, 'Rocky Road', (self.r_frame.chocolate_i_c, self.i_frame.almond, self.i_frame.marshmallow), self.r_frame.rocky_road, [12, 8, 8], 1, 0, 11, self.i_frame.marshmallow, 1)
-        self.rocky_road_convert.create_hovertip('Produce rocky road ice cream')
-        # mango ice cream convert
-        self.mango_i_c_convert = Convert(self, 'Mango', (self.r_frame.ice_cream, self.i_frame.mango_fruit), self.r_frame.mango_i_c, [14, 6], 1, 0, 12, self.i_frame.mango_fruit, 1)
-        self.mango_i_c_convert.create_hovertip('Produce mango ice cream')
-
-        # keep list of ice creams, when you add a new ice cream, you need to add it here
-        self.i_c_converts = [
-            self.vanilla_i_c_convert, self.strawberry_i_c_convert, self.chocolate_i_c_convert, self.neapolitan_i_c_convert,
-            self.mint_chip_i_c_convert, self.cherry_i_c_convert, self.french_vanilla_i_c_convert, self.cookies_and_cream_i_c_convert,
-            self.peach_i_c_convert, self.banana_split_convert, self.rocky_road_convert, self.mango_i_c_convert,
-        ]
+        # keep list of ice creams, same order as game.i_c_converts
+        self.i_c_converts = []
+        for convert, table in zip(game.converts, game.tables['converts']):
+            if table['panel'] == 'ice_cream':
+                convert_view = ConvertView(self, convert, table['text'], 0, len(self.i_c_converts) + 1)
+                convert_view.create_hovertip(table['description'])
+                self.i_c_converts.append(convert_view)
 
 
 class SellObject:
     """
-    Creates Labels and Spinboxes for SellFrame. 
+    Creates Labels and Spinboxes for SellFrame.
     Has methods to update, show, and hide the Spinboxes.
     """
 
-    def __init__(self, parent, building, row):
+    def __init__(self, parent, building_view, row):
         self.parent = parent # Frame that widgets will be on
-        self.building = building
+        self.building_view = building_view
+        self.building = building_view.building
+        self.row = row
         self.sell_num = tk.IntVar() # count the number of hosts to sell
-        self.sp_label = ttk.Label(parent, text=self.building.name)
-        self.sp_label.grid(column=0, row=row)
-        self.sp_label.grid_remove()
-        self.sp = ttk.Spinbox(parent, from_=0, to=self.building.num, textvariable=self.sell_num, state=['readonly'])
-        self.sp.grid(column=1, row=row, padx=5, pady=5)
-        self.hide_sp() # keep Spinbox hidden until at least 1 building is owned
+        # the Label and Spinbox are created the first time at least 1 building is owned
+        self.sp_label = None
+        self.sp = None
 
     def sell_(self):
-        self.building.sell(self.sell_num.get()) # sell the amount currently selected
+        if self.sell_num.get() == 0:
+            return # nothing to sell, the Hovertip doesn't need to change
+        self.building_view.sell(self.sell_num.get()) # sell the amount currently selected
         self.sp['to'] = self.building.num
         self.sp.set(0)
-        self.building.update_hovertip()
+        self.building_view.update_hovertip()
 
     def update_sp(self):
-        self.sp['to'] = self.building.num
-        self.sp.set(0)
+        if self.sp is not None:
+            self.sp['to'] = self.building.num
+            self.sp.set(0)
 
     def show_sp(self):
-        self.sp_label['text'] = self.building.button.cget('text')
-        self.sp_label.grid()
-        self.sp.grid()
+        if self.sp is None:
+            self.sp_label = ttk.Label(self.parent)
+            self.sp = ttk.Spinbox(self.parent, from_=0, to=self.building.num, textvariable=self.sell_num, state=['readonly'])
+        self.sp_label['text'] = self.building_view.text()
+        self.sp_label.grid(column=0, row=self.row)
+        self.sp.grid(column=1, row=self.row, padx=5, pady=5)
 
     def hide_sp(self):
-        self.sp_label.grid_remove()
-        self.sp.grid_remove()
+        if self.sp is not None:
+            self.sp_label.grid_remove()
+            self.sp.grid_remove()
 
 
 class SellFrame(ttk.Frame):
@@ -801,115 +602,218 @@ class SellFrame(ttk.Frame):
 
 class HovertipButtons(Hovertip):
     """
-    Takes an object and a simple description, then generates the
-    message to be used for Hovertip's text.
+    Takes a model object and a simple description, then generates the
+    message to be used for Hovertip's text. The message is made when the
+    Hovertip is shown and kept until the host's revision changes.
     """
 
-    def __init__(self, host, description):
-        self.host = host # the Building instance to make a Hovertip for
+    def __init__(self, anchor_widget, host, description):
+        self.host = host # the model.Building or model.Convert instance to make a Hovertip for
         self.description = description
-        text = self.produce_text(host, description)
-        super().__init__(host.button, text, hover_delay=10)
-
+        self.cached_text = None
+        self.cached_revision = None # host.revision when cached_text was made
+        super().__init__(anchor_widget, self.host_text, hover_delay=10)
+
+    def host_text(self):
+        revision = getattr(self.host, 'revision', 0) # a model.Convert never changes
+        if revision != self.cached_revision:
+            self.cached_text = self.produce_text(self.host, self.description)
+            self.cached_revision = revision
+        return self.cached_text
+
+    @profiler.section('HovertipButtons.produce_text')
     def produce_text(self, host, description):
         text = description + '\n' # string to be inputted
         text += '—————\nCost:'
-        if isinstance(host, StorageAndEfficiencyBuilding):
-            text += f'\n{round(host.costs[0], 2)} of all Resources\n—————\nEffects:\nAll production buildings production bonus: 100%\nMax all Resources and Ingredients: +100000'
+        if isinstance(host, model.StorageAndEfficiencyBuilding):
+            text += f'\n{notation.compact(model.units(host.costs[0]))} of all Resources\n—————\nEffects:\nAll production buildings production bonus: 100%\nMax all Resources and Ingredients: +100K'
             return text
         for buy_resource, cost in zip(host.buy_resources, host.costs):
-            text += f'\n{round(cost, 2)} {buy_resource.name.strip()}'
-        if isinstance(host, Building):
+            text += f'\n{notation.compact(model.units(cost))} {buy_resource.name.strip()}'
+        if isinstance(host, model.Building):
             text += '\n—————\nEffects:'
-        if isinstance(host, Converter):
+        if isinstance(host, model.Converter):
             for old_resource, conversion_cost in zip(host.old_resources, host.conversion_costs):
-                text += f'\n{old_resource.name} conversion: -{round(conversion_cost, 2)}/sec'
+                text += f'\n{old_resource.name} conversion: -{notation.compact(model.units(conversion_cost))}/sec'
             for new_resource, bonus_val in zip(host.new_resources, host.bonus_vals):
-                text += f'\n{new_resource.name} production: {bonus_val}/sec'
-        elif isinstance(host, StorageBuilding):
+                text += f'\n{new_resource.name} production: {notation.compact(model.units(bonus_val))}/sec'
+        elif isinstance(host, model.StorageBuilding):
             # exception b/c we don't want every value listed for cold storages
             if host.name == 'Cold Storage':
                 for i in range(2):
-                    text += f'\nMax {host.expand_resources[i].name}: +{host.expand_vals[i]}'
-                text += f'\nMax Ice Cream (flavored): +{host.expand_vals[2]}'
+                    text += f'\nMax {host.expand_resources[i].name}: +{notation.compact(model.units(host.expand_vals[i]))}'
+                text += f'\nMax Ice Cream (flavored): +{notation.compact(model.units(host.expand_vals[2]))}'
                 return text
             # exception b/c we don't want every value listed for warehouses
             if host.name == 'Warehouse':
-                text += f'\nMax Ingredient (every): +{host.expand_vals[0]}'
+                text += f'\nMax Ingredient (every): +{notation.compact(model.units(host.expand_vals[0]))}'
                 return text
             # exception b/c we don't want every value listed for depository
             if host.name == 'Depository':
                 for i in range(2):
-                    text += f'\nMax {host.expand_resources[i].name}: +{host.expand_vals[i]}'
-                text += f'\nMax Ice Cream (flavored): +{host.expand_vals[2]}'
-                text += f'\nMax Ingredient (every): +{host.expand_vals[14]}'
+                    text += f'\nMax {host.expand_resources[i].name}: +{notation.compact(model.units(host.expand_vals[i]))}'
+                text += f'\nMax Ice Cream (flavored): +{notation.compact(model.units(host.expand_vals[2]))}'
+                text += f'\nMax Ingredient (every): +{notation.compact(model.units(host.expand_vals[14]))}'
                 return text
             for expand_resource, expand_val in zip(host.expand_resources, host.expand_vals):
-                text += f'\nMax {expand_resource.name.strip()}: +{expand_val}'
-        elif isinstance(host, EfficiencyBuilding):
+                text += f'\nMax {expand_resource.name.strip()}: +{notation.compact(model.units(expand_val))}'
+        elif isinstance(host, model.EfficiencyBuilding):
             for building, efficiency_increase in zip(host.applied_buildings, host.efficiency_increases):
-                text += f'\n{building.name} production bonus: {int(efficiency_increase * 100)}%'
-        elif isinstance(host, Building):
+                text += f'\n{building.name} production bonus: {efficiency_increase // 100}%'
+        elif isinstance(host, model.Building):
             for new_resource, bonus_val in zip(host.new_resources, host.bonus_vals):
-                text += f'\n{new_resource.name} production: {bonus_val}/sec'
+                text += f'\n{new_resource.name} production: {notation.compact(model.units(bonus_val))}/sec'
         return text
 
 
 class AchievementFrame(ttk.Frame):
+    """
+    Lists every achievement, red until it's reached and then green.
+    The widgets are created by build() when the tab is first shown.
+    """
 
     def __init__(self, parent, main):
         super().__init__(parent)
-        resource_and_ingredient_list = main.r_frame.resource_list + main.i_frame.ingredient_list
+        self.achievements = main.game.achievements
+        self.built = False # True once build() has created the widgets
+
+    def build(self):
+        if self.built:
+            return
+        self.built = True
         self.achievement_bonus_var = tk.StringVar()
         self.achievement_bonus_lb = ttk.Label(self, textvariable=self.achievement_bonus_var)
         Hovertip(self.achievement_bonus_lb, 'As you gain more achievements, the bonus % that\nyou get from converting ice cream increases.', hover_delay=10)
         self.achievement_bonus_lb.grid(column=0, row=0, padx=5, pady=5, sticky='NW')
 
-        self.values = [] # each index has a tuple, (resource, num_required, bonus)
-        for resource in resource_and_ingredient_list:
-            self.values.append([resource, 5, 0.0069])
-            self.values.append([resource, 10, 0.0135])
-            self.values.append([resource, 50, 0.0204])
-            self.values.append([resource, 100, 0.0339])
-            self.values.append([resource, 1000, 0.0678])
-        # create the requirement strings
-        self.requirements = []
-        for value in self.values:
-            if value[0].name == 'Milk':
-                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()}s')
-            elif value[0].name == 'Ice Cream':
-                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()}')
-            elif isinstance(value[0], Ingredient):
-                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()}')
-            else:
-                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()} ice cream')
-        self.valuesvar = tk.StringVar(value=self.requirements)
-        self.lbox = tk.Listbox(self, listvariable=self.valuesvar, relief='flat', height=10, width=55)
-        for i in range(self.lbox.size()):
-            self.lbox.itemconfigure(i, background='#F04124', foreground='white', selectbackground='#EA2F10', selectforeground='#2D2222')
+        self.valuesvar = tk.StringVar(value=self.achievements.requirements)
+        # rows are red by default, only the ones reached need their own colours
+        self.lbox = tk.Listbox(self, listvariable=self.valuesvar, relief='flat', height=10, width=55, background='#F04124', foreground='white', selectbackground='#EA2F10', selectforeground='#2D2222')
+        for i, done in enumerate(self.achievements.done):
+            if done: # achievements reached before the tab was shown
+                self.lbox.itemconfigure(i, background='#43AC6A', foreground='white', selectbackground='#3C9A5F', selectforeground='#2D2222')
         self.lbox.grid(column=0, row=1, padx=(5, 0), pady=5, sticky='EW')
         s = ttk.Scrollbar(self, orient='vertical', command=self.lbox.yview) # add a scrollbar
         s.grid(column=1, row=1, rowspan=1, sticky='NS')
         self.lbox['yscrollcommand'] = s.set
-        self.prog_bar = ttk.Progressbar(self, orient='horizontal', maximum=float(len(self.requirements)+0.01),mode='determinate')
+        self.prog_bar = ttk.Progressbar(self, orient='horizontal', maximum=float(len(self.achievements.requirements)+0.01),mode='determinate')
         self.completion = tk.StringVar()
         ttk.Label(self, textvariable=self.completion).grid(column=0, row=2, padx=5, pady=5, sticky='EW')
         self.prog_bar.grid(column=0, row=3, padx=5, pady=5, sticky='EW')
-        self.done = [False for i in range(len(self.requirements))] # which achievements are complete
+        self.prog_bar.step(float(self.achievements.done.count(True)))
         self.update_label()
 
+    @profiler.section('AchievementFrame.update')
     def update(self):
-        for i in range(self.lbox.size()):
-            if not self.done[i] and self.values[i][0].resource.get() >= self.values[i][1]:
-                self.lbox.itemconfigure(i, background='#43AC6A', foreground='white', selectbackground='#3C9A5F', selectforeground='#2D2222')
-                Convert.achievement_bonus += self.values[i][2]
-                self.prog_bar.step(1.0)
-                self.done[i] = True
+        """Show the achievements reached since the last update, the model checks them after every tick and action."""
+        new = self.achievements.pop_new()
+        if not new or not self.built:
+            return # build() shows the achievements already reached
+        for i in new:
+            self.lbox.itemconfigure(i, background='#43AC6A', foreground='white', selectbackground='#3C9A5F', selectforeground='#2D2222')
+        self.prog_bar.step(float(len(new)))
         self.update_label()
 
     def update_label(self):
-        self.achievement_bonus_var.set(f'Achievement Bonus: {round((Convert.achievement_bonus - 1)*100, 2)}%')
-        self.completion.set(f'Completion ({self.done.count(True)}/{len(self.done)})')
+        self.achievement_bonus_var.set(f'Achievement Bonus: {model.units(self.achievements.bonus - model.BASIS)}%')
+        self.completion.set(f'Completion ({self.achievements.done.count(True)}/{len(self.achievements.done)})')
+
+
+class StatisticsFrame(ttk.Frame):
+    """
+    Graphs the quantity and the per second rate of a Resource over the
+    ticks kept by the History, on one Canvas. Each graph is a single line
+    through the points of a history.MinMax, which is extended by the
+    ticks since the last refresh(), so only a few hundred points are
+    drawn however long the history is.
+    """
+
+    def __init__(self, parent, main):
+        super().__init__(parent)
+        self.history = main.history
+        self.resources = main.game.ledger.resources
+        self.shown = [] # the Resources in the list
+        self.index = None # Ledger index of the Resource shown
+        self.graphs = [] # a MinMax of its quantity and one of its rate
+
+        self.resource_var = tk.StringVar()
+        # the list only has the Resources seen so far, it's filled in when it's opened
+        self.resource_cb = ttk.Combobox(self, textvariable=self.resource_var, state='readonly', postcommand=self.list_resources)
+        self.resource_cb.bind('<<ComboboxSelected>>', lambda event: self.select(self.resource_cb.current()))
+        self.resource_cb.grid(column=0, row=0, padx=5, pady=5, sticky='W')
+        width, height = GRAPH_SIZE
+        self.canvas = tk.Canvas(self, width=width + 2 * GRAPH_MARGIN, height=2 * (height + 2 * GRAPH_MARGIN), background='white', highlightthickness=0)
+        self.canvas.grid(column=0, row=1, padx=5, pady=5)
+        # the items of each graph, moved and relabelled by draw()
+        self.items = []
+        for i, title in enumerate(('Quantity', 'Per second')):
+            top = i * (height + 2 * GRAPH_MARGIN) + GRAPH_MARGIN
+            self.canvas.create_rectangle(GRAPH_MARGIN, top, GRAPH_MARGIN + width, top + height, outline='#c8c8c8')
+            self.canvas.create_text(GRAPH_MARGIN, top - 2, text=title, anchor='sw')
+            high = self.canvas.create_text(GRAPH_MARGIN + width, top - 2, anchor='se', fill='#7d7d7d')
+            low = self.canvas.create_text(GRAPH_MARGIN + width, top + height + 2, anchor='ne', fill='#7d7d7d')
+            line = self.canvas.create_line(0, 0, 0, 0, fill='#2a7ab0', state='hidden')
+            self.items.append((top, line, high, low))
+        self.span_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.span_var, foreground='#7d7d7d').grid(column=0, row=2, padx=5, sticky='W')
+
+    def show(self):
+        """Called when the tab is selected, starts with the first Resource."""
+        if self.index is None:
+            self.list_resources()
+            if self.shown:
+                self.resource_cb.current(0)
+                self.select(0)
+                return
+        self.refresh()
+
+    def list_resources(self):
+        self.shown = [resource for resource in self.resources if resource.seen]
+        self.resource_cb['values'] = [resource.name for resource in self.shown]
+
+    def select(self, i):
+        """Graph the i-th Resource of the list, from the oldest tick kept."""
+        if i < 0:
+            return
+        self.index = self.shown[i].index
+        first = self.history.first()
+        self.graphs = [history.MinMax(first), history.MinMax(first)]
+        self.refresh()
+
+    @profiler.section('StatisticsFrame.refresh')
+    def refresh(self):
+        """Add the ticks recorded since the last refresh to the graphs and draw them."""
+        if self.index is None:
+            return
+        first = self.history.first()
+        for graph, totals in zip(self.graphs, (False, True)):
+            graph.drop(first)
+            graph.extend(self.history.series(self.index, graph.end, totals))
+        end = self.history.count
+        self.draw(self.items[0], self.graphs[0], first, end, lambda value: notation.compact(value / model.CENT))
+        self.draw(self.items[1], self.graphs[1], first, end, lambda total: notation.compact(round(total / model.RATE, 2)))
+        self.span_var.set(f'Last {notation.clock(end - first)}, one sample a second')
+
+    def draw(self, items, graph, first, end, text):
+        """Move the line of a graph to the points of its MinMax, ticks first to end across the width."""
+        top, line, high, low = items
+        points = graph.points_in_order()
+        if len(points) < 2:
+            self.canvas.itemconfigure(line, state='hidden')
+            return
+        smallest, largest = min(graph.mins), max(graph.maxes)
+        width, height = GRAPH_SIZE
+        x_scale = width / max(end - 1 - first, 1)
+        y_scale = height / (largest - smallest) if largest > smallest else 0
+        bottom = top + (height if y_scale else height // 2)
+        coords = []
+        for tick, value in points:
+            coords.append(GRAPH_MARGIN + max(tick - first, 0) * x_scale) # the first bucket can start before the oldest tick kept
+            coords.append(bottom - (value - smallest) * y_scale)
+        self.canvas.coords(line, *coords)
+        self.canvas.itemconfigure(line, state='normal')
+        self.canvas.itemconfigure(high, text=text(largest))
+        self.canvas.itemconfigure(low, text=text(smallest))
 
 
 class MainApplication():
@@ -925,16 +829,29 @@ class MainApplication():
         self.style = ttk.Style()
         self.text_font = font.nametofont('TkTextFont')
 
+        # game state, continue from the save file if there is one
+        self.game = model.Game(seed=random.getrandbits(63)) # a new game has its own random events
+        self.load()
+        # record every action from here on, so this session can be replayed
+        self.journal = None
+        try:
+            self.journal = journal.Journal(JOURNAL_PATH, self.game)
+        except OSError as e:
+            print(f"actions aren't recorded, {e}", file=sys.stderr)
+        # a sample of every Resource each tick, for the Statistics tab
+        self.history = history.History(self.game.ledger)
+
         # resources frame
-        self.r_frame = ResourceFrame(self.parent)
+        self.r_frame = ResourceFrame(self.parent, self.game)
         self.r_frame.grid(column=0, row=0, padx=10, pady=5, sticky='NWES')
 
         ttk.Separator(self.r_frame, orient='horizontal').grid(column=0, row=98, pady=5, sticky='EW')
 
         # ingredients frame
-        self.i_frame = IngredientFrame(self.r_frame)
+        self.i_frame = IngredientFrame(self.r_frame, self.game)
         self.i_frame.grid(column=0, row=99, columnspan=4, sticky='WS')
-        
+        self.r_frame.show_season(self.game.ticks)
+
         # create a notebook for holding tabs
         #self.frame_for_nb = ttk.Frame()
         #self.frame_for_nb.grid(column=1, row=0, rowspan=3, padx=10, pady=5, sticky='NE')
@@ -957,7 +874,7 @@ class MainApplication():
         # sell frame
         self.sell_frame = SellFrame(self.nb, self)
         self.nb.add(self.sell_frame, text='Sell', state='hidden') # unlock after getting first Building
-        self.nb.bind('<<NotebookTabChanged>>', lambda e: self.sell_frame.sf_update_sp())
+        self.nb.bind('<<NotebookTabChanged>>', self.tab_changed)
         # keep selling spinboxes hidden until building is acquired for the first time
         self.sell_tab_visible = False
 
@@ -965,11 +882,29 @@ class MainApplication():
         self.achievement_frame = AchievementFrame(self.nb, self)
         self.nb.add(self.achievement_frame, text='Achievements')
 
-        # use buildings
-        self.use_buildings()
+        # statistics frame
+        self.statistics_frame = StatisticsFrame(self.nb, self)
+        self.nb.add(self.statistics_frame, text='Statistics')
+
+        # use buildings every second
+        self.clock = model.Clock(time.monotonic(), max_ticks=MAX_CATCH_UP)
+        self.parent.after(1000, self.use_buildings)
+
+        # views to refresh when a Resource changes, by the Resource's index in the Ledger
+        self.watchers = [[] for _ in self.game.ledger.resources]
+        for resource_view in self.r_frame.resource_list + self.i_frame.ingredient_list:
+            self.watch([resource_view.model], resource_view.refresh)
+        for sell_object in self.sell_frame.sell_object_list:
+            self.watch(sell_object.building_view.watched(), sell_object.building_view.available)
+        for convert_view in self.c_frame.converts + self.i_c_frame.i_c_converts:
+            self.watch(convert_view.watched(), convert_view.available)
+        self.watch([self.game.ice_cream], self.show_i_c_tab)
+        # the SellObject of each model.Building
+        self.sell_objects = {sell_object.building: sell_object for sell_object in self.sell_frame.sell_object_list}
 
-        # see if buttons are available and visible
-        self.available()
+        # refresh the views when the game changes, starting with all of them
+        self.game.ledger.listener = self.schedule_available
+        self.available(everything=True)
 
         # add Menu
         menubar = tk.Menu(parent)
@@ -978,7 +913,7 @@ class MainApplication():
         menu_options = tk.Menu(menubar)
         menubar.add_cascade(menu=menu_options, label='Options')
         # cheat button for testing new features
-        self.cheat_b = ttk.Button(self.parent, text='Cheat increase', command=self.cheat)
+        self.cheat_b = ttk.Button(self.parent, text='Cheat increase', command=lambda: self.game.act(model.CHEAT))
         def enable_cheat_b(*args):
             enable_cheats = messagebox.askyesno(title='Enable cheats', message='Enable the cheat button?', detail='This cannot be undone', default='no')
             if enable_cheats:
@@ -986,6 +921,20 @@ class MainApplication():
                 menu_options.entryconfigure(0, state='disabled')
         menu_options.add_command(label='Enable cheats', command=enable_cheat_b)
         menu_options.add_separator()
+        menu_options.add_command(label='Save', command=self.save)
+        menu_options.add_separator()
+        # timing of the hot paths, see profiler.py
+        self.profile_var = tk.BooleanVar(value=profiler.enabled)
+        menu_options.add_checkbutton(label='Profile', variable=self.profile_var, command=lambda: profiler.enable(self.profile_var.get()))
+        menu_options.add_command(label='Save profile', command=self.save_profile)
+        menu_options.add_separator()
+        # search for the quickest way to the Special Building, see optimizer.py
+        self.recommendation = None # Future of the search while it runs
+        menu_options.add_command(label='Recommend next purchase', command=self.recommend)
+
+        # save every minute and when the window is closed
+        self.parent.after(AUTOSAVE_INTERVAL, self.autosave)
+        self.parent.protocol('WM_DELETE_WINDOW', self.close)
 
         # add help menu
         menu_help = tk.Menu(menubar)
@@ -995,60 +944,171 @@ class MainApplication():
         menu_help.add_separator()
         parent['menu'] = menubar
 
-
+        # the first frame is drawn once Tk is idle
+        self.parent.after_idle(self.report_startup)
+
+
+    def tab_changed(self, event):
+        self.sell_frame.sf_update_sp()
+        if self.nb.select() == str(self.achievement_frame):
+            self.achievement_frame.build() # first time the tab is shown
+        elif self.nb.select() == str(self.statistics_frame):
+            self.statistics_frame.show()
+
+    def report_startup(self):
+        """Called once the window is ready, report the time since the program started."""
+        seconds = time.perf_counter() - START_TIME
+        profiler.sections.setdefault('startup', profiler.Section('startup')).record(seconds)
+        print(f'started in {seconds * 1000:.0f} ms', file=sys.stderr)
+
+    def load(self):
+        """Load the save file, then add the production from the time since it was saved."""
+        if not os.path.exists(SAVE_PATH):
+            return
+        try:
+            saved_at = save.load_game(self.game, SAVE_PATH)
+        except (OSError, ValueError) as e:
+            # keep the file so that it isn't overwritten by the next save
+            os.replace(SAVE_PATH, SAVE_PATH + '.bad')
+            messagebox.showerror(title='Load', message="The saved game couldn't be loaded, starting a new game.", detail=f'{e}\nThe save file was renamed to {SAVE_PATH}.bad')
+            self.game = model.Game(seed=random.getrandbits(63))
+            return
+        offline = int(time.time() - saved_at)
+        if offline > 0:
+            self.game.fast_forward(offline)
+
+    def save(self):
+        try:
+            save.save_game(self.game, SAVE_PATH)
+        except OSError as e:
+            messagebox.showerror(title='Save', message="The game couldn't be saved.", detail=str(e))
+
+    def save_profile(self):
+        try:
+            profiler.dump(PROFILE_PATH)
+        except OSError as e:
+            messagebox.showerror(title='Save profile', message="The profile couldn't be saved.", detail=str(e))
+            return
+        messagebox.showinfo(title='Save profile', message='Profile saved.', detail=PROFILE_PATH)
+
+    def recommend(self):
+        """Search for the next purchase in the background, the search uses a process per core."""
+        if self.recommendation is not None:
+            return # still searching
+        count = self.game.special_building.num + 1
+        executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.recommendation = executor.submit(optimizer.search, save.dumps(self.game), count=count, beam=RECOMMEND_BEAM)
+        executor.shutdown(wait=False)
+        self.c_frame.show_recommendation('Recommended: searching...')
+        self.parent.after(500, self.show_recommendation)
+
+    def show_recommendation(self):
+        if not self.recommendation.done():
+            self.parent.after(500, self.show_recommendation)
+            return
+        future, self.recommendation = self.recommendation, None
+        try:
+            result = future.result()
+        except (OSError, RuntimeError) as e: # e.g. the process pool couldn't start
+            self.c_frame.show_recommendation(f"Recommended: the search failed ({e})")
+            return
+        if result is None:
+            self.c_frame.show_recommendation('Recommended: no way to the Special Building found')
+        else:
+            seconds, steps = result
+            self.c_frame.show_recommendation(f'Recommended: {steps[0][1]}, Special Building in {notation.clock(seconds)}')
+
+    def autosave(self):
+        self.save()
+        if self.journal is not None:
+            self.journal.flush()
+        self.parent.after(AUTOSAVE_INTERVAL, self.autosave)
+
+    def close(self):
+        self.save()
+        if self.journal is not None:
+            self.journal.close()
+        self.parent.destroy()
+
+    @profiler.section('MainApplication.use_buildings')
     def use_buildings(self):
-        """Increase the value of Resources every second."""
-        for building in self.c_frame.buildings:
-            if building.num > 0:
-                building.use()
-        self.parent.after(1000, self.use_buildings)
+        """Increase the value of Resources every second, catching up on any ticks that were late."""
+        now = time.monotonic()
+        ticks, dropped = self.clock.advance(now)
+        if ticks == 1:
+            self.game.tick()
+        elif ticks > 1:
+            # the event loop was blocked, e.g. by a messagebox, run the missed ticks together
+            self.game.fast_forward(ticks)
+            print(f'{ticks - 1} late ticks merged', file=sys.stderr)
+        if dropped:
+            print(f'{dropped} ticks dropped', file=sys.stderr)
+        if ticks:
+            self.r_frame.show_season(self.game.ticks)
+            self.history.record(ticks)
+            if self.nb.select() == str(self.statistics_frame):
+                self.statistics_frame.refresh() # the graphs are only drawn while they're shown
+        self.parent.after(math.ceil(self.clock.delay(time.monotonic()) * 1000), self.use_buildings)
+
+    def watch(self, resources, callback):
+        """Call callback from available() when any of resources changes."""
+        for resource in resources:
+            if callback not in self.watchers[resource.index]:
+                self.watchers[resource.index].append(callback)
+
+    def schedule_available(self):
+        """Called by the model.Ledger on the first change since the last available()."""
+        self.parent.after(1000 // FRAME_RATE, self.available)
+
+    @profiler.section('MainApplication.available')
+    def available(self, everything=False):
+        """Refresh the views that depend on what changed in the game since the last call."""
+        changed = self.game.ledger.pop_changed()
+        buildings = self.game.production.pop_changed_buildings()
+        if everything:
+            changed = range(len(self.watchers))
+            buildings = self.game.buildings
+        # each view is refreshed once, however many of its Resources changed
+        callbacks = set()
+        for index in changed:
+            callbacks.update(self.watchers[index])
+        for callback in callbacks:
+            callback()
+
+        if buildings:
+            for building in buildings:
+                sell_object = self.sell_objects[building]
+                if sell_object.building_view.available not in callbacks:
+                    sell_object.building_view.available() # costs or activated_num changed
+                # make sell Spinboxes visible
+                if building.num > 0:
+                    sell_object.show_sp()
+                else:
+                    sell_object.hide_sp()
+            self.show_sell_tab()
 
-    def available(self):
-        """Makes buttons available and visible."""
-        t = []
-        # make Bulidings available
-        for sell_object in self.sell_frame.sell_object_list:
-            # make sell tab available
-            if not self.sell_tab_visible and sell_object.building.num > 0:
+        # update achievements
+        if changed:
+            self.achievement_frame.update()
+
+    def show_sell_tab(self):
+        """Show the sell tab while any Building is owned."""
+        if any(building.num > 0 for building in self.game.buildings):
+            if not self.sell_tab_visible:
                 self.nb.tab(2, state='normal')
                 self.sell_tab_visible = True
-            t.append(sell_object.building.num)
-            # make buttons for Buildings visible
-            if not sell_object.building.button_visible and sell_object.building.visible_resource.resource.get() >= sell_object.building.visible_value:
-                sell_object.building.make_visible()
-            sell_object.building.available() # see if Button is available
-            # make sell Spinboxes visible
-            if sell_object.building.num > 0:
-                sell_object.show_sp()
-            else:
-                sell_object.hide_sp()
-        if not any(t): # hide the sell tab if there are no more buildings
+        elif self.sell_tab_visible:
             # if currently on sell tab, select Control Panel
             if self.nb.index('current') == 2:
                 self.nb.select(0)
-            self.nb.tab(2, state='hidden') 
+            self.nb.tab(2, state='hidden')
             self.sell_tab_visible = False
 
-        self.c_frame.convert_milk_i_c.available() # convert_milk_i_c is not in i_c_frame
-        for ice_cream in self.i_c_frame.i_c_converts: 
-            ice_cream.available() # make Convert buttons available
-            if not ice_cream.button_visible and ice_cream.visible_resource.resource.get() >= ice_cream.visible_value:
-                ice_cream.make_visible() # make Convert button visible
+    def show_i_c_tab(self):
         # make ice cream tab visible
-        if not self.i_c_tab_visible and self.r_frame.ice_cream.resource.get() > 0:
+        if not self.i_c_tab_visible and self.game.ice_cream.value > 0:
             self.nb.tab(1, state='normal')
             self.i_c_tab_visible = True
-        # update achievements
-        self.achievement_frame.update()
-        self.parent.after(100, self.available)
-    
-    def cheat(self):
-        i = 100
-        for resource in self.r_frame.resource_list:
-            resource.update(i)
-
-        for ingredient in self.i_frame.ingredient_list:
-            ingredient.update(i)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,115 @@
+"""
+History of every Resource's quantity and per second rate, a sample per
+tick, for the Statistics tab.
+
+The samples are kept in a ring buffer allocated once, so the memory used
+doesn't grow however long the game runs: after CAPACITY ticks the oldest
+sample is overwritten. A sample is a copy of the Ledger's arrays into one
+row of the buffer, a single slice assignment.
+
+Graphs of hours of samples are drawn from a MinMax of the series: the
+samples are grouped into at most POINTS buckets of consecutive ticks and
+only the smallest and largest sample of each bucket are drawn. Adding a
+sample only changes the last bucket, and when there are too many buckets
+neighbours are merged, so a graph is never worked out again from the
+samples while it's shown.
+"""
+from array import array
+
+CAPACITY = 3 * 3600 # ticks of history kept
+POINTS = 300 # most buckets in a MinMax, each one is drawn as 2 points
+
+
+class History:
+    """The last CAPACITY samples of a Ledger's values and totals."""
+
+    def __init__(self, ledger, capacity=CAPACITY):
+        self.ledger = ledger
+        self.width = len(ledger.values) # values in a sample
+        self.capacity = capacity
+        self.values = array('q', bytes(8 * capacity * self.width)) # sample i is at [i * width:(i + 1) * width]
+        self.totals = array('q', bytes(8 * capacity * self.width))
+        self.count = 0 # samples recorded since the start, the next one goes to row count % capacity
+
+    def record(self, n=1):
+        """Add n samples of the Ledger as it is now, e.g. for ticks that were run together."""
+        width = self.width
+        for k in range(min(n, self.capacity)):
+            start = (self.count + k) % self.capacity * width
+            self.values[start:start+width] = self.ledger.values
+            self.totals[start:start+width] = self.ledger.totals
+        self.count = self.count + n
+
+    def first(self):
+        """Number of the oldest sample still kept."""
+        return max(self.count - self.capacity, 0)
+
+    def series(self, index, start, totals=False):
+        """The samples of the Resource at index from sample number start on, oldest first."""
+        samples = self.totals if totals else self.values
+        start = max(start, self.first())
+        if start >= self.count:
+            return array('q')
+        width = self.width
+        row = start % self.capacity
+        end = row + self.count - start
+        if end <= self.capacity:
+            return samples[row*width+index:end*width:width]
+        # the samples wrap around the end of the buffer
+        return samples[row*width+index::width] + samples[index:(end-self.capacity)*width:width]
+
+
+class MinMax:
+    """
+    A series grouped into at most POINTS buckets of self.size consecutive
+    samples each, keeping the smallest and largest sample of each bucket.
+    """
+
+    def __init__(self, start=0, points=POINTS):
+        self.points = points
+        self.size = 1 # samples in a bucket, doubles when there are too many buckets
+        self.start = start # number of the first sample of the first bucket
+        self.end = start # number of the next sample to add
+        self.mins = []
+        self.maxes = []
+
+    def extend(self, samples):
+        for sample in samples:
+            if (self.end - self.start) % self.size == 0:
+                if len(self.mins) == self.points:
+                    self.merge()
+                self.mins.append(sample)
+                self.maxes.append(sample)
+            else:
+                if sample < self.mins[-1]:
+                    self.mins[-1] = sample
+                if sample > self.maxes[-1]:
+                    self.maxes[-1] = sample
+            self.end = self.end + 1
+
+    def merge(self):
+        """Merge neighbouring buckets, halving their number."""
+        self.mins = [min(self.mins[k:k+2]) for k in range(0, len(self.mins), 2)]
+        self.maxes = [max(self.maxes[k:k+2]) for k in range(0, len(self.maxes), 2)]
+        self.size = self.size * 2
+
+    def drop(self, first):
+        """Drop the buckets that end before sample number first, e.g. once they're overwritten."""
+        while self.mins and self.start + self.size <= first:
+            del self.mins[0], self.maxes[0]
+            self.start = self.start + self.size
+        if self.end < first or not self.mins: # every sample is gone, carry on from first
+            self.mins.clear()
+            self.maxes.clear()
+            self.start = self.end = max(self.end, first)
+
+    def points_in_order(self):
+        """(sample number, value) of the points to draw, min then max of each bucket."""
+        points = []
+        last = self.end - 1 # the last bucket may not be full yet
+        for k, (low, high) in enumerate(zip(self.mins, self.maxes)):
+            tick = self.start + k * self.size
+            points.append((tick, low))
+            if high != low:
+                points.append((min(tick + self.size // 2, last), high))
+        return points
@@ -0,0 +1,132 @@
+"""
+Journal of the player's actions, so a game can be replayed exactly, e.g.
+to reproduce a slowdown or a balance bug.
+
+    py journal.py incremental-game.journal         replay it and check it
+
+A journal is little-endian binary:
+    header      magic, version, the Game's ticks when it was started,
+                length of the save that follows
+    save        save.dumps() of the game it starts from
+    records     tick, action, index, n for every model.Game.act(), with
+                n = NONE for None
+Every CHECK_EVERY actions, and whenever check() is called, a record with
+the action CHECK holds a checksum of the whole game instead. Replaying
+runs the ticks between two records with model.Game.fast_forward(), which
+gives the same game as ticking them one by one, and raises ValueError if
+a checksum doesn't match.
+"""
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+import model
+import save
+
+MAGIC = b'ICGJ'
+VERSION = 1
+HEADER = struct.Struct('<4sHQI') # magic, version, start tick, length of the save
+RECORD = struct.Struct('<IBHq') # tick, action, index, n
+CHECK = 255 # action of a record holding a checksum in n
+NONE = -2**63 # n of a record for None, an activate can be negative
+CHECK_EVERY = 1000 # actions between checksums
+
+
+def checksum(game):
+    """crc32 of everything saved about game, leaving out the save's own crc32, which would make it a constant."""
+    return zlib.crc32(save.dumps(game, 0)[:-save.CRC.size])
+
+
+class Journal:
+    """Appends every action of game to the file at path, replacing what was there."""
+
+    def __init__(self, path, game):
+        self.game = game
+        self.file = open(path, 'wb')
+        game.achievements.update() # from here on they're checked after every change, see model.Game.act()
+        state = save.dumps(game, 0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, game.ticks, len(state)))
+        self.file.write(state)
+        self.actions = 0 # actions recorded
+        game.journal = self.record
+
+    def record(self, tick, action, index, n):
+        if self.actions % CHECK_EVERY == 0:
+            self.check()
+        self.file.write(RECORD.pack(tick, action, index, NONE if n is None else n))
+        self.actions = self.actions + 1
+
+    def check(self):
+        """Record a checksum of the game as it is now."""
+        self.file.write(RECORD.pack(self.game.ticks, CHECK, 0, checksum(self.game)))
+
+    def flush(self):
+        self.check()
+        self.file.flush()
+
+    def close(self):
+        self.game.journal = None
+        self.check()
+        self.file.close()
+
+
+def replay(data, tables=None):
+    """
+    Replay the bytes of a journal on a new model.Game as fast as possible.
+    Returns (game, number of actions, number of checksums verified).
+    Raises ValueError if data isn't a journal or the replay differs from
+    the game it was recorded from.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('not a journal')
+    magic, version, start, size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('not a journal')
+    if version != VERSION:
+        raise ValueError(f'journal version {version} is not supported')
+    game = model.Game(tables)
+    offset = HEADER.size + size
+    save.loads(game, data[HEADER.size:offset])
+    game.ticks = start
+    # a record cut short by a crash is left out
+    end = offset + (len(data) - offset) // RECORD.size * RECORD.size
+    act = game.act
+    actions = checks = 0
+    for tick, action, index, n in RECORD.iter_unpack(memoryview(data)[offset:end]):
+        if tick != game.ticks:
+            if tick == game.ticks + 1:
+                game.tick()
+            elif tick > game.ticks:
+                game.fast_forward(tick - game.ticks)
+            else:
+                raise ValueError(f'journal goes back from tick {game.ticks} to {tick}')
+        if action == CHECK:
+            if checksum(game) != n:
+                raise ValueError(f'the replay differs from the game at tick {tick}, after {actions} actions')
+            checks = checks + 1
+        else:
+            act(action, index, None if n == NONE else n)
+            actions = actions + 1
+    return game, actions, checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a journal of actions and check it against its checksums.')
+    parser.add_argument('path', help='journal file, e.g. incremental-game.journal')
+    args = parser.parse_args()
+    with open(args.path, 'rb') as f:
+        data = f.read()
+    start = time.perf_counter()
+    try:
+        game, actions, checks = replay(data)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    seconds = time.perf_counter() - start
+    print(f'{actions} actions over {game.ticks} ticks replayed in {seconds:.3f} s ({actions / max(seconds, 1e-9):,.0f} actions/s), {checks} checksums match')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1238 @@
+"""
+Headless simulation core for the incremental game.
+Nothing in here imports tkinter, game.py builds the Tk views on top of
+these classes. A Game can be created and ticked from a script, e.g.
+
+    game = Game()
+    game.collect()
+    game.tick()
+
+Quantities are integers, so that a tick, a fast forward and a bulk buy or
+sell give exactly the same results: amounts of a Resource are in
+centi-units (CENT per unit), percentages are in ten-thousandths (BASIS is
+100%) and per second rates are in RATE per unit, fine enough for a
+percentage of an amount. An int64 holds up to 92 quadrillion units.
+"""
+import heapq
+import math
+from array import array
+from collections import namedtuple
+
+import content
+import profiler
+import rng
+
+
+CENT = content.CENT # centi-units per unit
+BASIS = content.BASIS # ten-thousandths in 100%
+RATE = CENT * BASIS # per second rates per unit
+LIMIT = 2**63 - 1 # largest amount an int64 can hold, max_nums stop growing here
+
+# player actions, see Game.act()
+BUY, SELL, ACTIVATE, CONVERT, COLLECT, CHEAT = range(6)
+
+# streams of random draws, see rng.py
+LUCKY_STREAM = 0 # whether a collect or a conversion gives twice as much, see Game.lucky()
+EVENT_STREAMS = 1 # random event e draws from stream EVENT_STREAMS + e, see RandomEvents
+EVENT_SCAN = 4096 # most periods of a random event drawn ahead to find when it next happens
+LUCKY_BATCH = 65536 # most lucky draws made at once by lucky_times()
+
+
+def divide(n, d):
+    """n / d rounded to the nearest integer, halves round up."""
+    return (2 * n + d) // (2 * d)
+
+
+def units(n, scale=CENT):
+    """A fixed point amount in units, for showing, e.g. units(1250) == 12.5 and units(500) == 5."""
+    return n // scale if n % scale == 0 else n / scale
+
+
+# something that happened during Game.fast_forward(), tick is the number of seconds after the start
+# kind is one of 'cap', 'stall', 'resume', 'achievement', 'season' or 'random', subject is the Resource, Converter,
+# achievement index, season index or the indexes of the random events going on
+Event = namedtuple('Event', 'tick kind subject')
+
+
+class Ledger:
+    """
+    Contiguous int64 arrays holding the quantity and maximum (in
+    centi-units) and per second rate (in 1/RATE) of every Resource.
+    A Resource is an index into these arrays.
+
+    The Ledger also records which Resources changed, so that views only
+    refresh what depends on them. self.listener is called on the first
+    change after pop_changed(), e.g. to schedule a refresh.
+    """
+
+    def __init__(self):
+        self.values = array('q') # quantity of each Resource
+        self.max_nums = array('q') # maximum value of each Resource
+        self.totals = array('q') # per second increase of each Resource
+        self.resources = [] # Resource at each index
+        self.changed = set() # indexes of the Resources that changed since pop_changed()
+        self.listener = None # called with no arguments when something changes
+        self.notified = False # True if listener has been called since pop_changed()
+
+    def add(self, resource):
+        self.values.append(0)
+        self.max_nums.append(0)
+        self.totals.append(0)
+        self.resources.append(resource)
+        return len(self.resources) - 1
+
+    def mark(self, index):
+        """Record that the Resource at index changed."""
+        self.changed.add(index)
+        if not self.notified:
+            self.notify()
+
+    def notify(self):
+        """Call the listener, once until the next pop_changed()."""
+        if not self.notified:
+            self.notified = True
+            if self.listener is not None:
+                self.listener()
+
+    def set_values(self, new_values):
+        """Replace every value with new_values and mark the ones that changed, returns their indexes."""
+        values = self.values
+        if new_values == values:
+            return []
+        changed = [i for i, (old, new) in enumerate(zip(values, new_values)) if old != new]
+        self.changed.update(changed)
+        values[:] = new_values
+        self.notify()
+        return changed
+
+    def pop_changed(self):
+        """Return the indexes of the Resources changed since the last call."""
+        changed = self.changed
+        self.changed = set()
+        self.notified = False
+        return changed
+
+
+class Resource:
+    """
+    A Resource represents a resource used to build / create stuff.
+    self.value counts the quantity of the resource
+    self.total counts the per/second increase of the resource
+    Both are stored in the Ledger, along with self.max_num. The properties
+    are in units, the model works on self.cents and the Ledger's arrays.
+    """
+
+    def __init__(self, ledger, name, max_num):
+        self.ledger = ledger
+        self.index = ledger.add(self) # index of this Resource in the Ledger's arrays
+        self.name = name
+        self.update_max_num(max_num) # set the default max_num as the argument max_num, in centi-units
+        self.current_efficiency_bonus = 0 # efficiency bonus shown next to the resource, in 1/BASIS
+        self.seen = False # True once the resource has been updated for the first time
+
+    @property
+    def cents(self):
+        return self.ledger.values[self.index]
+
+    @cents.setter
+    def cents(self, v):
+        self.ledger.values[self.index] = v
+        self.ledger.mark(self.index)
+
+    @property
+    def value(self):
+        return self.ledger.values[self.index] / CENT
+
+    @value.setter
+    def value(self, v):
+        self.cents = round(v * CENT)
+
+    @property
+    def total(self):
+        return self.ledger.totals[self.index] / RATE
+
+    @property
+    def max_num(self):
+        return self.ledger.max_nums[self.index] // CENT
+
+    def update(self, p):
+        """Add p units, staying between 0 and max_num."""
+        self.update_cents(round(p * CENT))
+
+    def update_cents(self, c):
+        """Add c centi-units, staying between 0 and max_num."""
+        ledger, index = self.ledger, self.index
+        ledger.values[index] = min(max(ledger.values[index] + c, 0), ledger.max_nums[index])
+        ledger.mark(index)
+        self.seen = True
+
+    def update_max_num(self, c):
+        """Add c centi-units to max_num, at most LIMIT."""
+        self.ledger.max_nums[self.index] = min(self.ledger.max_nums[self.index] + c, LIMIT)
+        self.ledger.mark(self.index)
+
+    def update_efficiency_bonus(self, p):
+        self.current_efficiency_bonus = self.current_efficiency_bonus + p
+        self.ledger.mark(self.index)
+
+
+class Ingredient(Resource):
+    """Resource that is shown under the 'Ingredients' label."""
+
+
+class Building:
+    """
+    For buildings that can be bought and sold.
+    Standard Building increases production of new_resource by +bonus_val/s
+
+    The k-th Building (counting from 0) costs round(cost * cost_mult**k)
+    centi-units of each buy_resource, whatever was bought and sold before.
+    The sums of these costs are kept in a table per buy_resource, so
+    buying and selling n Buildings is exact.
+    """
+
+    def __init__(self, buy_resources, new_resources, costs, cost_mults, bonus_vals, name, visible_resource, visible_value):
+        self.buy_resources = buy_resources # Resource(s) that are used to buy the building
+        self.new_resources = new_resources # Resource(s) that the building generates
+        self.num = 0 # number of buildings owned
+        self.base_costs = costs # cost to build the first building, in centi-units
+        self.cost_mults = cost_mults # how much the price increases each time a new bulding is bought
+        self.cost_sums = [[0] for cost in costs] # for each buy_resource, cost_sums[i][k] is the cost of the first k buildings
+        self.bonus_vals = bonus_vals # the bonus the building applies to each resource in new_resources, every new_resource has an associated bonus_val, same index
+        self.name = name # name of building
+        self.visible_resource = visible_resource # the Resource used to tell if the building should be visible
+        self.visible_value = visible_value # number of visible_resources needed to make the building visible
+        self.efficiency_bonus = BASIS # modify the bonus given to production, this bonus applies to the building as a whole, all things the buliding produces is affected
+        self.multiplier = BASIS # production is multiplied by this during random events, in 1/BASIS
+        self.production = None # the Production this Building is compiled into, set by Production
+        self.revision = 0 # increases every time the Building changes, e.g. to know when a Hovertip is out of date
+
+    def changed(self):
+        """Tell the Production that this Building has changed."""
+        self.revision = self.revision + 1
+        if self.production is not None:
+            self.production.dirty = True
+            self.production.changed_buildings.add(self)
+            self.production.update_rates(self)
+            self.production.ledger.notify()
+
+    @property
+    def efficiency(self):
+        """
+        What the Building produces at in 1/BASIS of bonus_vals, its
+        efficiency_bonus times the multiplier of the random events. Changes
+        that add up to less than nothing stop it, a Building never takes
+        away what it produces.
+        """
+        return max(self.efficiency_bonus, 0) * self.multiplier // BASIS
+
+    def rates(self):
+        """Resource index -> per second rate in 1/RATE that this Building adds to the Ledger's totals."""
+        rates = {}
+        if self.num > 0:
+            efficiency = self.efficiency
+            for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
+                rates[new_resource.index] = rates.get(new_resource.index, 0) + self.num * bonus_val * efficiency
+        return rates
+
+    def cost_sum(self, i, k):
+        """Cost of the first k Buildings in centi-units of buy_resources[i]."""
+        cost, cost_mult, sums = self.base_costs[i], self.cost_mults[i], self.cost_sums[i]
+        if cost_mult == 1:
+            return cost * k
+        while len(sums) <= k:
+            sums.append(sums[-1] + round(cost * cost_mult**(len(sums) - 1)))
+        return sums[k]
+
+    @property
+    def costs(self):
+        """Cost of the next Building in centi-units, for each buy_resource."""
+        return [self.cost_sum(i, self.num + 1) - self.cost_sum(i, self.num) for i in range(len(self.base_costs))]
+
+    def cost_of(self, n):
+        """Total cost of buying n more Buildings in centi-units, for each buy_resource."""
+        return [self.cost_sum(i, self.num + n) - self.cost_sum(i, self.num) for i in range(len(self.base_costs))]
+
+    def can_afford(self, n):
+        for buy_resource, total in zip(self.buy_resources, self.cost_of(n)):
+            if buy_resource.cents < total:
+                return False
+        return True
+
+    def max_affordable(self):
+        """Largest number of Buildings that can be bought at once."""
+        if not self.can_afford(1):
+            return 0 # the usual answer, e.g. for a disabled button
+        n = None
+        for buy_resource, cost, cost_mult in zip(self.buy_resources, self.costs, self.cost_mults):
+            # invert the geometric series for each buy_resource, the smallest answer can be afforded
+            if cost_mult == 1:
+                n_i = buy_resource.cents // cost
+            else:
+                n_i = math.floor(math.log1p(buy_resource.cents * (cost_mult - 1) / cost) / math.log(cost_mult))
+            if n is None or n_i < n:
+                n = n_i
+        n = max(n, 0)
+        # the estimate can be off by one from rounding each cost
+        while n > 0 and not self.can_afford(n):
+            n = n - 1
+        while self.can_afford(n + 1):
+            n = n + 1
+        return n
+
+    @profiler.section('Building.buy')
+    def buy(self, n=1):
+        """
+        Buy n Buildings, or as many as can be afforded if that's less than n.
+        n=None buys as many as can be afforded. Returns the number bought.
+        """
+        if n != 1 or not self.can_afford(1): # usually one that can be afforded, which is quicker to check
+            n = self.max_affordable() if n is None else min(n, self.max_affordable())
+        if n <= 0:
+            return 0
+        # deduct cost from Resource(s) to buy n buildings
+        for buy_resource, total in zip(self.buy_resources, self.cost_of(n)):
+            buy_resource.update_cents(-total)
+        self.num = self.num + n # increase the number of this Building
+        self.apply_effects(n)
+        self.changed()
+        return n
+
+    @profiler.section('Building.sell')
+    def sell(self, s):
+        """Sell s Buildings (at most the number owned) and refund the user. Returns the number sold."""
+        s = min(s, self.num)
+        if s <= 0:
+            return 0
+        # the refund is the cost of the last s buildings bought
+        self.num = self.num - s # update the number of Building
+        for buy_resource, total in zip(self.buy_resources, self.cost_of(s)):
+            buy_resource.update_cents(total) # refund the user
+        self.apply_effects(-s)
+        self.changed()
+        return s
+
+    def apply_effects(self, n):
+        """
+        Apply the effects of n more Buildings, n is negative when selling.
+        What a Building produces is in rates(), not an effect.
+        """
+
+    def can_buy(self):
+        return self.can_afford(1)
+
+    def is_visible(self):
+        return self.visible_resource.cents >= self.visible_value
+
+
+class Converter(Building):
+    """
+    Buildings but the number of buildings activated can be changed
+    by the user.
+
+    While activated, a Converter deducts from old_resource to add
+    some value to the new_resource.
+    """
+
+    def __init__(self, buy_resources, old_resources, new_resources, costs, cost_mults, bonus_vals, conversion_costs, name, visible_resource, visible_value):
+        super().__init__(buy_resources, new_resources, costs, cost_mults, bonus_vals, name, visible_resource, visible_value)
+        self.old_resources = old_resources # Resource that gets converted into new_resource
+        self.conversion_costs = conversion_costs # number(s) of old_resources spent for each conversion
+        self.activated_num = 0 # number of Converters activated
+
+    def activated_increase(self, i):
+        """Activate i more Converters, deactivate when i is negative, between none and all of them. Returns the change."""
+        i = min(max(self.activated_num + i, 0), self.num) - self.activated_num
+        self.activated_num = self.activated_num + i
+        self.changed()
+        return i
+
+    def rates(self):
+        # only activated Converters consume and produce
+        rates = {}
+        if self.activated_num > 0:
+            for old_resource, conversion_cost in zip(self.old_resources, self.conversion_costs):
+                rates[old_resource.index] = rates.get(old_resource.index, 0) - self.activated_num * conversion_cost * BASIS
+            efficiency = self.efficiency
+            for new_resource, bonus_val in zip(self.new_resources, self.bonus_vals):
+                rates[new_resource.index] = rates.get(new_resource.index, 0) + self.activated_num * bonus_val * efficiency
+        return rates
+
+    def apply_effects(self, n):
+        if n > 0:
+            self.activated_increase(n) # when buying a new Converter, it is activated by default
+        elif self.activated_num > self.num: # when maxmium Converters are being used
+            self.activated_increase(self.num - self.activated_num)
+
+
+class StorageBuilding(Building):
+    """Building that increases the maximum amount of a sequence of Resources."""
+
+    def __init__(self, buy_resources, costs, cost_mults, name, visible_resource, visible_value, expand_resources, expand_vals):
+        # StorageBuilding doesn't produce anything, so new_resources and bonus_vals are empty
+        super().__init__(buy_resources, (), costs, cost_mults, [], name, visible_resource, visible_value)
+        self.expand_resources = expand_resources # sequence of resources whos max_num is to be expanded
+        self.expand_vals = expand_vals # sequence of values to expand each resource by
+
+    def apply_effects(self, n):
+        for expand_resource, expand_val in zip(self.expand_resources, self.expand_vals):
+            expand_resource.update_max_num(n * expand_val)
+
+
+class EfficiencyBuilding(Building):
+    """
+    Building that improves the production of a sequence of Buildings'
+    new resources by a sequence of percentages.
+    """
+
+    def __init__(self, buy_resources, costs, cost_mults, name, visible_resource, visible_value, applied_buildings, efficiency_increases):
+        # simlar to StorageBuilding, a Resource is not being directly increased because of this Building
+        # this Building only modifies the production of other Buildings
+        super().__init__(buy_resources, (), costs, cost_mults, [], name, visible_resource, visible_value)
+        self.applied_buildings = applied_buildings
+        self.efficiency_increases = efficiency_increases
+
+    def apply_effects(self, n):
+        for building, efficiency_increase in zip(self.applied_buildings, self.efficiency_increases): # change efficiency_bonus of every Building in self.applied_buildings
+            building.efficiency_bonus += n * efficiency_increase # change efficiency_bonus
+            for new_resource, bonus_val in zip(building.new_resources, building.bonus_vals):
+                new_resource.update_efficiency_bonus(n * efficiency_increase) # update the [+x%] value
+            building.changed() # its rates() change
+
+
+class StorageAndEfficiencyBuilding(EfficiencyBuilding):
+    """Building with that increases both storage and efficiency"""
+
+    # copying code from StorageBuilding rather than trying to do multiple inheritance stuff
+    def __init__(self, buy_resources, costs, cost_mults, name, visible_resource, visible_value, applied_buildings, efficiency_increases, expand_resources, expand_vals):
+        super().__init__(buy_resources, costs, cost_mults, name, visible_resource, visible_value, applied_buildings, efficiency_increases)
+        self.expand_resources = expand_resources # sequence of resources whos max_num is to be expanded
+        self.expand_vals = expand_vals # sequence of values to expand each resource by
+        self.bought_before = False # True if the StorageAndEfficiencyBuilding has been bought before
+
+    def apply_effects(self, n):
+        for expand_resource, expand_val in zip(self.expand_resources, self.expand_vals):
+            expand_resource.update_max_num(n * expand_val)
+        super().apply_effects(n)
+        if n > 0:
+            self.bought_before = True
+
+
+class Convert:
+    """Exchanges some old resources for a new resource."""
+
+    def __init__(self, achievements, buy_resources, new_resource, costs, reward, visible_resource, visible_value):
+        self.achievements = achievements # achievement bonus applies to all ice cream conversions
+        self.buy_resources = buy_resources # Resource(s) that gets converted into new_resource
+        self.new_resource = new_resource # Resource converted from buy_resource
+        self.costs = costs # number of buy_resources spent for each conversion, in centi-units
+        self.reward = reward # number of new_resources received for each conversion, in centi-units
+        self.visible_resource = visible_resource # the Resource used to tell if the Convert should be visible
+        self.visible_value = visible_value # number of visible_resources needed to make the Convert visible
+
+    def max_converts(self):
+        """Number of conversions that can be afforded, min(floor(stock / cost)) over buy_resources."""
+        return min(buy_resource.cents // cost for buy_resource, cost in zip(self.buy_resources, self.costs))
+
+    @profiler.section('Convert.convert')
+    def convert(self, n=1):
+        """
+        Convert n times, or as many times as possible if there isn't enough
+        for n conversions. n=None converts the maximum possible.
+        """
+        # send buy_resources as a tuple e.g. (ice_cream, vanilla_spice)
+        # send costs as a tuple e.g. (3, 10)
+        n = self.max_converts() if n is None else min(n, self.max_converts())
+        if n <= 0:
+            return 0
+        # one debit for each buy_resource and one credit for new_resource
+        for buy_resource, cost in zip(self.buy_resources, self.costs):
+            buy_resource.update_cents(-n * cost)
+        self.new_resource.update_cents(self.reward_of(n))
+        return n
+
+    def reward_of(self, n):
+        """Centi-units of new_resource that n conversions give."""
+        return divide(n * self.reward * self.achievements.bonus, BASIS)
+
+    def can_convert(self):
+        for buy_resource, cost in zip(self.buy_resources, self.costs):
+            if buy_resource.cents < cost:
+                return False
+        return True
+
+    def is_visible(self):
+        return self.visible_resource.cents >= self.visible_value
+
+
+class Achievements:
+    """
+    Keeps track of which achievements are complete. Every achievement
+    increases self.bonus, which is used by every Convert.
+    """
+
+    def __init__(self, resource_and_ingredient_list):
+        self.bonus = BASIS # achievemnt bonus applies to all ice cream conversions, in 1/BASIS
+        self.values = [] # each index has a list, [resource, num_required, bonus]
+        for resource in resource_and_ingredient_list:
+            self.values.append([resource, 5, 69])
+            self.values.append([resource, 10, 135])
+            self.values.append([resource, 50, 204])
+            self.values.append([resource, 100, 339])
+            self.values.append([resource, 1000, 678])
+        # create the requirement strings
+        self.requirements = []
+        for value in self.values:
+            if value[0].name == 'Milk':
+                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()}s')
+            elif value[0].name == 'Ice Cream':
+                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()}')
+            elif isinstance(value[0], Ingredient):
+                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()}')
+            else:
+                self.requirements.append(f'Obtain {value[1]} {value[0].name.strip()} ice cream')
+        self.done = [False for i in range(len(self.requirements))] # which achievements are complete
+        # the achievements of each Resource sorted by num_required, so only the next one needs checking
+        self.thresholds = {} # Resource index -> achievement indexes
+        for i, value in enumerate(self.values):
+            self.thresholds.setdefault(value[0].index, []).append(i)
+        for thresholds in self.thresholds.values():
+            thresholds.sort(key=lambda i: self.values[i][1])
+        self.cursors = dict.fromkeys(self.thresholds, 0) # Resource index -> position of the first achievement not done
+        ledger = resource_and_ingredient_list[0].ledger
+        self.amounts = ledger.values # the Ledger's values, they're always changed in place
+        self.goals = [math.inf] * len(ledger.values) # centi-units each Resource's next achievement needs, math.inf if there's none
+        self.set_goals()
+        self.new = [] # indexes of the achievements done since pop_new()
+
+    def set_goals(self):
+        for index, thresholds in self.thresholds.items():
+            cursor = self.cursors[index]
+            self.goals[index] = self.values[thresholds[cursor]][1] * CENT if cursor < len(thresholds) else math.inf
+
+    def set_done(self, done):
+        """Replace which achievements are complete, e.g. from a save file."""
+        self.done[:] = done
+        self.bonus = BASIS + sum(value[2] for value, d in zip(self.values, done) if d)
+        for index, thresholds in self.thresholds.items():
+            cursor = 0
+            while cursor < len(thresholds) and self.done[thresholds[cursor]]:
+                cursor = cursor + 1
+            self.cursors[index] = cursor
+        self.set_goals()
+
+    def next_unmet(self):
+        """Yield (resource, num_required) of the next achievement of each Resource."""
+        for index, thresholds in self.thresholds.items():
+            cursor = self.cursors[index]
+            if cursor < len(thresholds):
+                resource, num_required, bonus = self.values[thresholds[cursor]]
+                yield resource, num_required
+
+    @profiler.section('Achievements.update')
+    def update(self, indexes=None):
+        """
+        Mark newly reached achievements as done and return their indexes.
+        Only the Resources at indexes are checked, or every Resource if
+        indexes is None.
+        """
+        new = []
+        amounts, goals = self.amounts, self.goals
+        for index in self.thresholds if indexes is None else indexes:
+            if amounts[index] < goals[index]:
+                continue # its next achievement isn't reached, or it has none
+            thresholds = self.thresholds[index]
+            cursor = self.cursors[index]
+            cents = amounts[index]
+            while cursor < len(thresholds) and cents >= self.values[thresholds[cursor]][1] * CENT:
+                new.append(thresholds[cursor])
+                cursor = cursor + 1
+            self.cursors[index] = cursor
+            goals[index] = self.values[thresholds[cursor]][1] * CENT if cursor < len(thresholds) else math.inf
+        if not new:
+            return new
+        new.sort()
+        for i in new:
+            self.bonus += self.values[i][2]
+            self.done[i] = True
+        self.new.extend(new)
+        return new
+
+    def pop_new(self):
+        """Return the indexes of the achievements done since the last call, for the views."""
+        new = self.new
+        self.new = []
+        return new
+
+
+class Production:
+    """
+    The Building x Resource production matrix of a sequence of Buildings,
+    compiled into arrays so that a tick doesn't loop over the Buildings.
+
+    self.produce is the matrix multiplied by the number of each Building
+    (and its efficiency), i.e. the change of every Resource per tick,
+    rounded to centi-units.
+    Converters are kept as a consumption matrix with a row per activated
+    Converter, sorted so that every Converter comes after the Converters
+    producing its inputs. A tick is solved in one pass over them: when an
+    input is short, every Converter consuming it gets a share of what there
+    is in proportion to its demand, and runs that fraction of the way.
+    The result doesn't depend on the order of the Buildings.
+    The arrays are recompiled only after a Building has changed.
+
+    The Ledger's totals, the per second rate shown for every Resource,
+    are the sums of a table of what each Building adds to each Resource.
+    A Building's row of the table is worked out again whenever it changes,
+    and only the difference is applied to the totals.
+    """
+
+    def __init__(self, ledger, buildings):
+        self.ledger = ledger
+        self.buildings = buildings
+        for building in buildings:
+            building.production = self
+        self.positions = {building: k for k, building in enumerate(buildings)} # Building -> its index in buildings
+        self.rows = {} # Building -> its rates(), the rows of the table of rates
+        self.sources = {} # Resource index -> {Building: rate}, the columns of the table
+        self.dirty = True # True if the Buildings changed since the last compile()
+        self.changed_buildings = set() # Buildings that changed since pop_changed_buildings()
+
+    def update_rates(self, building):
+        """Work out building's row of the table of rates again and apply the difference to the totals."""
+        old, new = self.rows.get(building, {}), building.rates()
+        if old == new:
+            return
+        totals = self.ledger.totals
+        for i in old.keys() | new.keys():
+            difference = new.get(i, 0) - old.get(i, 0)
+            if difference:
+                totals[i] += difference
+                self.ledger.mark(i)
+            if i in new:
+                self.sources.setdefault(i, {})[building] = new[i]
+            else:
+                del self.sources[i][building]
+        self.rows[building] = new
+
+    def breakdown(self, resource):
+        """(Building, per second rate in 1/RATE) of every Building adding to or taking from resource, in order."""
+        sources = self.sources.get(resource.index, {})
+        return sorted(sources.items(), key=lambda source: self.positions[source[0]])
+
+    def compile(self):
+        rates = [0] * len(self.ledger.values) # in 1/RATE, rounded once they're summed
+        converters = []
+        for building in self.buildings:
+            if isinstance(building, Converter):
+                if building.activated_num > 0:
+                    consume_row = [(old_resource.index, building.activated_num * conversion_cost) for old_resource, conversion_cost in zip(building.old_resources, building.conversion_costs)]
+                    produce_row = [(new_resource.index, divide(building.activated_num * bonus_val * building.efficiency, BASIS)) for new_resource, bonus_val in zip(building.new_resources, building.bonus_vals)]
+                    converters.append((building, consume_row, produce_row))
+            elif building.num > 0:
+                for i, rate in self.rows.get(building, {}).items():
+                    rates[i] += rate
+                for new_resource in building.new_resources:
+                    new_resource.seen = True
+        self.produce = array('q', [(2 * rate + BASIS) // (2 * BASIS) for rate in rates]) # divide(rate, BASIS), inlined
+        self.converters = self.order(converters) # each index has a tuple, (converter, consume row, produce row)
+        self.demands = {} # Resource index -> what every converter consumes of it when running in full
+        for converter, consume_row, produce_row in self.converters:
+            for i, c in consume_row:
+                self.demands[i] = self.demands.get(i, 0) + c
+        self.dirty = False
+
+    def order(self, converters):
+        """
+        Sort converters topologically, producers of a Resource before its
+        consumers. Ties, and converters in a cycle, keep their order.
+        """
+        consumers = {} # Resource index -> positions of the converters consuming it
+        for k, (converter, consume_row, produce_row) in enumerate(converters):
+            for i, c in consume_row:
+                consumers.setdefault(i, []).append(k)
+        after = [set() for converter in converters] # positions of the converters that wait for each one
+        for k, (converter, consume_row, produce_row) in enumerate(converters):
+            for i, p in produce_row:
+                after[k].update(j for j in consumers.get(i, ()) if j != k)
+        waiting = [0] * len(converters) # number of converters each one waits for
+        for following in after:
+            for j in following:
+                waiting[j] += 1
+        ready = [k for k, w in enumerate(waiting) if w == 0]
+        heapq.heapify(ready)
+        placed = [False] * len(converters)
+        ordered = []
+        while len(ordered) < len(converters):
+            if not ready: # a cycle, start it from its first converter
+                ready.append(placed.index(False))
+            k = heapq.heappop(ready)
+            if placed[k]:
+                continue
+            placed[k] = True
+            ordered.append(converters[k])
+            for j in after[k]:
+                waiting[j] -= 1
+                if waiting[j] == 0 and not placed[j]:
+                    heapq.heappush(ready, j)
+        return ordered
+
+    def resolve(self, values, plan=False):
+        """
+        Solve one tick from values. Returns the delta of every Resource, the
+        fraction of each converter that runs as (numerator, denominator),
+        (1, 1) when it runs in full, and with plan=True what keeps the
+        fractions the same: for every converter, a tuple (binding, check).
+        binding is the index of the input that limits it or None, check is a
+        list of (index, margin) for its other inputs, the fraction stays the
+        same while the value at index + margin >= 0.
+        """
+        delta = array('q', self.produce)
+        inflow = array('q', self.produce) # what's added to each Resource before it's consumed
+        demands = self.demands
+        runs = []
+        checks = []
+        for converter, consume_row, produce_row in self.converters:
+            # the converter runs the fraction of its shortest input's share
+            num, den, binding = 1, 1, None
+            for i, c in consume_row:
+                supply, demand = values[i] + inflow[i], demands[i]
+                if supply * den < demand * num:
+                    num, den, binding = supply, demand, i
+            if binding is None:
+                for i, c in consume_row:
+                    delta[i] -= c
+                for i, p in produce_row:
+                    delta[i] += p
+                    inflow[i] += p
+            else:
+                for i, c in consume_row:
+                    delta[i] -= c * num // den
+                for i, p in produce_row:
+                    p = p * num // den
+                    delta[i] += p
+                    inflow[i] += p
+            if num > 0:
+                for new_resource in converter.new_resources:
+                    new_resource.seen = True
+            runs.append((num, den))
+            if plan:
+                # each other input's share is at least num / den while value + inflow >= demand * num / den
+                checks.append((binding, [(i, inflow[i] + demands[i] * num // -den) for i, c in consume_row if i != binding]))
+        return delta, runs, checks
+
+    def tick(self):
+        """Add one second of production to the Ledger, returns the indexes of the Resources that changed."""
+        if self.dirty:
+            self.compile()
+        values = self.ledger.values
+        delta = self.produce
+        if self.converters:
+            delta, runs, checks = self.resolve(values)
+        # clip every Resource between 0 and its max_num, comparing is quicker than min() and max() and most are in range
+        return self.ledger.set_values(array('q', [x if 0 <= (x := v + d) <= m else (0 if x < 0 else m) for v, d, m in zip(values, delta, self.ledger.max_nums)]))
+
+    def pop_changed_buildings(self):
+        """Return the Buildings changed since the last call."""
+        changed = self.changed_buildings
+        self.changed_buildings = set()
+        return changed
+
+    def plan(self):
+        """Work out the next tick without applying it, returns resolve(plan=True)."""
+        if self.dirty:
+            self.compile()
+        return self.resolve(self.ledger.values, plan=True)
+
+    def ticks_until_change(self, delta, checks):
+        """
+        Number of ticks until the fractions from plan() change, if every
+        Resource changes linearly by delta until then.
+        """
+        values = self.ledger.values
+        first = math.inf
+        for binding, check in checks:
+            if binding is not None and delta[binding] != 0:
+                return 1 # the share of the limiting input changes every tick
+            for i, margin in check:
+                v, d = values[i] + margin, delta[i]
+                if d < 0 and v >= 0:
+                    first = min(first, v // -d + 1)
+        return first
+
+    def advance(self, n, delta):
+        """Apply n ticks of delta at once, every Resource stays between 0 and its max_num."""
+        values = self.ledger.values
+        self.ledger.set_values(array('q', [x if 0 <= (x := v + n * d) <= m else (0 if x < 0 else m) for v, d, m in zip(values, delta, self.ledger.max_nums)]))
+
+
+class Clock:
+    """
+    Counts the ticks that are due by a monotonic time, e.g. time.monotonic(),
+    so that there's a tick every period seconds on average no matter how
+    late the caller is. Ticks more than max_ticks behind are dropped.
+    """
+
+    def __init__(self, now, period=1.0, max_ticks=600):
+        self.period = period # seconds per tick
+        self.max_ticks = max_ticks # most ticks that are caught up at once
+        self.last = now # time of the last tick that was counted
+        self.merged = 0 # number of ticks run late together with another tick
+        self.dropped = 0 # number of ticks skipped because they were too late
+
+    def advance(self, now):
+        """Return the number of ticks to run at now and the number dropped."""
+        due = int((now - self.last) // self.period)
+        if due <= 0:
+            return 0, 0
+        self.last = self.last + due * self.period # keep the remainder so ticks don't drift
+        dropped = max(due - self.max_ticks, 0)
+        self.merged = self.merged + min(due, self.max_ticks) - 1
+        self.dropped = self.dropped + dropped
+        return due - dropped, dropped
+
+    def delay(self, now):
+        """Seconds from now until the next tick is due."""
+        return max(self.last + self.period - now, 0.0)
+
+
+class Schedule:
+    """
+    Changes of some Buildings that only depend on the tick, by default of
+    their efficiency_bonus, applied like an EfficiencyBuilding's, so a
+    change is part of the rates and is shown next to what the Buildings
+    produce. changes_at() works out the changes at a tick and the tick
+    they last until, self.end. The Game starts them again when its ticks
+    reach self.end, which fast_forward() treats as an event, so nothing
+    is worked out per tick.
+    """
+    UNCHANGED = 0 # the change of a Building that isn't changed
+
+    def __init__(self, buildings):
+        self.buildings = buildings
+        self.positions = {building: k for k, building in enumerate(buildings)} # Building -> its index in buildings
+        self.applied = array('q', [self.UNCHANGED]) * len(buildings) # change of every Building applied, in 1/BASIS
+        self.since = 0 # tick the applied changes are those of
+        self.end = math.inf # tick the changes are worked out again at
+
+    def changes_at(self, tick):
+        """(efficiency change of every Building at tick in 1/BASIS, tick they last until)."""
+        raise NotImplementedError
+
+    def start(self, tick):
+        """Apply the changes at tick in place of the ones applied."""
+        changes, end = self.changes_at(tick)
+        for building, old, new in zip(self.buildings, self.applied, changes):
+            if new != old:
+                self.apply(building, old, new)
+                building.changed() # its rates() change
+        self.applied, self.since, self.end = changes, tick, end
+
+    def apply(self, building, old, new):
+        """Replace the change old of building by new."""
+        building.efficiency_bonus += new - old
+        for new_resource in building.new_resources:
+            new_resource.update_efficiency_bonus(new - old) # update the [+x%] value
+
+    def restore(self, tick):
+        """Note that the changes at tick are already applied, e.g. by a saved game."""
+        self.applied, self.end = self.changes_at(tick)
+        self.since = tick
+
+    def clear(self):
+        """Note that no changes are applied, e.g. by a game saved before there were any."""
+        self.applied = array('q', [self.UNCHANGED]) * len(self.buildings)
+        self.end = -math.inf
+
+    def left(self, tick):
+        """Ticks from tick until the changes are worked out again."""
+        return self.end - tick
+
+    def change(self, building):
+        """Change of building applied, in 1/BASIS."""
+        return self.applied[self.positions[building]]
+
+
+class Seasons(Schedule):
+    """
+    The seasons of the year, which repeats every self.year ticks. The
+    season of every tick of the year is worked out once into
+    self.schedule, and each season's change of every Building into
+    self.changes.
+    """
+
+    def __init__(self, tables, buildings):
+        super().__init__(buildings)
+        seasons = tables['seasons']
+        self.names = seasons['names']
+        self.changes = seasons['changes'] # changes[season][k] is the efficiency change of buildings[k] in 1/BASIS
+        self.schedule = array('B') # season at each tick of the year
+        self.ends = array('q') # tick of the year each season ends at
+        for season, length in enumerate(seasons['lengths']):
+            self.schedule.extend(array('B', [season]) * length)
+            self.ends.append(len(self.schedule))
+        self.year = len(self.schedule) # 0 without seasons
+
+    def at(self, tick):
+        """Index of the season at tick, None without seasons."""
+        return self.schedule[tick % self.year] if self.year else None
+
+    @property
+    def current(self):
+        """Index of the season applied, None without seasons."""
+        return self.at(self.since)
+
+    def changes_at(self, tick):
+        season = self.at(tick)
+        if season is None:
+            return array('q', bytes(8 * len(self.buildings))), math.inf
+        return self.changes[season], tick - tick % self.year + self.ends[season]
+
+    def describe(self, building):
+        """(name, efficiency change) of the season if it changes building's efficiency."""
+        change = self.change(building)
+        return [(self.names[self.current], change)] if change else []
+
+
+class RandomEvents(Schedule):
+    """
+    Events that have a chance of starting every self.every[e] ticks and
+    last self.lengths[e] ticks. Whether event e happens in period p, the
+    ticks from p * every[e], is draw p of its own stream of random
+    numbers, see rng.py, so the events at any tick are worked out
+    directly from the seed and the tick. The next period an event happens
+    in is found by drawing a batch of periods at once.
+    An event multiplies what some Buildings produce, e.g. by 3 during a
+    frenzy, so its changes are each Building's multiplier, the product of
+    those of the events going on.
+    """
+    UNCHANGED = BASIS
+
+    def __init__(self, tables, buildings, seed):
+        super().__init__(buildings)
+        events = tables['random_events']
+        self.names = events['names']
+        self.every = events['every']
+        self.lengths = events['lengths']
+        self.limits = [rng.threshold(chance, BASIS) for chance in events['chances']] # a draw below the limit starts the event
+        self.effects = [[(k, multiplier) for k, multiplier in enumerate(multipliers) if multiplier != BASIS] for multipliers in events['multipliers']] # (building index, multiplier) of each event
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        """Draw from seed's streams, the changes applied stay until start() or restore()."""
+        self.keys = [rng.key(seed, EVENT_STREAMS + e) for e in range(len(self.names))]
+
+    def happening(self, e, tick):
+        period, into = divmod(tick, self.every[e])
+        return into < self.lengths[e] and rng.draw(self.keys[e], period) < self.limits[e]
+
+    def active(self):
+        """Indexes of the events applied."""
+        return tuple(e for e in range(len(self.names)) if self.happening(e, self.since))
+
+    def apply(self, building, old, new):
+        building.multiplier = new
+
+    def clear(self):
+        """No event is going on, e.g. before the events of a loaded game are started."""
+        for building in self.buildings:
+            if building.multiplier != BASIS:
+                building.multiplier = BASIS
+                building.changed()
+        super().clear()
+
+    def changes_at(self, tick):
+        changes = array('q', [BASIS]) * len(self.buildings)
+        end = math.inf
+        for e, (every, length, key, limit) in enumerate(zip(self.every, self.lengths, self.keys, self.limits)):
+            if limit == 0:
+                continue # never happens
+            period = tick // every
+            if self.happening(e, tick):
+                for k, multiplier in self.effects[e]:
+                    changes[k] = changes[k] * multiplier // BASIS
+                end = min(end, period * every + length)
+            else:
+                following = rng.first(key, period + 1, EVENT_SCAN, limit)
+                end = min(end, (following if following is not None else period + 1 + EVENT_SCAN) * every)
+        return changes, end
+
+    def describe(self, building):
+        """(name, change of production in 1/BASIS) of every event going on that changes what building produces."""
+        k = self.positions[building]
+        return [(self.names[e], multiplier - BASIS) for e in self.active() for i, multiplier in self.effects[e] if i == k]
+
+
+class Game:
+    """Every Resource, Building, Convert and achievement in the game."""
+
+    def __init__(self, tables=None, seed=0):
+        """
+        tables are the compiled content from content.load(), by default of
+        content.json. seed decides the random events and lucky draws, two
+        games with the same seed and actions are the same. Every Resource,
+        Building and Convert is also an attribute named by its id, e.g.
+        self.milk and self.cow, content.py keeps ids from taking the names
+        in content.RESERVED.
+        """
+        self.tables = content.load() if tables is None else tables
+        self.ledger = Ledger() # holds the value of every Resource
+
+        # resources and ingredients
+        resources = self.tables['resources']
+        all_resources = [] # Resource at each index of the tables
+        for resource_id, name, max_num, ingredient in zip(resources['ids'], resources['names'], resources['max_nums'], resources['ingredient']):
+            resource = (Ingredient if ingredient else Resource)(self.ledger, name, max_num)
+            setattr(self, resource_id, resource)
+            all_resources.append(resource)
+        # keep lists of all resources and all ingredients
+        self.resource_list = [resource for resource in all_resources if not isinstance(resource, Ingredient)]
+        self.ingredient_list = [resource for resource in all_resources if isinstance(resource, Ingredient)]
+
+        # achievements
+        self.achievements = Achievements(self.resource_list + self.ingredient_list)
+
+        # buildings, in the order they're listed
+        def at(indexes):
+            return [all_resources[i] for i in indexes]
+        self.buildings = []
+        for table in self.tables['buildings']:
+            kind = table['type']
+            buy = (tuple(at(table['buy'])), list(table['costs']), list(table['cost_mults']))
+            visible = (table['name'], all_resources[table['visible']], table['visible_value'])
+            if kind == 'Building':
+                building = Building(buy[0], tuple(at(table['produces'])), *buy[1:], list(table['bonus_vals']), *visible)
+            elif kind == 'Converter':
+                building = Converter(buy[0], tuple(at(table['consumes'])), tuple(at(table['produces'])), *buy[1:], list(table['bonus_vals']), list(table['conversion_costs']), *visible)
+            elif kind == 'StorageBuilding':
+                building = StorageBuilding(*buy, *visible, at(table['expands']), list(table['expand_vals']))
+            # applied_buildings are filled in below, they can be listed after this building
+            elif kind == 'EfficiencyBuilding':
+                building = EfficiencyBuilding(*buy, *visible, [], list(table['efficiency_increases']))
+            else:
+                building = StorageAndEfficiencyBuilding(*buy, *visible, [], list(table['efficiency_increases']), at(table['expands']), list(table['expand_vals']))
+            setattr(self, table['id'], building)
+            self.buildings.append(building)
+        for building, table in zip(self.buildings, self.tables['buildings']):
+            if 'improves' in table:
+                building.applied_buildings.extend(self.buildings[i] for i in table['improves'])
+
+        # conversions, convert_milk_i_c is on the control panel and the rest are ice creams
+        self.converts = []
+        for table in self.tables['converts']:
+            convert = Convert(self.achievements, tuple(at(table['buy'])), all_resources[table['makes']], list(table['costs']), table['reward'], all_resources[table['visible']], table['visible_value'])
+            setattr(self, table['id'], convert)
+            self.converts.append(convert)
+        # keep list of ice creams
+        self.i_c_converts = [convert for convert, table in zip(self.converts, self.tables['converts']) if table['panel'] == 'ice_cream']
+
+        # production of every Building, compiled into arrays
+        self.production = Production(self.ledger, self.buildings)
+        self.ticks = 0 # ticks run since the Game was created, a journal stamps actions with it and the seasons follow it
+        self.journal = None # called with (ticks, action, index, n) before every act(), see journal.py
+        # the season changes the efficiency of some Buildings and random events multiply what some produce
+        self.seasons = Seasons(self.tables, self.buildings)
+        self.seasons.start(0)
+        self.random_events = RandomEvents(self.tables, self.buildings, seed)
+        self.lucky_limit = rng.threshold(self.tables['lucky'], BASIS) # a draw below it doubles a collect or a conversion
+        self.lucky_draws = 0 # draws made by lucky()
+        self.reseed(seed)
+        self.random_events.start(0)
+
+    def tick(self):
+        """Use every Building once, this is one second of game time."""
+        self.achievements.update(self.production.tick())
+        self.ticks = self.ticks + 1
+        if self.ticks >= self.seasons.end:
+            self.seasons.start(self.ticks)
+        if self.ticks >= self.random_events.end:
+            self.random_events.start(self.ticks)
+
+    def reseed(self, seed):
+        """Draw random numbers from seed, the random events applied stay until they're started again."""
+        self.seed = seed
+        self.lucky_key = rng.key(seed, LUCKY_STREAM)
+        self.random_events.reseed(seed)
+
+    def lucky(self):
+        """Draw whether the next collect or conversion gives twice as much, returns 2 or 1."""
+        counter = self.lucky_draws
+        self.lucky_draws = counter + 1
+        return 2 if rng.draw(self.lucky_key, counter) < self.lucky_limit else 1
+
+    def lucky_times(self, n):
+        """Draw n times at once, the same as n calls to lucky(), and return how many of them give twice as much."""
+        counter, limit = self.lucky_draws, self.lucky_limit
+        self.lucky_draws = counter + n
+        doubled = 0
+        for start in range(counter, counter + n, LUCKY_BATCH):
+            doubled = doubled + sum(value < limit for value in rng.draws(self.lucky_key, start, min(LUCKY_BATCH, counter + n - start)))
+        return doubled
+
+    def act(self, action, index=0, n=1):
+        """
+        Do a player action and return its result: BUY, SELL, ACTIVATE or
+        CONVERT n of the Building or Convert at index, n=None buys or
+        converts as many as possible, COLLECT n times, e.g. for the clicks
+        of a simulated player, or CHEAT. Each collect and each conversion
+        has a chance of giving twice as much. Achievements are
+        checked right after anything that adds to a Resource, as they are
+        after every tick, so replaying the same actions at the same ticks
+        always gives the same game. Raises ValueError for an action,
+        Building or Convert that doesn't exist or an n that isn't a whole
+        number, before it's journaled.
+        """
+        if action not in (BUY, SELL, ACTIVATE, CONVERT, COLLECT, CHEAT):
+            raise ValueError(f'unknown action {action}')
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise ValueError(f'{index!r} is not an index')
+        if action in (BUY, SELL, ACTIVATE) and not 0 <= index < len(self.buildings):
+            raise ValueError(f'no building {index}')
+        if action == ACTIVATE and not isinstance(self.buildings[index], Converter):
+            raise ValueError(f'building {index} is not a converter')
+        if action == CONVERT and not 0 <= index < len(self.converts):
+            raise ValueError(f'no convert {index}')
+        if n is None:
+            if action not in (BUY, CONVERT):
+                raise ValueError(f'action {action} needs a number')
+        elif not isinstance(n, int) or isinstance(n, bool) or not -2**63 < n < 2**63: # what a journal record holds
+            raise ValueError(f'{n!r} is not a number of times')
+        if self.journal is not None:
+            self.journal(self.ticks, action, index, n)
+        if action == BUY:
+            return self.buildings[index].buy(n)
+        if action == SELL:
+            building = self.buildings[index]
+            sold = building.sell(n)
+            self.achievements.update([buy_resource.index for buy_resource in building.buy_resources]) # refunded
+            return sold
+        if action == ACTIVATE:
+            return self.buildings[index].activated_increase(n)
+        if action == CONVERT:
+            convert = self.converts[index]
+            converted = convert.convert(n)
+            if converted and self.lucky() == 2:
+                convert.new_resource.update_cents(convert.reward_of(converted))
+            self.achievements.update([convert.new_resource.index])
+            return converted
+        if action == COLLECT:
+            self.collect(n + self.lucky_times(n) if n > 0 else 0) # a draw for every collect
+            self.achievements.update([self.milk.index])
+        else:
+            self.cheat()
+            self.achievements.update()
+
+    def fast_forward(self, seconds):
+        """
+        Advance the game by seconds ticks without replaying every tick. The
+        game jumps between events: a Resource reaching its max_num, a
+        Converter's share of its inputs changing, an achievement being
+        reached, a new 'season' starting and the 'random' events going on
+        changing. A Converter 'stall's when it can't run in full and
+        'resume's when it can again. While the Converters' shares keep
+        changing in a cycle, the pattern is detected and whole periods of
+        it are skipped at once. Returns the list of Events, in order.
+        """
+        production = self.production
+        values = self.ledger.values
+        events = []
+        elapsed = 0
+        previous_runs = None
+        states = {} # (fractions, converter inputs) at the start of a segment -> (elapsed, copy of values)
+        events.extend(Event(elapsed, 'achievement', i) for i in self.achievements.update())
+        while elapsed < seconds:
+            if self.start_schedules(self.ticks + elapsed, events, elapsed):
+                states.clear() # the production changed
+            # production stays the same until the season or the random events change
+            remaining = min(seconds - elapsed, self.seasons.left(self.ticks + elapsed), self.random_events.left(self.ticks + elapsed))
+            delta, runs, checks = production.plan()
+            if previous_runs is not None:
+                for (converter, consume_row, produce_row), run, was_running in zip(production.converters, runs, previous_runs):
+                    if (run == (1, 1)) != (was_running == (1, 1)):
+                        events.append(Event(elapsed, 'resume' if run == (1, 1) else 'stall', converter))
+            previous_runs = runs
+
+            # converters whose shares keep changing repeat a cycle, skip whole periods of it
+            if production.converters:
+                inputs = [i for converter, consume_row, produce_row in production.converters for i, c in consume_row]
+                key = (tuple(runs), tuple(values[i] for i in inputs))
+                if key in states:
+                    start, snapshot = states.pop(key)
+                    period = elapsed - start
+                    periods = remaining // period
+                    if periods > 0:
+                        # Resources that aren't converter inputs only grow, inputs are back where they started
+                        period_delta = array('q', [v - s for v, s in zip(values, snapshot)])
+                        for i in inputs:
+                            period_delta[i] = 0
+                        start_values = array('q', values)
+                        production.advance(periods, period_delta)
+                        self.record_caps(events, elapsed, start_values, period_delta, period)
+                        elapsed = elapsed + periods * period
+                        events.extend(Event(elapsed, 'achievement', i) for i in self.achievements.update())
+                        states.clear()
+                        continue
+                if len(states) > 10000:
+                    states.clear() # no short cycle, keep memory bounded
+                states[key] = (elapsed, array('q', values))
+
+            # the segment ends one tick before the next change, so that tick is done exactly
+            n = max(min(remaining, production.ticks_until_change(delta, checks)), 1)
+            if n > 1:
+                n = max(min(n, self.ticks_until_achievement(delta)), 1)
+            start_values = array('q', values)
+            if n > 1:
+                production.advance(n - 1, delta)
+            production.tick()
+            self.record_caps(events, elapsed, start_values, delta, 1)
+            elapsed = elapsed + n
+            events.extend(Event(elapsed, 'achievement', i) for i in self.achievements.update())
+        self.ticks = self.ticks + seconds
+        self.start_schedules(self.ticks, events, elapsed)
+        events.sort(key=lambda event: event.tick)
+        return events
+
+    def start_schedules(self, tick, events, elapsed):
+        """Start the season or random events due at tick with an Event for each, returns True if any were."""
+        started = False
+        if tick >= self.seasons.end:
+            self.seasons.start(tick)
+            events.append(Event(elapsed, 'season', self.seasons.current))
+            started = True
+        if tick >= self.random_events.end:
+            self.random_events.start(tick)
+            events.append(Event(elapsed, 'random', self.random_events.active()))
+            started = True
+        return started
+
+    def record_caps(self, events, elapsed, start_values, delta, per):
+        """
+        Add an Event for every Resource that reached its max_num since
+        start_values, while growing by delta every per ticks from elapsed.
+        """
+        values, max_nums = self.ledger.values, self.ledger.max_nums
+        for resource in self.resource_list + self.ingredient_list:
+            start, d, m = start_values[resource.index], delta[resource.index], max_nums[resource.index]
+            if start < m <= values[resource.index]:
+                ticks = -((start - m) // d) * per if d > 0 else per
+                events.append(Event(elapsed + ticks, 'cap', resource))
+
+    def ticks_until_achievement(self, delta):
+        """Number of ticks until the next achievement is reached if every Resource changes by delta."""
+        first = math.inf
+        for resource, num_required in self.achievements.next_unmet():
+            d, cents = delta[resource.index], num_required * CENT
+            if d > 0 and cents <= self.ledger.max_nums[resource.index]:
+                first = min(first, max(-((resource.cents - cents) // d), 1))
+        return first
+
+    def collect(self, n=1):
+        """Collect n units of milk."""
+        self.milk.update_cents(n * CENT)
+
+    def cheat(self):
+        i = 100
+        for resource in self.resource_list:
+            resource.update(i)
+        for ingredient in self.ingredient_list:
+            ingredient.update(i)
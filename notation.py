@@ -0,0 +1,55 @@
+"""
+Compact text for the numbers shown in labels and hovertips.
+Numbers under SUFFIX_FROM are shown with up to 2 decimals, larger ones
+with 3 significant digits and a suffix, e.g. 12.3K, 456M or 7.89B, and
+anything past the last suffix in e-notation, e.g. 1.23e15. The text of
+each value is cached, most labels show the same few values every frame.
+Spans of game time are shown as hours:minutes:seconds by clock().
+"""
+import math
+
+SUFFIXES = ('', 'K', 'M', 'B', 'T') # for each power of 1000
+SUFFIX_FROM = 10000 # smaller numbers are shown in full
+CACHE_SIZE = 4096 # the cache is emptied when it holds this many values
+
+cache = {} # value -> text
+
+
+def mantissa_exponent(x):
+    """
+    x as (mantissa, exponent) with the mantissa rounded to 3 significant
+    digits, x ~= mantissa * 10**exponent and 1 <= abs(mantissa) < 10.
+    """
+    if x == 0:
+        return 0.0, 0
+    exponent = math.floor(math.log10(abs(x)))
+    mantissa = round(x / 10**exponent, 2)
+    if abs(mantissa) >= 10: # rounded up to the next power of 10, e.g. 9.996
+        mantissa, exponent = mantissa / 10, exponent + 1
+    return mantissa, exponent
+
+
+def compact(x):
+    """x as compact text, e.g. compact(1234567) == '1.23M'."""
+    text = cache.get(x)
+    if text is None:
+        rounded = round(x, 2) # e.g. 9999.999 rounds up to 10000 and is shown with a suffix
+        if abs(rounded) < SUFFIX_FROM:
+            text = str(int(rounded)) if rounded == int(rounded) else str(rounded)
+        else:
+            mantissa, exponent = mantissa_exponent(x)
+            group = exponent // 3
+            if group < len(SUFFIXES):
+                digits = 2 - exponent % 3 # 3 significant digits in all
+                text = f'{mantissa * 10**(exponent % 3):.{digits}f}{SUFFIXES[group]}'
+            else:
+                text = f'{mantissa:.2f}e{exponent}'
+        if len(cache) >= CACHE_SIZE:
+            cache.clear()
+        cache[x] = text
+    return text
+
+
+def clock(seconds):
+    """A whole number of seconds as hours:minutes:seconds, e.g. clock(3725) == '1:02:05'."""
+    return f'{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}'
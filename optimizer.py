@@ -0,0 +1,306 @@
+"""
+Search for the quickest order of purchases to reach a target, e.g. the
+first Special Building, without a display.
+
+    py optimizer.py                                 from a new game to the Special Building
+    py optimizer.py cow --count 20 --save incremental-game.sav --beam 64
+
+The search is a beam search over game time. From each state, buying each
+Building is tried next: the game runs until the Building can be afforded,
+with Collect clicked --clicks times a second, and whatever has to be
+converted for it (e.g. ice cream from milk) is converted as soon as the
+ingredients are there. Purchases, conversions and collects go through
+model.Game.act(), lucky doubling and all. States with the same Buildings and roughly the
+same Resources are merged, keeping the earliest. The --beam states
+closest to the target (time so far plus an estimate of the time left)
+are expanded next. States are the bytes of save.dumps(), so they're
+cheap to copy and send to the process pool. Each worker process keeps
+one model.Game and loads the states it expands into it.
+"""
+import argparse
+import concurrent.futures
+import heapq
+import math
+import os
+import sys
+from collections import namedtuple
+
+import content
+import model
+import notation
+import save
+
+TARGET = 'special_building' # id of the Building searched for by default
+BEAM = 32 # states expanded at each step
+CLICKS = 5 # Collect clicks per second while waiting
+HORIZON = 30 * 24 * 3600 # seconds of game time searched
+MAX_STEPS = 2000 # most purchases in a plan
+UNREACHABLE = 1e12 # estimate for a Resource that can't be made
+
+# a state in the search, time is the game time it's reached at and actions the (time, building index) pairs that lead to it
+Node = namedtuple('Node', 'time score key state actions')
+
+game = None # the model.Game of this process, states are loaded into it
+converts = [] # the Converts of game, each before the Converts making its inputs
+makers = {} # Resource -> the Converts making it and the Buildings producing it
+
+
+def start_worker(tables=None):
+    """Set up this process, tables are the compiled content to play, by default content.json."""
+    global game
+    game = model.Game(tables)
+    makers.clear()
+    for convert in game.converts:
+        makers.setdefault(convert.new_resource, []).append(convert)
+    for building in game.buildings:
+        for new_resource in building.new_resources:
+            makers.setdefault(new_resource, []).append(building)
+
+    # the number of Converts in the longest chain making each Resource
+    depths = {}
+    def depth(resource, visiting=frozenset()):
+        if resource not in depths:
+            chains = [max((depth(r, visiting | {resource}) for r in maker.buy_resources if r not in visiting), default=0) for maker in makers.get(resource, ()) if isinstance(maker, model.Convert)]
+            depths[resource] = 1 + max(chains) if chains else 0
+        return depths[resource]
+    converts[:] = sorted(game.converts, key=lambda convert: -depth(convert.new_resource))
+
+
+def requirements(game, building):
+    """(Resource, centi-units) needed before building can be bought: its cost, and making it visible."""
+    needed = list(zip(building.buy_resources, building.costs))
+    if building.num == 0: # a Building stays visible once it's been bought
+        needed.append((building.visible_resource, building.visible_value))
+    return needed
+
+
+def rate(game, delta, resource, clicks):
+    """Per tick increase of resource in centi-units, with Collect clicks for milk."""
+    return delta[resource.index] + (clicks * model.CENT if resource is game.milk else 0)
+
+
+def wait(game, needed, limit, clicks, observe=None):
+    """
+    Run game until there's at least needed[resource] centi-units of every
+    resource and return the number of ticks that took, or None if it
+    can't happen within limit ticks. observe is called with the number of
+    ticks after every step of the game.
+    """
+    waited = 0
+    while True:
+        short = [(resource, cents) for resource, cents in needed.items() if resource.cents < cents]
+        if not short:
+            return waited
+        delta = game.production.plan()[0]
+        n = 0
+        for resource, cents in short:
+            r = rate(game, delta, resource, clicks)
+            if cents > game.ledger.max_nums[resource.index]:
+                return None # there isn't room for it
+            if r <= 0:
+                if any(isinstance(maker, model.Building) and maker.num > 0 and (game.seasons.change(maker) < 0 or maker.multiplier == 0) for maker in makers.get(resource, ())):
+                    n = max(n, min(game.seasons.left(game.ticks), game.random_events.left(game.ticks))) # stopped by the season or an event, wait for the next one
+                    continue
+                return None # nothing produces it
+            n = max(n, -((resource.cents - cents) // r))
+        n = min(n, limit - waited)
+        if n <= 0:
+            return None
+        game.fast_forward(n)
+        if clicks:
+            game.act(model.COLLECT, 0, clicks * n)
+        if observe is not None:
+            observe(n)
+        waited = waited + n
+
+
+def prepare(game, needed, limit, clicks, observe=None):
+    """
+    Wait and convert until every (Resource, centi-units) in needed is
+    there. Returns the number of ticks that took, or None if it can't
+    happen within limit ticks. observe is called with the number of ticks
+    after every step of the game, 0 after converting.
+    """
+    waited = 0
+    for attempt in range(3): # production and rounding can leave a little short, try again
+        totals = {}
+        for resource, cents in needed:
+            totals[resource] = max(totals.get(resource, 0), cents)
+        # what's short of each converted Resource is converted from its inputs, outputs first
+        conversions = []
+        for convert in converts:
+            short = totals.get(convert.new_resource, 0) - convert.new_resource.cents
+            if short > 0:
+                if totals[convert.new_resource] > game.ledger.max_nums[convert.new_resource.index]:
+                    return None # there isn't room for it
+                n = -(-short * model.BASIS // (convert.reward * convert.achievements.bonus))
+                conversions.append((convert, n))
+                del totals[convert.new_resource]
+                for buy_resource, cost in zip(convert.buy_resources, convert.costs):
+                    totals[buy_resource] = totals.get(buy_resource, 0) + n * cost
+        ticks = wait(game, totals, limit - waited, clicks, observe)
+        if ticks is None:
+            return None
+        waited = waited + ticks
+        for convert, n in reversed(conversions):
+            game.act(model.CONVERT, game.converts.index(convert), n)
+        if conversions and observe is not None:
+            observe(0)
+        if all(resource.cents >= cents for resource, cents in needed):
+            return waited
+    return None
+
+
+def eta(game, delta, resource, cents, clicks, memo, visiting=frozenset()):
+    """
+    Rough number of ticks until there are cents more of resource: at its
+    current rate if something produces it, or else by converting it from
+    other Resources or buying a Building that produces it, whichever of
+    those is quickest by the same estimate.
+    """
+    if cents <= 0:
+        return 0
+    r = rate(game, delta, resource, clicks)
+    if r > 0:
+        return cents / r
+    if (resource, cents) in memo:
+        return memo[resource, cents]
+    if resource in visiting:
+        return UNREACHABLE
+    visiting = visiting | {resource}
+    best = UNREACHABLE
+    for maker in makers.get(resource, ()):
+        if isinstance(maker, model.Convert):
+            conversions = cents / maker.reward
+            ticks = max(eta(game, delta, buy_resource, conversions * cost - buy_resource.cents, clicks, memo, visiting) for buy_resource, cost in zip(maker.buy_resources, maker.costs))
+        else:
+            ticks = max(eta(game, delta, buy_resource, cost - buy_resource.cents, clicks, memo, visiting) for buy_resource, cost in zip(maker.buy_resources, maker.costs))
+            efficiency = maker.efficiency
+            if efficiency <= 0: # stopped for the season or by an event, it produces again after them
+                ticks = ticks + game.seasons.left(game.ticks)
+                efficiency = maker.efficiency_bonus - game.seasons.change(maker)
+            if efficiency <= 0:
+                continue
+            ticks = ticks + cents * model.BASIS / (maker.bonus_vals[maker.new_resources.index(resource)] * efficiency)
+        best = min(best, ticks)
+    memo[resource, cents] = best
+    return best
+
+
+def estimate(game, needed, clicks):
+    """Rough number of ticks until every (Resource, centi-units) in needed is there, the slowest one."""
+    delta = game.production.plan()[0]
+    memo = {}
+    ticks = 0
+    for resource, cents in needed:
+        if cents > game.ledger.max_nums[resource.index]:
+            ticks = ticks + UNREACHABLE # storage has to be bought first
+        ticks = max(ticks, eta(game, delta, resource, cents - resource.cents, clicks, memo))
+    return ticks
+
+
+def key(game):
+    """States with the same Buildings and Resources within a factor of 2 are treated as the same."""
+    return tuple(building.num for building in game.buildings), tuple(v.bit_length() for v in game.ledger.values)
+
+
+def expand(task):
+    """
+    Try buying every Building from a state. Returns a list of (time,
+    score, key, state, building index, done) for the Buildings that can
+    be bought in time.
+    """
+    state, elapsed, target, count, clicks, horizon = task
+    children = []
+    for i in range(len(game.buildings)):
+        save.loads(game, state)
+        building = game.buildings[i]
+        waited = prepare(game, requirements(game, building), horizon - elapsed, clicks)
+        if waited is None or game.act(model.BUY, i, 1) == 0:
+            continue
+        time = elapsed + waited
+        done = game.buildings[target].num >= count
+        score = time if done else time + estimate(game, requirements(game, game.buildings[target]), clicks)
+        children.append((time, score, key(game), save.dumps(game, 0), i, done))
+    return children
+
+
+def describe(tables, i):
+    return f'Buy {tables["buildings"][i]["name"]}'
+
+
+def search(state, target=TARGET, count=1, beam=BEAM, clicks=CLICKS, processes=None, horizon=HORIZON, max_steps=MAX_STEPS):
+    """
+    Search for the quickest plan from state, bytes from save.dumps(), to
+    owning count of the Building with id target. processes is the size
+    of the process pool, by default one per core. Returns (seconds,
+    [(seconds, action description), ...]), or None if no plan was found.
+    """
+    tables = content.load()
+    ids = [table['id'] for table in tables['buildings']]
+    if target not in ids:
+        raise ValueError(f'unknown building {target!r}')
+    target = ids.index(target)
+    processes = processes or os.cpu_count() or 1
+    pool = None
+    if processes == 1:
+        start_worker()
+        run = map
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(processes, initializer=start_worker)
+        run = pool.map
+    best = None
+    earliest = {} # key -> earliest time a state with that key was reached
+    frontier = [Node(0, 0, None, state, ())]
+    try:
+        for step in range(max_steps):
+            tasks = [(node.state, node.time, target, count, clicks, horizon) for node in frontier]
+            chunksize = max(len(tasks) // (processes * 4), 1)
+            children = {}
+            for node, results in zip(frontier, run(expand, tasks, chunksize=chunksize) if pool else run(expand, tasks)):
+                for time, score, child_key, child_state, action, done in results:
+                    if best is not None and time >= best[0]:
+                        continue # slower than a plan already found
+                    actions = node.actions + ((time, action),)
+                    if done:
+                        best = (time, actions)
+                    elif earliest.get(child_key, math.inf) > time:
+                        earliest[child_key] = time
+                        children[child_key] = Node(time, score, child_key, child_state, actions)
+            frontier = heapq.nsmallest(beam, children.values(), key=lambda node: node.score)
+            if not frontier:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if best is None:
+        return None
+    return best[0], [(time, describe(tables, action)) for time, action in best[1]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search for the quickest order of purchases to reach a building.')
+    parser.add_argument('target', nargs='?', default=TARGET, help='id of the building in content.json')
+    parser.add_argument('--count', type=int, default=1, help='number of the target building to own')
+    parser.add_argument('--save', help='save file to start from, instead of a new game')
+    parser.add_argument('--beam', type=int, default=BEAM)
+    parser.add_argument('--clicks', type=int, default=CLICKS, help='Collect clicks per second while waiting')
+    parser.add_argument('--processes', type=int, help='size of the process pool, by default one per core')
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='seconds of game time searched')
+    args = parser.parse_args()
+
+    start = model.Game()
+    if args.save:
+        save.load_game(start, args.save)
+    result = search(save.dumps(start, 0), args.target, args.count, args.beam, args.clicks, args.processes, args.horizon)
+    if result is None:
+        print('no plan found', file=sys.stderr)
+        sys.exit(1)
+    seconds, steps = result
+    for time, action in steps:
+        print(notation.clock(time), action)
+    print(f'done in {notation.clock(seconds)} of game time')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Timing of the game's hot paths.
+Functions decorated with @section('name') record their number of calls,
+cumulative time and a histogram of how long each call took. Recording is
+off unless the ICG_PROFILE environment variable is set or enable() is
+called, and then a decorated function only costs one extra check.
+
+    profiler.enable()
+    ...
+    profiler.dump('profile.json')
+"""
+import functools
+import json
+import os
+import time
+
+BUCKETS = 24 # histogram bucket i counts calls that took under 2**i microseconds, the last one counts the rest
+
+enabled = bool(os.environ.get('ICG_PROFILE'))
+sections = {} # name -> Section
+
+
+class Section:
+    """Call count, cumulative time and latency histogram of one section."""
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0 # seconds
+        self.max = 0.0 # seconds
+        self.histogram = [0] * BUCKETS
+
+    def record(self, seconds):
+        self.count = self.count + 1
+        self.total = self.total + seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.histogram[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'histogram': self.histogram[:],
+        }
+
+
+def section(name):
+    """Decorator that times every call of a function as the section name."""
+    stats = sections.setdefault(name, Section(name))
+
+    def decorate(function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.record(time.perf_counter() - start)
+        return timed
+    return decorate
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    for stats in sections.values():
+        stats.reset()
+
+
+def snapshot():
+    """Every section's statistics as a dict that can be saved as JSON."""
+    return {
+        'time': time.time(),
+        'histogram_bounds_us': [2**i for i in range(BUCKETS - 1)], # upper bound of each bucket but the last
+        'sections': {name: stats.snapshot() for name, stats in sorted(sections.items())},
+    }
+
+
+def dump(path):
+    with open(path, 'w') as f:
+        json.dump(snapshot(), f, indent=2)
@@ -0,0 +1,63 @@
+"""
+Counter-based random numbers: draw number counter of a stream is worked
+out directly from (seed, stream, counter), with no generator state to
+step through. So a tick, a fast forward over a day and a replay of a
+journal all see the same draws, whichever order they ask for them in,
+and a game only has to save its seed.
+
+A stream's key is the SplitMix64 hash of the seed and the stream number,
+and draw n is the SplitMix64 output for the state key + n * GOLDEN, the
+n-th number of the SplitMix64 sequence started at key. Draws are 64 bit
+integers, compare them with threshold() to get a chance without floats.
+"""
+
+MASK = 2**64 - 1
+GOLDEN = 0x9E3779B97F4A7C15 # the SplitMix64 increment
+MIX1 = 0xBF58476D1CE4E5B9
+MIX2 = 0x94D049BB133111EB
+
+
+def mix(z):
+    """SplitMix64's finalizer, a bijection of 64 bit integers that scrambles every bit."""
+    z = (z ^ (z >> 30)) * MIX1 & MASK
+    z = (z ^ (z >> 27)) * MIX2 & MASK
+    return z ^ (z >> 31)
+
+
+def key(seed, stream):
+    """Key of a stream of the seed, stream is a small integer naming what the draws are for."""
+    return mix((mix(seed & MASK) + (stream + 1) * GOLDEN) & MASK)
+
+
+def draw(key, counter):
+    """Draw number counter of the stream with key, a 64 bit integer."""
+    return mix((key + (counter + 1) * GOLDEN) & MASK)
+
+
+def draws(key, start, n):
+    """Draws start to start + n - 1 of the stream with key, in one call, the same as n calls to draw()."""
+    draws = []
+    state = (key + start * GOLDEN) & MASK
+    for counter in range(n):
+        state = (state + GOLDEN) & MASK
+        z = (state ^ (state >> 30)) * MIX1 & MASK # mix(), inlined
+        z = (z ^ (z >> 27)) * MIX2 & MASK
+        draws.append(z ^ (z >> 31))
+    return draws
+
+
+def threshold(chance, scale):
+    """A draw below threshold(chance, scale) happens with chance in 1/scale, e.g. threshold(1000, 10000) for 10%."""
+    return min(chance, scale) * 2**64 // scale
+
+
+def first(key, start, n, limit):
+    """Smallest counter from start to start + n - 1 whose draw is below limit, or None."""
+    offset, chunk = 0, 64
+    while offset < n:
+        for k, value in enumerate(draws(key, start + offset, min(chunk, n - offset))):
+            if value < limit:
+                return start + offset + k
+        offset = offset + chunk
+        chunk = min(chunk * 4, 65536) # rare draws need longer scans
+    return None
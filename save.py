@@ -0,0 +1,214 @@
+"""
+Saving and loading a model.Game.
+
+A save file is little-endian binary:
+    header      magic, schema version, time saved, number of resources,
+                buildings and achievements
+    resources   the Ledger's values, max_nums and totals as int64 arrays,
+                then each Resource's efficiency bonus and whether it's been seen
+    buildings   num, activated_num, efficiency_bonus and bought_before
+    achievements  a bit per achievement done
+    ticks       the Game's ticks, the time of year follows from them
+    random      the Game's seed and the number of lucky draws made
+    crc32       of everything before it
+Amounts are the model's fixed point integers. Version 1 saves stored
+floats, they're converted when loaded. Saves before version 3 didn't
+have seasons, their games start again from the first season, and saves
+before version 4 didn't have random events, their games keep the seed of
+the Game they're loaded into. The random events going on aren't saved,
+they follow from the seed and the ticks. In version 4 saves they were
+part of the efficiency bonuses, they're taken out when loaded. The
+totals aren't loaded, they're worked out from the buildings, see
+model.Production.
+Files are written to a temporary file first and then renamed, so a crash
+while saving never leaves a half written save behind.
+"""
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+
+import model
+
+MAGIC = b'ICGS'
+VERSION = 5
+HEADER = struct.Struct('<4sHdHHH') # magic, version, time saved, resources, buildings, achievements
+RESOURCE = struct.Struct('<q?') # efficiency bonus, seen
+BUILDING = struct.Struct('<IIq?') # num, activated_num, efficiency_bonus, bought_before
+RESOURCE_V1 = struct.Struct('<d?')
+BUILDING_V1 = struct.Struct('<IId?B') # ..., number of costs, followed by the costs
+TICKS = struct.Struct('<Q')
+RANDOM = struct.Struct('<QQ') # seed, lucky draws
+CRC = struct.Struct('<I')
+
+
+def to_bytes(a):
+    """Bytes of an array in little-endian order."""
+    if sys.byteorder == 'big':
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def from_bytes(typecode, data):
+    a = array(typecode)
+    a.frombytes(data)
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a
+
+
+def dumps(game, saved_at=None):
+    """Serialize game into bytes."""
+    ledger = game.ledger
+    resources = ledger.resources
+    achievements = game.achievements
+    parts = [HEADER.pack(MAGIC, VERSION, time.time() if saved_at is None else saved_at, len(resources), len(game.buildings), len(achievements.done))]
+    parts.append(to_bytes(ledger.values))
+    parts.append(to_bytes(ledger.max_nums))
+    parts.append(to_bytes(ledger.totals))
+    for resource in resources:
+        parts.append(RESOURCE.pack(resource.current_efficiency_bonus, resource.seen))
+    for building in game.buildings:
+        parts.append(BUILDING.pack(building.num, getattr(building, 'activated_num', 0), building.efficiency_bonus, getattr(building, 'bought_before', False)))
+    done = 0
+    for i, d in enumerate(achievements.done):
+        if d:
+            done |= 1 << i
+    parts.append(done.to_bytes((len(achievements.done) + 7) // 8, 'little'))
+    parts.append(TICKS.pack(game.ticks))
+    parts.append(RANDOM.pack(game.seed, game.lucky_draws))
+    data = b''.join(parts)
+    return data + CRC.pack(zlib.crc32(data))
+
+
+def expected_size(data, version, resource_num, building_num, achievement_num):
+    """Length in bytes of a save of version with these numbers of things, or None if data is too short to tell."""
+    n = HEADER.size + 3 * 8 * resource_num
+    if version == 1:
+        n = n + RESOURCE_V1.size * resource_num
+        for building in range(building_num): # each one followed by its costs
+            if len(data) < n + BUILDING_V1.size:
+                return None
+            n = n + BUILDING_V1.size + 8 * BUILDING_V1.unpack_from(data, n)[4]
+        n = n + 8 # the achievement bonus
+    else:
+        n = n + RESOURCE.size * resource_num + BUILDING.size * building_num
+    n = n + (achievement_num + 7) // 8
+    if version >= 3:
+        n = n + TICKS.size
+    if version >= 4:
+        n = n + RANDOM.size
+    return n + CRC.size
+
+
+def loads(game, data):
+    """
+    Load bytes from dumps() into game, which should be a new Game.
+    Returns the time the game was saved at.
+    Raises ValueError if data isn't a save of this version of the game.
+    """
+    if len(data) < HEADER.size + CRC.size or zlib.crc32(data[:-CRC.size]) != CRC.unpack_from(data, len(data) - CRC.size)[0]:
+        raise ValueError('save file is damaged')
+    magic, version, saved_at, resource_num, building_num, achievement_num = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('not a save file')
+    if version not in (1, 2, 3, 4, VERSION):
+        raise ValueError(f'save file version {version} is not supported')
+    ledger = game.ledger
+    achievements = game.achievements
+    if (resource_num, building_num, achievement_num) != (len(ledger.resources), len(game.buildings), len(achievements.done)):
+        raise ValueError('save file is from a different version of the game')
+    if expected_size(data, version, resource_num, building_num, achievement_num) != len(data):
+        raise ValueError('save file is damaged') # checked before anything is loaded, a short file can't leave the game half loaded
+
+    offset = HEADER.size
+    size = 8 * resource_num
+    if version == 1:
+        # floats in units, the costs follow from the number of buildings
+        ledger.values[:] = array('q', [round(v * model.CENT) for v in from_bytes('d', data[offset:offset+size])])
+        ledger.max_nums[:] = array('q', [m * model.CENT for m in from_bytes('q', data[offset+size:offset+2*size])])
+    else:
+        ledger.values[:] = from_bytes('q', data[offset:offset+size])
+        ledger.max_nums[:] = from_bytes('q', data[offset+size:offset+2*size])
+    offset = offset + 3 * size
+    for resource in ledger.resources:
+        if version == 1:
+            efficiency_bonus, resource.seen = RESOURCE_V1.unpack_from(data, offset)
+            resource.current_efficiency_bonus = round(efficiency_bonus * model.BASIS)
+            offset = offset + RESOURCE_V1.size
+        else:
+            resource.current_efficiency_bonus, resource.seen = RESOURCE.unpack_from(data, offset)
+            offset = offset + RESOURCE.size
+    for building in game.buildings:
+        if version == 1:
+            num, activated_num, efficiency_bonus, bought_before, cost_num = BUILDING_V1.unpack_from(data, offset)
+            efficiency_bonus = round(efficiency_bonus * model.BASIS)
+            offset = offset + BUILDING_V1.size + 8 * cost_num
+        else:
+            num, activated_num, efficiency_bonus, bought_before = BUILDING.unpack_from(data, offset)
+            offset = offset + BUILDING.size
+        building.num = num
+        building.efficiency_bonus = efficiency_bonus
+        if hasattr(building, 'activated_num'):
+            building.activated_num = activated_num
+        if hasattr(building, 'bought_before'):
+            building.bought_before = bought_before
+        building.changed()
+    if version == 1:
+        offset = offset + 8 # the achievement bonus, set_done() works it out
+    done = int.from_bytes(data[offset:offset+(achievement_num+7)//8], 'little')
+    achievements.set_done([bool(done >> i & 1) for i in range(achievement_num)])
+    offset = offset + (achievement_num + 7) // 8
+    # the efficiency bonuses loaded include the change of the season when it was saved
+    if version >= 3:
+        game.ticks, = TICKS.unpack_from(data, offset)
+        offset = offset + TICKS.size
+        game.seasons.restore(game.ticks)
+    else:
+        game.ticks = 0
+        game.seasons.clear()
+        game.seasons.start(0)
+    events = game.random_events
+    if version >= 4:
+        seed, game.lucky_draws = RANDOM.unpack_from(data, offset)
+        game.reseed(seed)
+    else:
+        game.lucky_draws = 0
+    if version == 4: # the events going on were added to the efficiency bonuses, as multiplier - 100%
+        for e in range(len(events.names)):
+            if events.happening(e, game.ticks):
+                for k, multiplier in events.effects[e]:
+                    building = events.buildings[k]
+                    building.efficiency_bonus -= multiplier - model.BASIS
+                    for new_resource in building.new_resources:
+                        new_resource.update_efficiency_bonus(model.BASIS - multiplier)
+                    building.changed()
+    events.clear()
+    events.start(game.ticks)
+    return saved_at
+
+
+def save_game(game, path):
+    """Write game to path atomically."""
+    data = dumps(game)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.save-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path) # atomic on the same filesystem
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_game(game, path):
+    """Load the save at path into game and return the time it was saved at."""
+    with open(path, 'rb') as f:
+        return loads(game, f.read())
@@ -0,0 +1,44 @@
+"""
+Tests of balance.py's headless games, played in this process to targets
+near the start of the game.
+"""
+import unittest
+
+import balance
+import content
+import optimizer
+
+
+class TestBalance(unittest.TestCase):
+
+    def play(self, policy, target, horizon=3600, script=(), seeds=range(3)):
+        tables = content.load()
+        ids = [table['id'] for table in tables['buildings']]
+        balance.start_worker(tables, (policy, [ids.index(building_id) for building_id in script], ids.index(target), horizon, optimizer.CLICKS, balance.POOL))
+        return balance.play_batch(seeds)
+
+    def test_policies_finish(self):
+        for policy in ('random', 'greedy'):
+            for seed, outcome, elapsed, times in self.play(policy, 'factory'):
+                with self.subTest(policy=policy, seed=seed):
+                    self.assertEqual(outcome, 'finished')
+                    self.assertEqual(times['bought.factory'], elapsed)
+                    self.assertTrue(all(0 <= time <= elapsed for time in times.values()))
+
+    def test_script_order(self):
+        for seed, outcome, elapsed, times in self.play('script', 'factory', script=['cow', 'cow', 'factory']):
+            with self.subTest(seed=seed):
+                self.assertEqual(outcome, 'finished')
+                self.assertLess(times['bought.cow'], times['bought.factory'])
+
+    def test_horizon(self):
+        for seed, outcome, elapsed, times in self.play('greedy', optimizer.TARGET, horizon=60, seeds=[0]):
+            self.assertEqual(outcome, 'horizon')
+            self.assertLessEqual(elapsed, 60)
+
+    def test_same_seed_same_game(self):
+        self.assertEqual(self.play('random', 'factory'), self.play('random', 'factory'))
+
+
+if __name__ == '__main__':
+    unittest.main()
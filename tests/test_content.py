@@ -0,0 +1,104 @@
+"""
+Tests of content.py's validation, on content.json with one mistake
+added at a time.
+"""
+import json
+import unittest
+
+import content
+import model
+
+
+def data():
+    with open(content.CONTENT_PATH) as f:
+        return json.load(f)
+
+
+class TestIds(unittest.TestCase):
+
+    def assertRejected(self, data):
+        with self.assertRaises(ValueError):
+            content.compile_tables(data)
+
+    def test_reserved(self):
+        for reserved in ('tick', 'ledger', 'act'):
+            with self.subTest(id=reserved):
+                changed = data()
+                changed['resources'][1]['id'] = reserved
+                self.assertRejected(changed)
+
+    def test_not_a_name(self):
+        for bad in ('1cow', 'ice cream', 'class', '_hidden', ''):
+            with self.subTest(id=bad):
+                changed = data()
+                changed['buildings'][0]['id'] = bad
+                self.assertRejected(changed)
+
+    def test_convert_named_like_a_resource(self):
+        changed = data()
+        changed['converts'][0]['id'] = 'milk'
+        self.assertRejected(changed)
+
+    def test_reserved_covers_game(self):
+        """Every attribute of a Game that isn't content is reserved, so content can't replace it."""
+        game = model.Game()
+        tables = game.tables
+        ids = set(tables['resources']['ids']) | {table['id'] for table in tables['buildings'] + tables['converts']}
+        names = {name for name in dir(game) if not name.startswith('_')} - ids
+        self.assertEqual(names - content.RESERVED, set())
+
+
+class TestAmounts(unittest.TestCase):
+
+    def assertRejected(self, change):
+        changed = data()
+        change(changed)
+        with self.assertRaises(ValueError):
+            content.compile_tables(changed)
+
+    def test_accepted(self):
+        content.compile_tables(data())
+
+    def test_cost_multiplier_below_one(self):
+        def change(changed):
+            changed['buildings'][0]['cost'][0][2] = 0.9
+        self.assertRejected(change)
+
+    def test_costs_more_than_zero(self):
+        def building(changed):
+            changed['buildings'][0]['cost'][0][1] = 0.001 # rounds to 0 hundredths
+        def conversion(changed):
+            converter = next(item for item in changed['buildings'] if item['type'] == 'Converter')
+            converter['consumes'][0][1] = 0
+        def convert(changed):
+            changed['converts'][0]['cost'][0][1] = 0
+        for change in (building, conversion, convert):
+            with self.subTest(change=change.__name__):
+                self.assertRejected(change)
+
+    def test_event_multiplier_not_negative(self):
+        def change(changed):
+            changed['random_events'][0]['production'][0][1] = -2
+        self.assertRejected(change)
+
+    def test_season_change_at_least_minus_one(self):
+        def change(changed):
+            changed['seasons'][0]['efficiency'] = [['cow', -1.5]]
+        self.assertRejected(change)
+
+    def test_season_and_event_may_add_up(self):
+        """A season's change and an event are both allowed to the limit, the efficiency they add up to is clamped in the model."""
+        changed = data()
+        changed['seasons'][0]['efficiency'] = [['cow', -1]]
+        changed['random_events'][0]['production'] = [['cow', 0]]
+        content.compile_tables(changed)
+
+    def test_event_longer_than_every(self):
+        def change(changed):
+            event = changed['random_events'][0]
+            event['length'] = event['every'] + 1
+        self.assertRejected(change)
+
+
+if __name__ == '__main__':
+    unittest.main()
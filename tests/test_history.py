@@ -0,0 +1,37 @@
+"""
+Tests of history.py's MinMax, the buckets the Statistics tab's graphs
+are drawn from.
+"""
+import unittest
+
+import history
+
+
+class TestMinMax(unittest.TestCase):
+
+    def test_restart_after_full_drop(self):
+        minmax = history.MinMax(points=4)
+        minmax.extend(range(20))
+        minmax.drop(30) # every sample was overwritten, e.g. after a long catch-up
+        self.assertEqual((minmax.start, minmax.end, minmax.mins), (30, 30, []))
+        minmax.extend([5, 7, 6]) # the buckets are still 8 samples long
+        self.assertEqual(minmax.points_in_order(), [(30, 5), (32, 7)])
+
+    def test_drop_keeps_later_buckets(self):
+        minmax = history.MinMax(points=4)
+        minmax.extend(range(8)) # buckets of 2 samples
+        minmax.drop(4)
+        self.assertEqual(minmax.start, 4)
+        self.assertEqual(minmax.points_in_order(), [(4, 4), (5, 5), (6, 6), (7, 7)])
+
+    def test_partial_last_bucket(self):
+        minmax = history.MinMax(points=2)
+        minmax.extend([0, 1, 2, 3, 4, 5, 6, 7, 1, 9]) # buckets of 8 samples, the last one has 2
+        self.assertEqual(minmax.size, 8)
+        points = minmax.points_in_order()
+        self.assertEqual(points, [(0, 0), (4, 7), (8, 1), (9, 9)])
+        self.assertTrue(all(tick < minmax.end for tick, value in points))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Invariants the rest of the game relies on, checked on randomly played
+games: fast_forward() is the same as ticking, saves of every version
+load, and a journal replays to the game it was recorded from.
+
+    py -m pytest tests
+    py -m unittest discover tests
+"""
+import os
+import random
+import struct
+import tempfile
+import unittest
+import zlib
+from array import array
+
+import content
+import journal
+import model
+import save
+
+SEEDS = range(12)
+
+
+def play(seed, tables=None, steps=60):
+    """A game with a random seed's purchases, conversions, collects and a few ticks, and plenty to spend."""
+    rnd = random.Random(seed)
+    game = model.Game(tables, seed=seed)
+    for resource in game.resource_list + game.ingredient_list:
+        resource.update_max_num(10**7 * model.CENT)
+    for step in range(steps):
+        k = rnd.random()
+        if k < 0.1:
+            game.act(model.CHEAT)
+        elif k < 0.3:
+            game.act(model.COLLECT)
+        elif k < 0.6:
+            game.act(model.BUY, rnd.randrange(len(game.buildings)), rnd.choice([1, 5, None]))
+        elif k < 0.7:
+            game.act(model.SELL, rnd.randrange(len(game.buildings)), rnd.randint(0, 2))
+        elif k < 0.8:
+            converters = [i for i, building in enumerate(game.buildings) if isinstance(building, model.Converter)]
+            game.act(model.ACTIVATE, rnd.choice(converters), rnd.choice([1, -1]))
+        elif k < 0.9:
+            game.act(model.CONVERT, rnd.randrange(len(game.converts)), rnd.choice([1, 10, None]))
+        else:
+            game.tick()
+    return game
+
+
+def without_schedules(tables):
+    """tables without seasons and random events, as the game was before saves had them."""
+    tables = dict(tables)
+    tables['seasons'] = {'ids': [], 'names': [], 'lengths': array('q'), 'changes': []}
+    tables['random_events'] = {'ids': [], 'names': [], 'every': array('q'), 'chances': array('q'), 'lengths': array('q'), 'multipliers': []}
+    return tables
+
+
+def dumps_version(game, version):
+    """game saved as a save of an older version would have saved it."""
+    data = save.dumps(game, 0)[:-save.CRC.size]
+    if version == 3:
+        data = data[:-save.RANDOM.size]
+    elif version == 2:
+        data = data[:-save.RANDOM.size - save.TICKS.size]
+    elif version == 1:
+        # floats in units, max_nums in whole units and each Building's costs
+        ledger = game.ledger
+        parts = [save.HEADER.pack(save.MAGIC, 1, 0, len(ledger.resources), len(game.buildings), len(game.achievements.done))]
+        parts.append(save.to_bytes(array('d', [value / model.CENT for value in ledger.values])))
+        parts.append(save.to_bytes(array('q', [max_num // model.CENT for max_num in ledger.max_nums])))
+        parts.append(bytes(8 * len(ledger.resources)))
+        for resource in ledger.resources:
+            parts.append(save.RESOURCE_V1.pack(resource.current_efficiency_bonus / model.BASIS, resource.seen))
+        for building in game.buildings:
+            costs = [cost / model.CENT for cost in building.costs]
+            parts.append(save.BUILDING_V1.pack(building.num, getattr(building, 'activated_num', 0), building.efficiency_bonus / model.BASIS, getattr(building, 'bought_before', False), len(costs)))
+            parts.append(struct.pack(f'<{len(costs)}d', *costs))
+        parts.append(struct.pack('<d', game.achievements.bonus / model.BASIS))
+        done = sum(1 << i for i, d in enumerate(game.achievements.done) if d)
+        parts.append(done.to_bytes((len(game.achievements.done) + 7) // 8, 'little'))
+        data = b''.join(parts)
+    if version != 1:
+        data = data[:4] + struct.pack('<H', version) + data[6:]
+    return data + save.CRC.pack(zlib.crc32(data))
+
+
+class TestFastForward(unittest.TestCase):
+
+    def test_same_as_ticking(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                ticked, forwarded = play(seed), play(seed)
+                n = random.Random(seed).choice([10, 500, 3600, 20000])
+                for tick in range(n):
+                    ticked.tick()
+                forwarded.fast_forward(n)
+                self.assertEqual(save.dumps(forwarded, 0), save.dumps(ticked, 0))
+
+
+class TestSave(unittest.TestCase):
+
+    def test_round_trip(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                game = play(seed)
+                game.fast_forward(random.Random(seed).randrange(10**5))
+                loaded = model.Game(seed=seed + 1)
+                save.loads(loaded, save.dumps(game, 0))
+                self.assertEqual(save.dumps(loaded, 0), save.dumps(game, 0))
+
+    def test_older_versions(self):
+        tables = without_schedules(content.load())
+        for version in (1, 2, 3):
+            for seed in SEEDS:
+                with self.subTest(version=version, seed=seed):
+                    game = play(seed, tables)
+                    data = dumps_version(game, version)
+                    loaded = model.Game(tables, seed=seed)
+                    save.loads(loaded, data)
+                    # what older saves didn't have starts again
+                    game.lucky_draws = 0
+                    if version < 3:
+                        game.ticks = 0
+                    self.assertEqual(save.dumps(loaded, 0), save.dumps(game, 0))
+
+    def test_damaged(self):
+        data = bytearray(save.dumps(play(0), 0))
+        data[len(data) // 2] ^= 1
+        with self.assertRaises(ValueError):
+            save.loads(model.Game(), bytes(data))
+
+    def test_wrong_length(self):
+        tables = without_schedules(content.load())
+        for version in (1, 2, 3, 4, save.VERSION):
+            game = play(version, tables)
+            data = dumps_version(game, version)[:-save.CRC.size]
+            for changed in (data[:-1], data[:len(data) // 2], data + bytes(8)):
+                with self.subTest(version=version, length=len(changed)):
+                    loaded = model.Game(tables)
+                    fresh = save.dumps(loaded, 0)
+                    with self.assertRaises(ValueError):
+                        save.loads(loaded, changed + save.CRC.pack(zlib.crc32(changed))) # the CRC is right
+                    self.assertEqual(save.dumps(loaded, 0), fresh)
+
+
+class TestJournal(unittest.TestCase):
+
+    def record(self, seed, path):
+        """Play a game with a journal, returns the checksum of the game at the end."""
+        rnd = random.Random(seed)
+        game = play(seed, steps=0)
+        recorder = journal.Journal(path, game)
+        for step in range(40):
+            game.fast_forward(rnd.choice([1, 1, 2, 30]))
+            k = rnd.random()
+            if k < 0.4:
+                game.act(model.COLLECT)
+            elif k < 0.7:
+                game.act(model.BUY, rnd.randrange(len(game.buildings)), rnd.choice([1, None]))
+            elif k < 0.8:
+                game.act(model.CHEAT)
+            else:
+                game.act(model.CONVERT, rnd.randrange(len(game.converts)), rnd.choice([1, None]))
+        recorder.close()
+        return journal.checksum(game)
+
+    def test_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.journal')
+            for seed in SEEDS:
+                with self.subTest(seed=seed):
+                    final = self.record(seed, path)
+                    with open(path, 'rb') as f:
+                        game, actions, checks = journal.replay(f.read())
+                    self.assertEqual(journal.checksum(game), final)
+                    self.assertGreater(checks, 0)
+
+    def test_mismatch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.journal')
+            for seed in SEEDS:
+                with self.subTest(seed=seed):
+                    self.record(seed, path)
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    # leave out the first Collect, the milk and the lucky draws after it differ
+                    start = journal.HEADER.size + journal.HEADER.unpack_from(data)[3]
+                    records = list(journal.RECORD.iter_unpack(data[start:]))
+                    k = next(k for k, record in enumerate(records) if record[1] == model.COLLECT)
+                    data = data[:start + k * journal.RECORD.size] + data[start + (k + 1) * journal.RECORD.size:]
+                    with self.assertRaisesRegex(ValueError, 'differs'):
+                        journal.replay(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Focused tests of model.py, on games of content.json changed to make the
+case at hand happen.
+"""
+import json
+import unittest
+
+import content
+import model
+
+
+def compiled(change):
+    """The compiled tables of content.json after change(data), which edits the parsed file in place."""
+    with open(content.CONTENT_PATH) as f:
+        data = json.load(f)
+    change(data)
+    return content.compile_tables(data)
+
+
+def item(items, item_id):
+    return next(item for item in items if item['id'] == item_id)
+
+
+class TestRandomEvents(unittest.TestCase):
+
+    def always(self, event_id):
+        """A game in which event_id goes on all the time and nothing else happens."""
+        def change(data):
+            data['seasons'] = []
+            event = item(data['random_events'], event_id)
+            event['chance'], event['length'] = 1, event['every']
+            data['random_events'] = [event]
+        return model.Game(compiled(change))
+
+    def test_frenzy_triples_production(self):
+        game = self.always('frenzy')
+        cow = game.cow
+        cow.efficiency_bonus = 2 * model.BASIS # e.g. from milking machines
+        game.act(model.CHEAT)
+        game.act(model.BUY, 0, 1)
+        self.assertEqual(cow.multiplier, 3 * model.BASIS)
+        self.assertEqual(cow.rates(), {game.milk.index: cow.bonus_vals[0] * 6 * model.BASIS})
+
+    def test_breakdown_halves_output_only(self):
+        game = self.always('factory_breakdown')
+        game.act(model.CHEAT)
+        game.act(model.BUY, game.buildings.index(game.factory), 1)
+        factory = game.factory
+        self.assertEqual(factory.multiplier, model.BASIS // 2)
+        rates = factory.rates()
+        self.assertEqual(rates[game.ice_cream.index], factory.bonus_vals[0] * model.BASIS // 2)
+        self.assertEqual(rates[game.milk.index], -factory.conversion_costs[0] * model.BASIS)
+
+
+class TestEfficiency(unittest.TestCase):
+
+    def test_stopped_by_winter_and_breakdown(self):
+        def change(data):
+            item(data['seasons'], 'winter')['efficiency'].append(['factory', -1])
+            data['seasons'] = [item(data['seasons'], 'winter')]
+            event = item(data['random_events'], 'factory_breakdown')
+            event['chance'], event['length'] = 1, event['every']
+            data['random_events'] = [event]
+        game = model.Game(compiled(change))
+        game.act(model.CHEAT)
+        game.act(model.BUY, game.buildings.index(game.factory), 1)
+        self.assertEqual(game.factory.efficiency, 0)
+        ice_cream = game.ice_cream.cents
+        game.fast_forward(10)
+        self.assertEqual(game.ice_cream.cents, ice_cream)
+
+    def test_clamped_at_zero(self):
+        game = model.Game()
+        game.act(model.CHEAT)
+        game.act(model.BUY, game.buildings.index(game.factory), 1)
+        game.factory.efficiency_bonus = -model.BASIS // 2 # e.g. a season and content changes adding up to -150%
+        game.factory.changed()
+        self.assertEqual(game.factory.efficiency, 0)
+        self.assertEqual(game.factory.rates()[game.ice_cream.index], 0)
+        ice_cream = game.ice_cream.cents
+        for tick in range(5):
+            game.tick()
+        self.assertEqual(game.ice_cream.cents, ice_cream)
+
+
+class TestAct(unittest.TestCase):
+
+    def test_rejected_before_journaled(self):
+        game = model.Game()
+        recorded = []
+        game.journal = lambda *record: recorded.append(record)
+        factory = game.buildings.index(game.factory)
+        for action, index, n in ((99, 0, 1), (model.BUY, len(game.buildings), 1), (model.ACTIVATE, 0, 1), (model.CONVERT, -1, 1),
+                                 (model.SELL, 0, None), (model.ACTIVATE, factory, None), (model.COLLECT, 0, None),
+                                 (model.BUY, 0, 1.5), (model.BUY, 0, True), (model.CONVERT, 0, 2**63), (model.BUY, '0', 1)):
+            with self.subTest(action=action, index=index, n=n):
+                with self.assertRaises(ValueError):
+                    game.act(action, index, n)
+        self.assertEqual(recorded, [])
+
+    def test_amounts_bounded(self):
+        game = model.Game()
+        self.assertEqual(game.act(model.BUY, 0, 10000), 0)
+        factory = game.buildings.index(game.factory)
+        self.assertEqual(game.act(model.ACTIVATE, factory, 5), 0)
+        self.assertEqual(game.factory.activated_num, 0)
+
+
+class TestClock(unittest.TestCase):
+
+    def test_on_time(self):
+        clock = model.Clock(100.0)
+        self.assertEqual(clock.advance(100.5), (0, 0))
+        self.assertEqual(clock.advance(101.0), (1, 0))
+        self.assertAlmostEqual(clock.delay(101.25), 0.75)
+
+    def test_catch_up_keeps_the_remainder(self):
+        clock = model.Clock(0.0)
+        self.assertEqual(clock.advance(3.7), (3, 0)) # late, the ticks run together
+        self.assertEqual(clock.merged, 2)
+        self.assertEqual(clock.advance(4.0), (1, 0)) # 0.7 of the next tick had already passed
+        self.assertAlmostEqual(clock.delay(4.0), 1.0)
+
+    def test_too_late_drops_ticks(self):
+        clock = model.Clock(0.0, period=0.5, max_ticks=10)
+        self.assertEqual(clock.advance(8.2), (10, 6))
+        self.assertEqual((clock.merged, clock.dropped), (9, 6))
+        self.assertEqual(clock.advance(8.5), (1, 0)) # back on time, no drift from the dropped ticks
+
+    def test_time_going_back(self):
+        clock = model.Clock(10.0)
+        self.assertEqual(clock.advance(5.0), (0, 0))
+        self.assertEqual(clock.delay(5.0), 6.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
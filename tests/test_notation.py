@@ -0,0 +1,43 @@
+"""
+Tests of notation.py's text for numbers, mostly where it changes from
+one suffix to the next.
+"""
+import unittest
+
+import notation
+
+
+class TestCompact(unittest.TestCase):
+
+    def assertCompact(self, cases):
+        for x, text in cases:
+            with self.subTest(x=x):
+                self.assertEqual(notation.compact(x), text)
+
+    def test_in_full(self):
+        self.assertCompact([(0, '0'), (7, '7'), (1.5, '1.5'), (1.999, '2'), (9999, '9999'), (9999.99, '9999.99'), (-42.25, '-42.25')])
+
+    def test_suffix_boundaries(self):
+        self.assertCompact([(9999.999, '10.0K'), (-9999.999, '-10.0K'), (10000, '10.0K'), (12345, '12.3K'),
+                            (999999, '1.00M'), (10**6, '1.00M'), (456 * 10**6, '456M'), (7.891 * 10**9, '7.89B'),
+                            (999999 * 10**6, '1.00T')])
+
+    def test_past_the_last_suffix(self):
+        self.assertCompact([(999 * 10**12, '999T'), (10**15 - 1, '1.00e15'), (1.234 * 10**15, '1.23e15'), (-5 * 10**20, '-5.00e20')])
+
+    def test_cached(self):
+        notation.cache.clear()
+        notation.compact(1234567)
+        self.assertEqual(notation.cache, {1234567: '1.23M'})
+
+
+class TestClock(unittest.TestCase):
+
+    def test_clock(self):
+        for seconds, text in ((0, '0:00:00'), (59, '0:00:59'), (3725, '1:02:05'), (100 * 3600, '100:00:00')):
+            with self.subTest(seconds=seconds):
+                self.assertEqual(notation.clock(seconds), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
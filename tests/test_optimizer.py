@@ -0,0 +1,35 @@
+"""
+Tests of optimizer.py's search, run in this process on targets near the
+start of the game.
+"""
+import unittest
+
+import model
+import optimizer
+import save
+
+
+class TestSearch(unittest.TestCase):
+
+    def search(self, target, count=1, beam=4):
+        return optimizer.search(save.dumps(model.Game(seed=0)), target=target, count=count, beam=beam, processes=1)
+
+    def test_plan_ends_with_target(self):
+        seconds, steps = self.search('cow', count=3)
+        self.assertEqual([action for time, action in steps], ['Buy Cow'] * 3)
+        self.assertEqual(steps[-1][0], seconds)
+        self.assertEqual([time for time, action in steps], sorted(time for time, action in steps))
+
+    def test_wider_beam_no_slower(self):
+        narrow, steps = self.search('factory', beam=1)
+        wide, steps = self.search('factory', beam=8)
+        self.assertEqual(steps[-1][1], 'Buy Factory')
+        self.assertLessEqual(wide, narrow)
+
+    def test_unknown_target(self):
+        with self.assertRaises(ValueError):
+            self.search('no_such_building')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Tests of rng.py: the batched and scanning functions give the same draws
+as draw().
+"""
+import unittest
+
+import rng
+
+
+class TestDraws(unittest.TestCase):
+
+    def test_draws_match_draw(self):
+        for seed, stream, start in ((0, 0, 0), (1, 3, 17), (2**64 - 1, 1, 10**12), (-5, 2, 2**63)):
+            with self.subTest(seed=seed, stream=stream, start=start):
+                key = rng.key(seed, stream)
+                self.assertEqual(rng.draws(key, start, 100), [rng.draw(key, start + k) for k in range(100)])
+
+    def test_streams_differ(self):
+        self.assertNotEqual(rng.draws(rng.key(0, 0), 0, 4), rng.draws(rng.key(0, 1), 0, 4))
+        self.assertNotEqual(rng.draws(rng.key(0, 0), 0, 4), rng.draws(rng.key(1, 0), 0, 4))
+
+    def test_threshold(self):
+        self.assertEqual(rng.threshold(0, 10000), 0)
+        self.assertEqual(rng.threshold(5000, 10000), 2**63)
+        self.assertEqual(rng.threshold(20000, 10000), 2**64) # every draw is below it
+
+
+class TestFirst(unittest.TestCase):
+
+    def test_first_below_limit(self):
+        key = rng.key(7, 0)
+        limit = rng.threshold(1, 1000)
+        for start, n in ((0, 10), (0, 5000), (123, 20000)):
+            with self.subTest(start=start, n=n):
+                expected = next((counter for counter in range(start, start + n) if rng.draw(key, counter) < limit), None)
+                self.assertEqual(rng.first(key, start, n, limit), expected)
+
+    def test_none_or_every(self):
+        key = rng.key(7, 0)
+        self.assertIsNone(rng.first(key, 0, 1000, 0))
+        self.assertEqual(rng.first(key, 50, 1000, 2**64), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@
 This includes:
  * an abstract base-class for different kinds of tooltips
  * a simple text-only Tooltip class
+Every tooltip in a window is shown in the same tooltip window, which is
+created once and hidden between tooltips instead of being destroyed.
 Modified from https://github.com/python/cpython/blob/main/Lib/idlelib/tooltip.py
 """
 import tkinter as tk
@@ -10,6 +12,7 @@ import tkinter as tk
 
 class TooltipBase:
     """abstract base class for tooltips"""
+    windows = {} # toplevel widget -> the tooltip window shared by every tooltip in it
 
     def __init__(self, anchor_widget):
         """Create a tooltip.
@@ -19,30 +22,41 @@ class TooltipBase:
         self.anchor_widget = anchor_widget
         self.tipwindow = None
 
-    def __del__(self):
-        self.hidetip()
-
     def showtip(self):
         """display the tooltip"""
         if self.tipwindow:
             return
-        self.tipwindow = tw = tk.Toplevel(self.anchor_widget)
-        # show no border on the top level window
-        tw.wm_overrideredirect(1)
-        try:
-            # This command is only needed and available on Tk >= 8.4.0 for OSX.
-            # Without it, call tips intrude on the typing process by grabbing
-            # the focus.
-            tw.tk.call("::tk::unsupported::MacWindowStyle", "style", tw._w,
-                       "help", "noActivates")
-        except tk.TclError:
-            pass
-
+        self.tipwindow = self.shared_window()
         self.position_window()
         self.showcontents()
+        self.tipwindow.deiconify()
         self.tipwindow.update_idletasks()  # Needed on MacOS -- see #34275.
         self.tipwindow.lift()  # work around bug in Tk 8.5.18+ (issue #24570)
 
+    def shared_window(self):
+        """The tooltip window of anchor_widget's toplevel, now owned by this tooltip."""
+        toplevel = self.anchor_widget.winfo_toplevel()
+        tw = TooltipBase.windows.get(toplevel)
+        if tw is None or not tw.winfo_exists():
+            tw = tk.Toplevel(toplevel)
+            tw.withdraw()
+            # show no border on the top level window
+            tw.wm_overrideredirect(1)
+            try:
+                # This command is only needed and available on Tk >= 8.4.0 for OSX.
+                # Without it, call tips intrude on the typing process by grabbing
+                # the focus.
+                tw.tk.call("::tk::unsupported::MacWindowStyle", "style", tw._w,
+                           "help", "noActivates")
+            except tk.TclError:
+                pass
+            tw.owner = None # the tooltip currently shown in the window
+            TooltipBase.windows[toplevel] = tw
+        if tw.owner is not None and tw.owner is not self:
+            tw.owner.tipwindow = None # the other tooltip loses the window
+        tw.owner = self
+        return tw
+
     def position_window(self):
         """(re)-set the tooltip's screen position"""
         x, y = self.get_position()
@@ -68,12 +82,12 @@ class TooltipBase:
 
     def hidetip(self):
         """hide the tooltip"""
-        # Note: This is called by __del__, so careful when overriding/extending
         tw = self.tipwindow
         self.tipwindow = None
-        if tw:
+        if tw and tw.owner is self:
+            tw.owner = None
             try:
-                tw.destroy()
+                tw.withdraw()
             except tk.TclError:  # pragma: no cover
                 pass
 
@@ -93,17 +107,10 @@ class OnHoverTooltipBase(TooltipBase):
         self.hover_delay = hover_delay
 
         self._after_id = None
+        # a tooltip lasts as long as its widget, so the bindings are never removed
         self._id1 = self.anchor_widget.bind("<Enter>", self._show_event)
         self._id2 = self.anchor_widget.bind("<Leave>", self._hide_event)
 
-    def __del__(self):
-        try:
-            self.anchor_widget.unbind("<Enter>", self._id1)
-            self.anchor_widget.unbind("<Leave>", self._id2)  # pragma: no cover
-        except tk.TclError:
-            pass
-        super(OnHoverTooltipBase, self).__del__()
-
     def _show_event(self, event=None):
         """event handler to display the tooltip"""
         if self.hover_delay:
@@ -142,6 +149,7 @@ class Hovertip(OnHoverTooltipBase):
     def __init__(self, anchor_widget, text, hover_delay=1000):
         """Create a text tooltip with a mouse hover delay.
         anchor_widget: the widget next to which the tooltip will be shown
+        text: the text, or a function returning the text when the tooltip is shown
         hover_delay: time to delay before showing the tooltip, in milliseconds
         Note that a widget will only be shown when showtip() is called,
         e.g. after hovering over the anchor widget with the mouse for enough
@@ -150,7 +158,18 @@ class Hovertip(OnHoverTooltipBase):
         super(Hovertip, self).__init__(anchor_widget, hover_delay=hover_delay)
         self.text = text
 
+    def get_text(self):
+        return self.text() if callable(self.text) else self.text
+
     def showcontents(self):
-        label = tk.Label(self.tipwindow, text=self.text, justify=tk.LEFT,
+        label = getattr(self.tipwindow, 'label', None)
+        if label is None: # the first text tooltip shown in the window
+            label = self.tipwindow.label = tk.Label(self.tipwindow, justify=tk.LEFT,
                       background="#ffffe0", relief=tk.SOLID, borderwidth=1)
-        label.pack()
\ No newline at end of file
+            label.pack()
+        label['text'] = self.get_text()
+
+    def refresh(self):
+        """Show the text again if it's changed while the tooltip is shown."""
+        if self.tipwindow:
+            self.showcontents()
\ No newline at end of file